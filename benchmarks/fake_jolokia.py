@@ -0,0 +1,333 @@
+"""
+In-process stand-in for an ActiveMQ broker's Jolokia endpoint.
+
+Simulates N queues with M messages each and answers the Jolokia requests that
+ActiveMQClient sends: wildcard and single-queue reads (with attribute
+projection), browse with the selectors MessagePager builds, per-message and
+selector-based move/delete/copy, purge and sendTextMessage, single or bulk.
+Results are narrowed by the request's `path`, including `*` wildcards over lists.
+Latency and errors can be injected to see how the client and UI behave. Injected
+errors are operations the broker rejected without running them.
+
+    broker = FakeJolokia(queues=100, messages=1000, body_size=512)
+    broker.fill("orders", 50000)
+    port = broker.start()
+    ...
+    broker.stop()
+
+Selectors support `AND`-joined clauses of the forms `JMSTimestamp >= N`,
+`JMSMessageID NOT IN ('a', ...)` and `<header> = 'value'`. Like ActiveMQ,
+browse takes the first `max_browse_page_size` messages of the queue and then
+applies the selector, so a selector can't reach past the cap. Pass
+filter_before_cap=True to select first and cap the result instead, which lets
+keyset paging reach every message; no real broker behaves that way.
+"""
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+BASE_TIMESTAMP = 1_700_000_000_000
+QUEUE_MBEAN = "org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName="
+
+_CLAUSE_TIMESTAMP = re.compile(r"^JMSTimestamp\s*>=\s*(\d+)$")
+_CLAUSE_NOT_IN = re.compile(r"^JMSMessageID\s+NOT\s+IN\s*\((.*)\)$", re.S)
+_CLAUSE_EQUALS = re.compile(r"^(\w+)\s*=\s*'((?:[^']|'')*)'$")
+_QUOTED = re.compile(r"'((?:[^']|'')*)'")
+
+class FakeQueue:
+    """
+    Messages ordered by timestamp. Removal is lazy so deletes stay O(1).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.messages: List[Dict[str, Any]] = []
+        self.timestamps: List[int] = []
+        self.index: Dict[str, int] = {}
+        self.removed = 0
+        self.enqueued = 0
+        self.dequeued = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.index)
+
+    def add(self, message: Dict[str, Any]) -> None:
+        self.index[message["JMSMessageID"]] = len(self.messages)
+        self.messages.append(message)
+        self.timestamps.append(message["JMSTimestamp"])
+        self.enqueued += 1
+
+    def remove(self, message_id: str) -> Optional[Dict[str, Any]]:
+        position = self.index.pop(message_id, None)
+        if position is None:
+            return None
+        message = self.messages[position]
+        self.messages[position] = None
+        self.removed += 1
+        self.dequeued += 1
+        if self.removed > len(self.messages) // 2:
+            self._compact()
+        return message
+
+    def _compact(self) -> None:
+        live = [m for m in self.messages if m is not None]
+        self.messages, self.timestamps, self.index, self.removed = [], [], {}, 0
+        for message in live:
+            self.index[message["JMSMessageID"]] = len(self.messages)
+            self.messages.append(message)
+            self.timestamps.append(message["JMSTimestamp"])
+
+    def select(self, selector: str, limit: Optional[int] = None, filter_first: bool = False) -> List[Dict[str, Any]]:
+        """
+        Messages matching selector, at most `limit`. Unless filter_first is set, the
+        limit applies to the queue's first messages before the selector, as in ActiveMQ.
+        """
+        since, predicate = 0, None
+        if selector:
+            since, predicate = _compile_selector(selector)
+        if limit is not None and not filter_first:
+            window = []
+            for message in self.messages:
+                if message is not None:
+                    window.append(message)
+                    if len(window) >= limit:
+                        break
+            return [m for m in window if m["JMSTimestamp"] >= since and (predicate is None or predicate(m))]
+        result = []
+        # Messages are ordered by timestamp, so the timestamp clause is a seek rather than a filter
+        for message in self.messages[bisect_left(self.timestamps, since):]:
+            if message is None or (predicate and not predicate(message)):
+                continue
+            result.append(message)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def attributes(self) -> Dict[str, Any]:
+        return {
+            "Name": self.name,
+            "QueueSize": self.size,
+            "ConsumerCount": 0,
+            "ProducerCount": 0,
+            "EnqueueCount": self.enqueued,
+            "DequeueCount": self.dequeued,
+            "MemoryPercentUsage": 0,
+            "Paused": False,
+        }
+
+def _compile_selector(selector: str):
+    """
+    Return (minimum JMSTimestamp, predicate for the other clauses or None) for a selector.
+    """
+    since = 0
+    checks: List[Callable[[Dict[str, Any]], bool]] = []
+    for clause in re.split(r"\s+AND\s+", selector.strip()):
+        clause = clause.strip()
+        while clause.startswith("(") and clause.endswith(")"):
+            clause = clause[1:-1].strip()
+        match = _CLAUSE_TIMESTAMP.match(clause)
+        if match:
+            since = max(since, int(match.group(1)))
+            continue
+        match = _CLAUSE_NOT_IN.match(clause)
+        if match:
+            excluded = {v.replace("''", "'") for v in _QUOTED.findall(match.group(1))}
+            checks.append(lambda m, excluded=excluded: m["JMSMessageID"] not in excluded)
+            continue
+        match = _CLAUSE_EQUALS.match(clause)
+        if match:
+            field, value = match.group(1), match.group(2).replace("''", "'")
+            checks.append(lambda m, field=field, value=value: str(m.get(field)) == value)
+            continue
+        raise ValueError(f"Unsupported selector clause: {clause}")
+    return since, (lambda m: all(check(m) for check in checks)) if checks else None
+
+class FakeJolokia:
+    def __init__(self, queues: int = 10, messages: int = 100, body_size: int = 256,
+                 latency: float = 0.0, error_rate: float = 0.0, error_operations: Optional[Set[str]] = None,
+                 max_browse_page_size: int = 400, seed: int = 0, filter_before_cap: bool = False):
+        self.latency = latency
+        self.error_rate = error_rate
+        # Operations that fail at error_rate; None makes every request eligible, reads included
+        self.error_operations = error_operations
+        self.max_browse_page_size = max_browse_page_size
+        # Apply browse selectors before max_browse_page_size instead of after, unlike ActiveMQ
+        self.filter_before_cap = filter_before_cap
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.queues: Dict[str, FakeQueue] = {}
+        self._next_id = 0
+        self.body_size = body_size
+        for q in range(queues):
+            self.fill(f"queue.{q:05d}", messages)
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def queue(self, name: str) -> FakeQueue:
+        queue = self.queues.get(name)
+        if queue is None:
+            queue = self.queues[name] = FakeQueue(name)
+        return queue
+
+    def fill(self, name: str, count: int, body_size: Optional[int] = None) -> List[str]:
+        """
+        Add `count` text messages to a queue, creating it if needed. Returns their IDs.
+        """
+        queue = self.queue(name)
+        body = "x" * (self.body_size if body_size is None else body_size)
+        with self.lock:
+            return [self._add_message(queue, body) for _ in range(count)]
+
+    def _add_message(self, queue: FakeQueue, text: str, headers: Optional[Dict[str, Any]] = None) -> str:
+        self._next_id += 1
+        message = {
+            "JMSMessageID": f"ID:fake-{self._next_id}",
+            "JMSTimestamp": BASE_TIMESTAMP + self._next_id,
+            "JMSPriority": 4,
+            "JMSDeliveryMode": "PERSISTENT",
+            "JMSRedelivered": False,
+            "JMSType": f"type{self._next_id % 5}",
+            "JMSCorrelationID": None,
+            "JMSExpiration": 0,
+            "StringProperties": {},
+            "Text": text,
+        }
+        if headers:
+            message.update(headers)
+        queue.add(message)
+        return message["JMSMessageID"]
+
+    def start(self, port: int = 0) -> int:
+        """
+        Serve on 127.0.0.1 in a background thread. Returns the port.
+        """
+        broker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                if broker.latency:
+                    time.sleep(broker.latency)
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with broker.lock:
+                    broker.requests += 1
+                    if isinstance(payload, list):
+                        result = [broker.handle(request) for request in payload]
+                    else:
+                        result = broker.handle(payload)
+                data = json.dumps(result).encode()
+                broker.bytes_sent += len(data)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address[1]
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        eligible = self.error_operations is None or request.get("operation") in self.error_operations
+        if self.error_rate and eligible and self.random.random() < self.error_rate:
+            # Rejected before running, which clients may safely retry
+            return {"status": 500, "error_type": "java.util.concurrent.RejectedExecutionException",
+                    "error": "Injected error", "request": request}
+        try:
+            value = self._dispatch(request)
+            if request.get("path"):
+                value = _apply_path(value, request["path"].split("/"))
+            return {"status": 200, "value": value, "request": request}
+        except KeyError as e:
+            return {"status": 404, "error": f"javax.management.InstanceNotFoundException: {e}", "request": request}
+        except Exception as e:
+            return {"status": 500, "error": str(e), "request": request}
+
+    def _dispatch(self, request: Dict[str, Any]) -> Any:
+        mbean = request.get("mbean", "")
+        name = mbean[len(QUEUE_MBEAN):] if mbean.startswith(QUEUE_MBEAN) else None
+        if name is None:
+            raise KeyError(mbean)
+        attributes = request.get("attribute")
+        if isinstance(attributes, str):
+            attributes = [attributes]
+
+        if request["type"] == "read":
+            if name == "*":
+                return {f"{QUEUE_MBEAN}{q.name}": _project(q.attributes(), attributes) for q in self.queues.values()}
+            return _project(self.queues[name].attributes(), attributes)
+
+        queue = self.queues[name]
+        operation = request.get("operation", "")
+        args = request.get("arguments", [])
+        if operation == "browse()":
+            return queue.select("", self.max_browse_page_size)
+        if operation == "browse(java.lang.String)":
+            return queue.select(args[0], self.max_browse_page_size, self.filter_before_cap)
+        if operation == "removeMessage(java.lang.String)":
+            return queue.remove(args[0]) is not None
+        if operation == "moveMessageTo(java.lang.String,java.lang.String)":
+            message = queue.remove(args[0])
+            if message is not None:
+                self.queue(args[1]).add(message)
+            return message is not None
+        if operation == "removeMatchingMessages(java.lang.String)":
+            matching = queue.select(args[0])
+            for message in matching:
+                queue.remove(message["JMSMessageID"])
+            return len(matching)
+        if operation in ("moveMatchingMessagesTo(java.lang.String,java.lang.String)",
+                         "copyMatchingMessagesTo(java.lang.String,java.lang.String)"):
+            matching = queue.select(args[0])
+            target = self.queue(args[1])
+            for message in matching:
+                if operation.startswith("move"):
+                    queue.remove(message["JMSMessageID"])
+                target.add(message)
+            return len(matching)
+        if operation == "purge()":
+            for message_id in list(queue.index):
+                queue.remove(message_id)
+            return None
+        if operation.startswith("sendTextMessage("):
+            headers, body = (args[0], args[1]) if len(args) > 1 else ({}, args[0])
+            return self._add_message(queue, body, {"StringProperties": dict(headers)})
+        raise Exception(f"Unsupported operation {operation}")
+
+def _apply_path(value: Any, parts: List[str]) -> Any:
+    """
+    Navigate a Jolokia path; `*` applies the rest of the path to every element of a list.
+    """
+    if not parts:
+        return value
+    part, rest = parts[0], parts[1:]
+    if isinstance(value, list):
+        if part == "*":
+            return [_apply_path(item, rest) for item in value]
+        return _apply_path(value[int(part)], rest)
+    if isinstance(value, dict):
+        return _apply_path(value.get(part), rest)
+    raise Exception(f"Path part {part} not applicable")
+
+def _project(values: Dict[str, Any], attributes: Optional[List[str]]) -> Dict[str, Any]:
+    if not attributes:
+        return values
+    return {a: values[a] for a in attributes if a in values}
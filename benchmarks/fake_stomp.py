@@ -0,0 +1,335 @@
+"""
+In-process stand-in for an ActiveMQ broker's STOMP connector.
+
+Speaks enough STOMP 1.2 for StompTransport: CONNECT, SUBSCRIBE with
+`ack: client`, `activemq.prefetchSize` and a selector, cumulative ACK,
+UNSUBSCRIBE, SEND, DISCONNECT and receipts. Like ActiveMQ, a message stays on
+the broker until it is acknowledged: unsubscribing or losing the connection
+puts the unacknowledged ones back at the head of the queue, marked redelivered.
+
+    broker = FakeStomp()
+    broker.fill("DLQ.orders", 1000, {"original-destination": "/queue/orders"})
+    port = broker.start()
+    ...
+    broker.stop()
+
+`drop_after` closes a client's connection abruptly once that many messages
+have been delivered in total, to check that a transfer interrupted mid-window
+loses nothing. Selectors support the same clauses as fake_jolokia, with
+`JMSType`, `JMSCorrelationID` and `JMSPriority` mapped to their STOMP headers.
+"""
+from bisect import insort
+import itertools
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fake_jolokia import _compile_selector
+
+_ESCAPES = {"\\\\": "\\", "\\n": "\n", "\\r": "\r", "\\c": ":"}
+# JMS header names a selector may use, and the STOMP headers holding them
+_SELECTOR_HEADERS = {"JMSType": "type", "JMSCorrelationID": "correlation-id", "JMSPriority": "priority",
+                     "JMSTimestamp": "timestamp", "JMSMessageID": "message-id"}
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    out, i = [], 0
+    while i < len(value):
+        pair = value[i:i + 2]
+        if pair in _ESCAPES:
+            out.append(_ESCAPES[pair])
+            i += 2
+        else:
+            out.append(value[i])
+            i += 1
+    return "".join(out)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r").replace(":", "\\c")
+
+def encode_frame(command: str, headers: Dict[str, str], body: bytes = b"") -> bytes:
+    lines = [command] + [f"{_escape(k)}:{_escape(str(v))}" for k, v in headers.items()]
+    return ("\n".join(lines) + "\n\n").encode("utf-8") + body + b"\0"
+
+def decode_frames(buffer: bytes) -> Tuple[List[Tuple[str, Dict[str, str], bytes]], bytes]:
+    """
+    Split complete frames off the front of buffer. Returns them and the unparsed rest.
+    """
+    frames = []
+    while True:
+        # EOLs between frames are heart-beats
+        buffer = buffer.lstrip(b"\r\n")
+        end = buffer.find(b"\n\n")
+        if end < 0:
+            return frames, buffer
+        lines = buffer[:end].decode("utf-8").replace("\r", "").split("\n")
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            # Repeated headers: the first one counts
+            headers.setdefault(_unescape(name), _unescape(value))
+        start = end + 2
+        if "content-length" in headers:
+            stop = start + int(headers["content-length"])
+            if len(buffer) <= stop:
+                return frames, buffer
+        else:
+            stop = buffer.find(b"\0", start)
+            if stop < 0:
+                return frames, buffer
+        frames.append((lines[0], headers, buffer[start:stop]))
+        buffer = buffer[stop + 1:]
+
+class FakeMessage:
+    __slots__ = ("seq", "headers", "body", "redelivered")
+
+    def __init__(self, seq: int, headers: Dict[str, str], body: bytes):
+        self.seq = seq
+        self.headers = headers
+        self.body = body
+        self.redelivered = False
+
+    def __lt__(self, other: "FakeMessage") -> bool:
+        return self.seq < other.seq
+
+    def selector_view(self) -> Dict[str, Any]:
+        view: Dict[str, Any] = dict(self.headers)
+        for name, header in _SELECTOR_HEADERS.items():
+            if header in self.headers:
+                view[name] = self.headers[header]
+        view["JMSTimestamp"] = int(self.headers.get("timestamp", 0))
+        return view
+
+class Subscription:
+    def __init__(self, connection: "_Connection", sid: str, queue_name: str, prefetch: int, selector: Optional[str]):
+        self.connection = connection
+        self.id = sid
+        self.queue_name = queue_name
+        self.prefetch = prefetch
+        self.since, self.predicate = _compile_selector(selector) if selector else (0, None)
+        self.unacked: List[Tuple[str, FakeMessage]] = []  # (ack ID, message), in delivery order
+
+    def matches(self, message: FakeMessage) -> bool:
+        if self.predicate is None and not self.since:
+            return True
+        view = message.selector_view()
+        return view["JMSTimestamp"] >= self.since and (self.predicate is None or self.predicate(view))
+
+class FakeStomp:
+    def __init__(self, latency: float = 0.0, drop_after: Optional[int] = None):
+        self.latency = latency
+        # Close the receiving connection after this many deliveries in total, once
+        self.drop_after = drop_after
+        self.lock = threading.RLock()
+        self.queues: Dict[str, List[FakeMessage]] = {}
+        self.subscriptions: List[Subscription] = []
+        self.connections: Set["_Connection"] = set()
+        self.delivered = 0
+        self.redelivered = 0
+        self.dropped = 0
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self.server: Optional[socketserver.ThreadingTCPServer] = None
+
+    def queue(self, name: str) -> List[FakeMessage]:
+        return self.queues.setdefault(name, [])
+
+    def fill(self, name: str, count: int, headers: Optional[Dict[str, str]] = None, body_size: int = 256) -> List[str]:
+        """
+        Add `count` text messages to a queue, creating it if needed. Returns their IDs.
+        """
+        body = b"x" * body_size
+        with self.lock:
+            ids = [self._add(name, dict(headers or {}), body) for _ in range(count)]
+            self._dispatch()
+        return ids
+
+    def size(self, name: str) -> int:
+        """
+        Messages in a queue, including those delivered but not yet acknowledged.
+        """
+        with self.lock:
+            in_flight = sum(len(s.unacked) for s in self.subscriptions if s.queue_name == name)
+            return len(self.queues.get(name, [])) + in_flight
+
+    def message_ids(self, name: str) -> List[str]:
+        with self.lock:
+            return [m.headers["message-id"] for m in self.queues.get(name, [])]
+
+    def _add(self, name: str, headers: Dict[str, str], body: bytes) -> str:
+        message_id = f"ID:fake-stomp-{next(self._ids)}"
+        headers.update({
+            "message-id": message_id,
+            "timestamp": str(int(time.time() * 1000)),
+        })
+        headers.setdefault("priority", "4")
+        headers.setdefault("persistent", "true")
+        headers.setdefault("expires", "0")
+        self.queue(name).append(FakeMessage(next(self._seq), headers, body))
+        return message_id
+
+    def start(self, port: int = 0) -> int:
+        """
+        Serve on 127.0.0.1 in a background thread. Returns the port.
+        """
+        broker = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                _Connection(broker, self.request).run()
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address[1]
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        with self.lock:
+            for connection in list(self.connections):
+                connection.close()
+
+    def _dispatch(self) -> None:
+        """
+        Push queued messages to subscriptions with room in their prefetch. Call with the lock held.
+        """
+        for subscription in list(self.subscriptions):
+            queue = self.queues.get(subscription.queue_name)
+            position = 0
+            while queue and position < len(queue) and len(subscription.unacked) < subscription.prefetch:
+                message = queue[position]
+                if not subscription.matches(message):
+                    position += 1
+                    continue
+                del queue[position]
+                ack = str(next(self._ids))
+                subscription.unacked.append((ack, message))
+                headers = dict(message.headers, subscription=subscription.id, ack=ack,
+                               destination=f"/queue/{subscription.queue_name}")
+                if message.redelivered:
+                    headers["redelivered"] = "true"
+                self.delivered += 1
+                self.redelivered += message.redelivered
+                if not subscription.connection.send(encode_frame("MESSAGE", headers, message.body)):
+                    break
+                if self.drop_after is not None and self.delivered >= self.drop_after:
+                    self.drop_after = None
+                    self.dropped += 1
+                    subscription.connection.close()
+                    return
+
+    def _release(self, subscription: Subscription) -> None:
+        """
+        End a subscription, returning its unacknowledged messages to the queue. Call with the lock held.
+        """
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        queue = self.queue(subscription.queue_name)
+        for _, message in subscription.unacked:
+            message.redelivered = True
+            insort(queue, message)
+        subscription.unacked = []
+
+    def _handle(self, connection: "_Connection", command: str, headers: Dict[str, str], body: bytes) -> None:
+        if command in ("CONNECT", "STOMP"):
+            connection.send(encode_frame("CONNECTED", {"version": "1.2", "heart-beat": "0,0", "server": "FakeStomp"}))
+        elif command == "SUBSCRIBE":
+            name = headers["destination"].rsplit("/", 1)[-1]
+            prefetch = int(headers.get("activemq.prefetchSize", 1000))
+            subscription = Subscription(connection, headers["id"], name, prefetch, headers.get("selector"))
+            connection.subscriptions[subscription.id] = subscription
+            self.subscriptions.append(subscription)
+        elif command == "UNSUBSCRIBE":
+            subscription = connection.subscriptions.pop(headers["id"], None)
+            if subscription is not None:
+                self._release(subscription)
+        elif command == "ACK":
+            # Client acknowledgement is cumulative: everything delivered up to this frame
+            for subscription in connection.subscriptions.values():
+                acks = [ack for ack, _ in subscription.unacked]
+                if headers["id"] in acks:
+                    del subscription.unacked[:acks.index(headers["id"]) + 1]
+                    break
+            else:
+                connection.send(encode_frame("ERROR", {"message": f"Unknown ack {headers['id']}"}))
+        elif command == "NACK":
+            pass
+        elif command == "SEND":
+            name = headers["destination"].rsplit("/", 1)[-1]
+            kept = {k: v for k, v in headers.items() if k not in ("destination", "receipt", "message-id", "timestamp")}
+            self._add(name, kept, body)
+        elif command == "DISCONNECT":
+            if "receipt" in headers:
+                connection.send(encode_frame("RECEIPT", {"receipt-id": headers["receipt"]}))
+            connection.close()
+            return
+        else:
+            connection.send(encode_frame("ERROR", {"message": f"Unsupported command {command}"}))
+        if "receipt" in headers:
+            connection.send(encode_frame("RECEIPT", {"receipt-id": headers["receipt"]}))
+        self._dispatch()
+
+class _Connection:
+    def __init__(self, broker: FakeStomp, sock: socket.socket):
+        self.broker = broker
+        self.sock = sock
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.closed = False
+
+    def send(self, data: bytes) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.sock.sendall(data)
+            return True
+        except OSError:
+            self.close()
+            return False
+
+    def close(self) -> None:
+        """
+        Drop the connection; its unacknowledged messages go back to their queues.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        with self.broker.lock:
+            for subscription in self.subscriptions.values():
+                self.broker._release(subscription)
+            self.subscriptions = {}
+            self.broker.connections.discard(self)
+            self.broker._dispatch()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def run(self) -> None:
+        with self.broker.lock:
+            self.broker.connections.add(self)
+        buffer = b""
+        try:
+            while not self.closed:
+                try:
+                    data = self.sock.recv(65536)
+                except OSError:
+                    break
+                if not data:
+                    break
+                frames, buffer = decode_frames(buffer + data)
+                for command, headers, body in frames:
+                    if self.broker.latency:
+                        time.sleep(self.broker.latency)
+                    with self.broker.lock:
+                        if self.closed:
+                            break
+                        self.broker._handle(self, command, headers, body)
+        finally:
+            self.close()
@@ -0,0 +1,394 @@
+"""
+Benchmark suite for the client and the Textual screens against the fake Jolokia broker.
+
+    python benchmarks/run.py            # full size: 10k queues, 100k messages
+    python benchmarks/run.py --quick    # 1k queues, 10k messages
+
+Each run is appended to benchmarks/results.jsonl together with the commit it
+ran on, and compared with the latest earlier run of a different commit, so a
+regression shows up as soon as it is introduced.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), "src"))
+
+# The app reads its configuration from ~/.amq_manager; keep the user's untouched
+os.environ["HOME"] = tempfile.mkdtemp(prefix="amq_manager_bench_")
+
+from fake_jolokia import FakeJolokia
+from fake_stomp import FakeStomp
+
+from amq_manager.archive import open_archive
+from amq_manager.batch import BatchExecutor
+from amq_manager.client import ActiveMQClient
+from amq_manager.config import ConnectionConfig, ConfigManager
+from amq_manager.paging import MessagePager
+from amq_manager.queue_index import QueueNameIndex
+from amq_manager.search import SearchIndex
+from amq_manager.snapshot import snapshot_path
+from amq_manager.stomp_transport import StompTransport
+from amq_manager.summary import MessageSummary
+
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, "results.jsonl")
+BIG_QUEUE = "bench.big"
+BATCH_QUEUE = "bench.batch"
+TARGET_QUEUE = "bench.target"
+# --error-rate only fails these, so reads and browsing still complete
+BATCH_OPERATIONS = {"removeMessage(java.lang.String)", "moveMessageTo(java.lang.String,java.lang.String)"}
+# Typed one character at a time into the move dialog; fuzzy, so every ranking tier runs
+SUGGEST_QUERY = "q.0042"
+# A change of more than this fraction in the wrong direction is reported as a regression
+REGRESSION_THRESHOLD = 0.2
+# Scale keys added after earlier runs were recorded, with the value those runs had in effect:
+# the fake broker applied selectors before its browse cap until the cap-first default
+SCALE_DEFAULTS = {"filter_before_cap": True}
+
+def timed(fn: Callable[[], Any]) -> float:
+    """
+    Milliseconds taken by fn().
+    """
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    return min(timed(fn) for _ in range(repeat))
+
+def browse_all(client: ActiveMQClient, queue_name: str, page_size: int, headers_only: bool = False) -> List[Dict[str, Any]]:
+    pager = MessagePager(client, queue_name, page_size=page_size, headers_only=headers_only)
+    pager.fetch_total()
+    messages: List[Dict[str, Any]] = []
+    while pager.has_more:
+        page = pager.next_page()
+        if not page:
+            break
+        messages.extend(page)
+    return messages
+
+def bench_client(broker: FakeJolokia, client: ActiveMQClient, args: argparse.Namespace) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    results["list_queues_ms"] = best_of(args.repeat, client.list_queues)
+    results["list_queues_all_attributes_ms"] = best_of(args.repeat, lambda: client.list_queues(None))
+
+    index = QueueNameIndex(q.get("Name") for q in client.list_queues(["Name"]))
+
+    def type_query() -> None:
+        for i in range(1, len(SUGGEST_QUERY) + 1):
+            index.suggest(SUGGEST_QUERY[:i])
+
+    results["queue_suggest_ms"] = best_of(args.repeat, type_query) / len(SUGGEST_QUERY)
+
+    sent = broker.bytes_sent
+    start = time.perf_counter()
+    loaded = len(browse_all(client, BIG_QUEUE, args.page_size))
+    seconds = time.perf_counter() - start
+    results["browse_kb"] = (broker.bytes_sent - sent) / 1024
+    # Without --filter-before-cap the broker browse cap ends paging early, as on ActiveMQ
+    results["browse_loaded"] = loaded
+    results["browse_messages_per_s"] = loaded / seconds
+    results["browse_all_ms"] = seconds * 1000
+
+    sent = broker.bytes_sent
+    start = time.perf_counter()
+    loaded = len(browse_all(client, BIG_QUEUE, args.page_size, headers_only=True))
+    seconds = time.perf_counter() - start
+    results["browse_headers_per_s"] = loaded / seconds
+    results["browse_headers_kb"] = (broker.bytes_sent - sent) / 1024
+
+    message_ids = broker.fill(BATCH_QUEUE, args.batch)
+    start = time.perf_counter()
+    moved = client.move_messages(message_ids, BATCH_QUEUE, TARGET_QUEUE)
+    results["batch_move_per_s"] = len(moved) / (time.perf_counter() - start)
+    results["batch_move_failed"] = sum(1 for ok in moved.values() if not ok)
+
+    start = time.perf_counter()
+    deleted = client.delete_messages(message_ids, TARGET_QUEUE)
+    results["batch_delete_per_s"] = len(deleted) / (time.perf_counter() - start)
+    results["batch_delete_failed"] = sum(1 for ok in deleted.values() if not ok)
+
+    # The same through BatchExecutor: concurrent chunks, with transient failures retried
+    message_ids = broker.fill(BATCH_QUEUE, args.batch)
+    executor = BatchExecutor(lambda ids: client.move_chunk(ids, BATCH_QUEUE, TARGET_QUEUE), client.bulk_chunk_size, args.workers)
+    start = time.perf_counter()
+    moved = executor.run(message_ids)
+    results["executor_move_per_s"] = len(moved) / (time.perf_counter() - start)
+    results["executor_move_failed"] = sum(1 for ok in moved.values() if not ok)
+
+    executor = BatchExecutor(lambda ids: client.delete_chunk(ids, TARGET_QUEUE), client.bulk_chunk_size, args.workers)
+    start = time.perf_counter()
+    deleted = executor.run(message_ids)
+    results["executor_delete_per_s"] = len(deleted) / (time.perf_counter() - start)
+    results["executor_delete_failed"] = sum(1 for ok in deleted.values() if not ok)
+    return results
+
+def archive_ids(path: str) -> List[str]:
+    with open_archive(path, "r") as f:
+        return [json.loads(line)["JMSMessageID"] for line in f if line.strip()]
+
+def bench_stomp(args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Drain, redrive and requeue throughput against the fake STOMP broker, and a drain
+    whose connection drops mid-window, which must lose no message.
+    """
+    prefetch, ack_window = 500, 100
+    # Half way through, in the middle of an acknowledgement window
+    broker = FakeStomp(drop_after=args.batch // 2 + ack_window // 2)
+    port = broker.start()
+    directory = tempfile.mkdtemp(prefix="amq_manager_bench_stomp_")
+
+    def transport() -> StompTransport:
+        return StompTransport("127.0.0.1", port, "admin", "admin", prefetch=prefetch, ack_window=ack_window)
+
+    results: Dict[str, float] = {}
+    sent = broker.fill(BATCH_QUEUE, args.batch, body_size=args.body_size)
+    interrupted = os.path.join(directory, "interrupted.jsonl")
+    try:
+        with transport() as stomp:
+            stomp.drain_to_file(BATCH_QUEUE, interrupted)
+    except Exception as e:
+        print(f"Drain interrupted as intended: {e}", file=sys.stderr)
+    resumed = os.path.join(directory, "resumed.jsonl")
+    with transport() as stomp:
+        stats = stomp.drain_to_file(BATCH_QUEUE, resumed)
+    drained = archive_ids(interrupted) + archive_ids(resumed)
+    results["stomp_drop_lost"] = len(set(sent) - set(drained)) + broker.size(BATCH_QUEUE)
+    # Unacknowledged when the connection dropped, so delivered again: written twice, never lost
+    results["stomp_drop_redelivered"] = broker.redelivered
+    results["stomp_drain_per_s"] = stats.rate
+
+    broker.fill(BATCH_QUEUE, args.batch, body_size=args.body_size)
+    with transport() as stomp:
+        results["stomp_redrive_per_s"] = stomp.move(BATCH_QUEUE, TARGET_QUEUE, args.batch).rate
+
+    broker.fill(f"DLQ.{TARGET_QUEUE}", args.batch, {"original-destination": f"/queue/{BATCH_QUEUE}"}, args.body_size)
+    with transport() as stomp:
+        results["stomp_requeue_per_s"] = stomp.requeue(f"DLQ.{TARGET_QUEUE}", max_messages=args.batch).rate
+    results["stomp_requeue_left"] = broker.size(f"DLQ.{TARGET_QUEUE}")
+    broker.stop()
+    return results
+
+def import_ms() -> float:
+    """
+    Milliseconds a fresh interpreter takes to import the TUI, as on every start.
+    """
+    code = "import time; start = time.perf_counter(); import amq_manager.ui.app; print((time.perf_counter() - start) * 1000)"
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(BENCHMARK_DIR), "src"))
+    return float(subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout)
+
+async def bench_startup(config: ConnectionConfig, args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Import time, and time from creating the app until the first queue rows are on screen,
+    without and with the snapshot saved by an earlier session.
+    """
+    from textual.widgets import DataTable
+    from amq_manager.ui.app import ActiveMQManagerApp, QueueList
+
+    async def first_rows_ms() -> float:
+        start = time.perf_counter()
+        app = ActiveMQManagerApp()
+        async with app.run_test(size=(160, 50)) as pilot:
+            table = app.query_one(QueueList).query_one(DataTable)
+            while table.row_count == 0:
+                await pilot.pause(0.005)
+            elapsed = (time.perf_counter() - start) * 1000
+            # Let the refresh finish, so it saves the snapshot for the next start
+            await app.workers.wait_for_complete()
+            app.exit()
+        return elapsed
+
+    results: Dict[str, float] = {}
+    results["startup_import_ms"] = min(import_ms() for _ in range(args.repeat))
+    path = snapshot_path(config)
+    if os.path.exists(path):
+        os.remove(path)
+    results["startup_first_rows_ms"] = await first_rows_ms()
+    results["startup_first_rows_cached_ms"] = await first_rows_ms()
+    return results
+
+async def bench_ui(client: ActiveMQClient, args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Render and filter times of QueueList and MessageListScreen, including the repaint that follows.
+    """
+    from amq_manager.ui.app import ActiveMQManagerApp, QueueList
+    from amq_manager.ui.message_list import MessageListScreen
+
+    queues = client.list_queues()
+    listed = browse_all(client, BIG_QUEUE, args.page_size, headers_only=True)
+    tracemalloc.start()
+    messages = [MessageSummary.from_message(m) for m in listed]
+    summary_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del listed
+    # Same counters with every queue's depth changed, as after an auto refresh
+    refreshed = [dict(q, QueueSize=q.get("QueueSize", 0) + 1) for q in queues]
+    filter_text = f"{len(queues) // 2:05d}"
+
+    results: Dict[str, float] = {}
+    app = ActiveMQManagerApp()
+    async with app.run_test(size=(160, 50)) as pilot:
+        queue_list = app.query_one(QueueList)
+        await pilot.pause()
+        await app.workers.wait_for_complete()
+
+        async def measure(name: str, fn: Callable[[], Any]) -> None:
+            start = time.perf_counter()
+            fn()
+            await pilot.pause()
+            results[name] = (time.perf_counter() - start) * 1000
+
+        def load(data: List[Dict[str, Any]]) -> None:
+            queue_list.queues_data = data
+            queue_list.show_queues()
+
+        # Start from an empty table so the first load renders every row
+        await measure("queue_list_clear_ms", lambda: load([]))
+        await measure("queue_list_render_ms", lambda: load(queues))
+        await measure("queue_list_refresh_ms", lambda: load(refreshed))
+        await measure("queue_list_filter_ms", lambda: queue_list.update_table(filter_text))
+        await measure("queue_list_unfilter_ms", lambda: queue_list.update_table(""))
+        del results["queue_list_clear_ms"]
+
+        screen = MessageListScreen(BIG_QUEUE)
+        await app.push_screen(screen)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        # Detach the screen's own pager so scrolling doesn't fetch pages during the measurements
+        screen.pager = None
+
+        def show_messages() -> None:
+            screen.messages_data = messages
+            screen.row_order = {}
+            screen.search_index = SearchIndex()
+            screen.index_rows(messages)
+            screen.update_table(screen.current_filter)
+
+        needle = messages[len(messages) // 2].message_id if messages else ""
+        await measure("message_list_render_ms", show_messages)
+        await measure("message_list_filter_ms", lambda: screen.apply_filter(needle))
+        await measure("message_list_unfilter_ms", lambda: screen.apply_filter(""))
+        results["message_list_rows"] = len(messages)
+        # Memory held per listed message besides its ID, which the table's row keys share
+        results["message_summary_bytes"] = summary_bytes / len(messages) if messages else 0.0
+        app.exit()
+    return results
+
+def git_commit() -> Dict[str, Any]:
+    def git(*command: str) -> str:
+        return subprocess.run(["git", *command], cwd=BENCHMARK_DIR, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "--short", "HEAD") or "unknown", "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def load_runs(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def previous_run(runs: List[Dict[str, Any]], run: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The latest earlier run at the same scale on another commit.
+    """
+    scale = {**SCALE_DEFAULTS, **run["scale"]}
+    for earlier in reversed(runs):
+        if {**SCALE_DEFAULTS, **earlier["scale"]} == scale and earlier["commit"] != run["commit"]:
+            return earlier
+    return None
+
+def report(run: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> int:
+    """
+    Print the results, compared with the baseline run if there is one. Returns the number of regressions.
+    """
+    regressions = 0
+    if baseline:
+        print(f"compared with {baseline['commit']} ({baseline['date']})")
+    for name, value in run["results"].items():
+        line = f"{name:34} {value:12.1f}"
+        old = baseline["results"].get(name) if baseline else None
+        if old:
+            change = (value - old) / old
+            # Durations regress when they grow, throughputs when they shrink
+            worse = change > REGRESSION_THRESHOLD if name.endswith("_ms") else change < -REGRESSION_THRESHOLD
+            worse = worse and (name.endswith("_ms") or name.endswith("_per_s"))
+            line += f"  {change:+7.1%}{'  REGRESSION' if worse else ''}"
+            regressions += worse
+        print(line)
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark amq_manager against a fake Jolokia broker")
+    parser.add_argument("--queues", type=int, default=10000, help="Queues on the broker (queue list benchmarks)")
+    parser.add_argument("--messages", type=int, default=100000, help="Messages in the browsed queue")
+    parser.add_argument("--batch", type=int, default=5000, help="Messages moved and deleted by the batch benchmarks")
+    parser.add_argument("--body-size", type=int, default=256, help="Message body size in bytes")
+    parser.add_argument("--page-size", type=int, default=200, help="Browse page size")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent bulk requests of the executor benchmarks")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every HTTP request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of per-message move and delete requests that fail")
+    parser.add_argument("--filter-before-cap", action="store_true",
+                        help="Let the fake broker apply browse selectors before its page cap, so paging reaches the whole queue")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions of the short benchmarks; the best is kept")
+    parser.add_argument("--quick", action="store_true", help="Run at a tenth of the default size")
+    parser.add_argument("--no-ui", action="store_true", help="Skip the Textual benchmarks")
+    parser.add_argument("--no-save", action="store_true", help=f"Don't append the results to {os.path.relpath(RESULTS_FILE)}")
+    parser.add_argument("--results", default=RESULTS_FILE, help="Results file")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 if any result regressed")
+    args = parser.parse_args()
+    if args.quick:
+        args.queues //= 10
+        args.messages //= 10
+        args.batch //= 10
+
+    print(f"Setting up {args.queues} queues and {args.messages} messages...", file=sys.stderr)
+    broker = FakeJolokia(args.queues, 0, args.body_size, args.latency, args.error_rate, BATCH_OPERATIONS,
+                         filter_before_cap=args.filter_before_cap)
+    broker.fill(BIG_QUEUE, args.messages)
+    port = broker.start()
+    config = ConnectionConfig("Benchmark", "127.0.0.1", port, "admin", "admin", is_default=True)
+    # The UI benchmarks run the real app, which connects to the default connection
+    config_manager = ConfigManager()
+    config_manager.connections = [config]
+    config_manager.save_config()
+    client = ActiveMQClient.from_config(config)
+    # Full-size reads take longer than the interactive default
+    client.timeout = 60
+
+    results = bench_client(broker, client, args)
+    results.update(bench_stomp(args))
+    if not args.no_ui:
+        results.update(asyncio.run(bench_startup(config, args)))
+        results.update(asyncio.run(bench_ui(client, args)))
+    client.close()
+    broker.stop()
+
+    run = {
+        **git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "scale": {
+            "queues": args.queues, "messages": args.messages, "batch": args.batch, "body_size": args.body_size,
+            "latency": args.latency, "error_rate": args.error_rate, "filter_before_cap": args.filter_before_cap,
+        },
+        "results": {name: round(value, 2) for name, value in results.items()},
+    }
+    runs = load_runs(args.results)
+    regressions = report(run, previous_run(runs, run))
+    if not args.no_save:
+        with open(args.results, "a") as f:
+            f.write(json.dumps(run) + "\n")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Push-based queue discovery through ActiveMQ advisory topics.
+
+The broker publishes a message on ActiveMQ.Advisory.Queue whenever a queue is
+created or destroyed (and replays the existing queues to a new subscriber), and
+on ActiveMQ.Advisory.Consumer.Queue.<name> / Producer.Queue.<name> whenever a
+consumer or producer comes or goes. Subscribing once over STOMP keeps a
+QueueRegistry current without reading the MBean tree.
+"""
+from dataclasses import dataclass
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+import stomp
+
+from amq_manager.stomp_transport import ConnectionFactory, default_connection_factory
+
+if TYPE_CHECKING:
+    from amq_manager.config import ConnectionConfig
+
+logger = logging.getLogger(__name__)
+
+QUEUE_ADVISORY = "/topic/ActiveMQ.Advisory.Queue"
+CONSUMER_ADVISORY_PREFIX = "/topic/ActiveMQ.Advisory.Consumer.Queue."
+PRODUCER_ADVISORY_PREFIX = "/topic/ActiveMQ.Advisory.Producer.Queue."
+# DestinationInfo.operationType
+ADD_OPERATION = 0
+REMOVE_OPERATION = 1
+
+@dataclass
+class QueueEvent:
+    kind: str  # "added", "removed", "consumers", "producers" or "disconnected"
+    name: str = ""
+    count: Optional[int] = None
+
+def _find_key(data: Any, key: str) -> Any:
+    """
+    Depth-first search for a key in decoded JSON.
+    """
+    if isinstance(data, dict):
+        if key in data:
+            return data[key]
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+def parse_advisory(frame: Any) -> Optional[QueueEvent]:
+    """
+    Turn an advisory MESSAGE frame into a QueueEvent, or None if it is not about a queue.
+    """
+    destination = frame.headers.get("destination", "")
+    if destination.startswith(CONSUMER_ADVISORY_PREFIX):
+        count = frame.headers.get("consumerCount")
+        return QueueEvent("consumers", destination[len(CONSUMER_ADVISORY_PREFIX):], int(count) if count else None)
+    if destination.startswith(PRODUCER_ADVISORY_PREFIX):
+        count = frame.headers.get("producerCount")
+        return QueueEvent("producers", destination[len(PRODUCER_ADVISORY_PREFIX):], int(count) if count else None)
+    if destination != QUEUE_ADVISORY:
+        return None
+
+    # With `transformation: jms-advisory-json` the body is the DestinationInfo as JSON
+    body = frame.body.decode("utf-8") if isinstance(frame.body, bytes) else frame.body
+    try:
+        info = json.loads(body)
+    except (TypeError, ValueError):
+        logger.warning(f"Unreadable queue advisory: {body!r:.200}")
+        return None
+    name = _find_key(info, "physicalName")
+    operation = _find_key(info, "operationType")
+    if not name or operation not in (ADD_OPERATION, REMOVE_OPERATION):
+        return None
+    return QueueEvent("added" if operation == ADD_OPERATION else "removed", name)
+
+class QueueRegistry:
+    """
+    Queues known from advisories, with their consumer and producer counts. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queues: Dict[str, Dict[str, Any]] = {}
+
+    def seed(self, queues: List[Dict[str, Any]]) -> None:
+        """
+        Start from a full listing, e.g. the result of list_queues.
+        """
+        with self._lock:
+            self.queues = {
+                q.get("Name", "Unknown"): {"Name": q.get("Name", "Unknown"), "ConsumerCount": q.get("ConsumerCount", 0)}
+                for q in queues
+            }
+
+    def apply(self, event: QueueEvent) -> bool:
+        """
+        Update the registry. Returns False when the event changed nothing (e.g. a replayed queue).
+        """
+        with self._lock:
+            entry = self.queues.get(event.name)
+            if event.kind == "added":
+                if entry is not None:
+                    return False
+                self.queues[event.name] = {"Name": event.name}
+                return True
+            if event.kind == "removed":
+                return self.queues.pop(event.name, None) is not None
+            if event.kind in ("consumers", "producers") and event.count is not None:
+                field = "ConsumerCount" if event.kind == "consumers" else "ProducerCount"
+                if entry is None:
+                    entry = self.queues[event.name] = {"Name": event.name}
+                if entry.get(field) == event.count:
+                    return False
+                entry[field] = event.count
+                return True
+            return False
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self.queues)
+
+    def consumer_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: entry.get("ConsumerCount", 0) for name, entry in self.queues.items()}
+
+class AdvisoryListener(stomp.ConnectionListener):
+    """
+    Subscribes to the queue advisory topics and applies every event to a QueueRegistry.
+
+    `on_event` is called from the STOMP receiver thread for each event that changed the registry.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, ssl: bool = False,
+                 registry: Optional[QueueRegistry] = None, on_event: Optional[Callable[[QueueEvent], None]] = None,
+                 consumers: bool = True, producers: bool = False,
+                 connection_factory: Optional[ConnectionFactory] = None):
+        self.host_and_ports = [(host, port)]
+        self.user = user
+        self.password = password
+        self.ssl = ssl
+        self.registry = registry or QueueRegistry()
+        self.on_event = on_event
+        self.consumers = consumers
+        self.producers = producers
+        self.connection_factory = connection_factory or default_connection_factory
+        self.conn = None
+        self._stopping = False
+
+    @classmethod
+    def from_config(cls, config: "ConnectionConfig", **kwargs) -> "AdvisoryListener":
+        return cls(config.host, config.stomp_port, config.user, config.password, config.ssl, **kwargs)
+
+    def start(self) -> None:
+        """
+        Connect and subscribe. Blocks until the broker accepted the connection.
+        """
+        self._stopping = False
+        self.conn = self.connection_factory(self.host_and_ports, self.ssl)
+        self.conn.set_listener("", self)
+        host, port = self.host_and_ports[0]
+        try:
+            self.conn.connect(self.user, self.password, wait=True)
+        except stomp.exception.ConnectFailedException:
+            self.conn = None
+            raise Exception(f"Could not connect to STOMP at {host}:{port}")
+        headers = {"transformation": "jms-advisory-json"}
+        self.conn.subscribe(QUEUE_ADVISORY, "queues", ack="auto", headers=headers)
+        if self.consumers:
+            self.conn.subscribe(CONSUMER_ADVISORY_PREFIX + ">", "consumers", ack="auto", headers=headers)
+        if self.producers:
+            self.conn.subscribe(PRODUCER_ADVISORY_PREFIX + ">", "producers", ack="auto", headers=headers)
+        logger.info(f"Listening for queue advisories on {host}:{port}")
+
+    def is_connected(self) -> bool:
+        return self.conn is not None and self.conn.is_connected()
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self.conn is not None and self.conn.is_connected():
+            self.conn.disconnect()
+        self.conn = None
+
+    def on_message(self, frame) -> None:
+        event = parse_advisory(frame)
+        if event is not None and self.registry.apply(event) and self.on_event:
+            self.on_event(event)
+
+    def on_error(self, frame) -> None:
+        logger.error(f"Advisory listener error: {frame.headers.get('message')}")
+
+    def on_disconnected(self) -> None:
+        if not self._stopping:
+            logger.warning("Advisory listener lost its connection")
+            if self.on_event:
+                self.on_event(QueueEvent("disconnected"))
@@ -0,0 +1,239 @@
+"""
+Concurrent execution of per-message operations (move, delete) in bulk chunks.
+
+IDs are split into chunks of one Jolokia bulk request each, and a bounded pool
+of threads sends several chunks at a time. A token bucket caps the number of
+messages per second, so a large batch can't swamp a production broker. Failures
+that show the operation never ran are retried with exponential backoff; anything
+the broker may already have applied, or refused (e.g. a message that is already
+gone), is not.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+from amq_manager.stats import format_duration
+
+if TYPE_CHECKING:
+    from amq_manager.config import ConnectionConfig
+
+logger = logging.getLogger(__name__)
+
+# Runs one chunk: message ID -> True (done), False (refused) or None (retry); raises if the request failed
+ChunkTask = Callable[[List[str]], Dict[str, Optional[bool]]]
+
+@dataclass
+class BatchProgress:
+    total: int
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0  # messages sent again after a transient failure
+    cancelled: bool = False
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def rate(self) -> float:
+        """
+        Messages processed per second so far.
+        """
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """
+        Seconds until all messages are processed at the current rate, or None before the first chunk.
+        """
+        rate = self.rate
+        return (self.total - self.done) / rate if rate > 0 else None
+
+class RateLimiter:
+    """
+    Token bucket of `rate` tokens per second, holding at most `burst` tokens.
+
+    reserve(n) may take more than the bucket holds: the caller then waits for
+    the shortfall to refill, so large chunks still average out to `rate`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float) -> float:
+        """
+        Take n tokens, returning the seconds to wait before using them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether a failed bulk request is safe to send again: only if it never ran. That is
+    a connection that could not be opened, or a 502/503/504 from a proxy or a broker
+    that turned the request away. Anything else, a read timeout or a dropped
+    connection included, may come after the broker applied the operations.
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in (502, 503, 504)
+    if isinstance(error, requests.ConnectionError):
+        # urllib3 wraps the cause in MaxRetryError; NewConnectionError is a ConnectTimeoutError too
+        reason = getattr(error.args[0], "reason", error.args[0]) if error.args else None
+        return isinstance(error, requests.exceptions.ConnectTimeout) or isinstance(reason, ConnectTimeoutError)
+    return False
+
+class BatchExecutor:
+    """
+    Run a chunk task over many message IDs with a bounded thread pool.
+
+    on_progress is called with a copy of the progress after every chunk, and
+    on_chunk with the final results of every chunk; both from pool threads,
+    one call at a time.
+    """
+
+    def __init__(self, task: ChunkTask, chunk_size: int = 200, workers: int = 4, max_rate: float = 0.0,
+                 retries: int = 3, backoff: float = 0.2,
+                 on_progress: Optional[Callable[[BatchProgress], None]] = None,
+                 on_chunk: Optional[Callable[[Dict[str, bool]], None]] = None):
+        self.task = task
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.on_progress = on_progress
+        self.on_chunk = on_chunk
+        # max_rate is in messages per second; 0 means no limit
+        self.limiter = RateLimiter(max_rate) if max_rate > 0 else None
+        # Chunks no larger than one second's worth keep the rate and the progress smooth
+        self.chunk_size = max(1, min(chunk_size, int(max_rate))) if max_rate > 0 else max(1, chunk_size)
+        self.progress = BatchProgress(0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._cancelled: Optional[Callable[[], bool]] = None
+
+    @classmethod
+    def from_config(cls, config: "ConnectionConfig", task: ChunkTask, **kwargs) -> "BatchExecutor":
+        """
+        Build an executor with the chunk size, concurrency, rate limit and retries of a saved connection.
+        """
+        return cls(
+            task,
+            chunk_size=config.bulk_chunk_size,
+            workers=config.batch_workers,
+            max_rate=config.batch_max_rate,
+            retries=config.batch_retries,
+            **kwargs,
+        )
+
+    def cancel(self) -> None:
+        """
+        Stop starting chunks. Chunks already sent complete and are reported.
+        """
+        self._stop.set()
+
+    def run(self, message_ids: List[str], cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, bool]:
+        """
+        Process all IDs and return message ID -> success for each one attempted.
+        IDs skipped because the batch was cancelled are left out.
+        """
+        self.progress = BatchProgress(len(message_ids))
+        self._cancelled = cancelled
+        results: Dict[str, bool] = {}
+        pending = list(message_ids)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            try:
+                for attempt in range(self.retries + 1):
+                    if attempt:
+                        # Transient failures are retried together, in as few chunks as possible,
+                        # after a pause that doubles with every pass
+                        if not self._sleep(self.backoff * 2 ** (attempt - 1)):
+                            break
+                        with self._lock:
+                            self.progress.retried += len(pending)
+                    chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+                    pending = []
+                    for done, transient in pool.map(self._run_chunk, chunks):
+                        results.update(done)
+                        pending.extend(transient)
+                    if not pending:
+                        break
+            except BaseException:
+                # E.g. Ctrl+C: let the queued chunks return at once instead of running them
+                self.cancel()
+                raise
+        if pending and not self.stopped():
+            logger.error(f"{len(pending)} messages still failing after {self.retries} retries")
+            failed = {message_id: False for message_id in pending}
+            results.update(failed)
+            self._report(failed)
+        self.progress.cancelled = self.stopped()
+        return results
+
+    def stopped(self) -> bool:
+        if not self._stop.is_set() and self._cancelled is not None and self._cancelled():
+            self._stop.set()
+        return self._stop.is_set()
+
+    def _run_chunk(self, chunk: List[str]) -> Tuple[Dict[str, bool], List[str]]:
+        """
+        Send one chunk. Returns the final results, and the IDs that failed transiently.
+        """
+        if self.stopped():
+            return {}, []
+        if self.limiter is not None and not self._sleep(self.limiter.reserve(len(chunk))):
+            return {}, []
+        try:
+            outcome = self.task(chunk)
+        except Exception as e:
+            if not is_transient(e):
+                logger.error(f"Bulk request for {len(chunk)} messages failed: {e}")
+                outcome = {message_id: False for message_id in chunk}
+            else:
+                logger.warning(f"Bulk request for {len(chunk)} messages failed, will retry: {e}")
+                outcome = {message_id: None for message_id in chunk}
+        results = {message_id: ok for message_id, ok in outcome.items() if ok is not None}
+        self._report(results)
+        return results, [message_id for message_id in chunk if outcome.get(message_id) is None]
+
+    def _sleep(self, seconds: float) -> bool:
+        """
+        Wait, waking early when the batch is cancelled. Returns False if it was.
+        """
+        deadline = time.monotonic() + seconds
+        while not self.stopped():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            self._stop.wait(min(remaining, 0.1))
+        return False
+
+    def _report(self, results: Dict[str, bool]) -> None:
+        with self._lock:
+            succeeded = sum(results.values())
+            self.progress.succeeded += succeeded
+            self.progress.failed += len(results) - succeeded
+            if self.on_chunk is not None and results:
+                self.on_chunk(results)
+            if self.on_progress is not None:
+                self.on_progress(replace(self.progress))
+
+def format_progress(progress: BatchProgress) -> str:
+    text = f"{progress.done}/{progress.total} done, {progress.failed} failed, {progress.rate:.0f} msg/s"
+    if progress.eta is not None and progress.done < progress.total:
+        text += f", ETA {format_duration(progress.eta)}"
+    return text
@@ -0,0 +1,237 @@
+"""
+Lazy formatting of message bodies for display.
+
+Formatters are generators that yield display lines as they tokenize the body,
+so the first screen of a multi-megabyte JSON or XML document is ready after
+formatting only its first few kilobytes. FormattedBody keeps the lines produced
+so far and pulls more only when the viewer scrolls or searches past them.
+"""
+import base64
+from collections import OrderedDict, deque
+import re
+import threading
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*(?:"|$)|[{}\[\],:]|[^\s{}\[\],:"]+', re.S)
+XML_TOKEN = re.compile(r"<!\[CDATA\[.*?\]\]>|<!--.*?-->|<[^>]*>?|[^<]+", re.S)
+# Control characters would break the terminal layout; tabs are expanded separately
+CONTROL_CHARS = {c: "·" for c in range(32) if c != 9}
+CONTROL_CHARS[127] = "·"
+
+Payload = Union[str, bytes]
+
+def message_body(message: Dict[str, Any]) -> Optional[Payload]:
+    """
+    The body of a browsed or archived message: text for text messages, bytes for bytes messages.
+    """
+    if message.get("Text") is not None:
+        return str(message["Text"])
+    if message.get("BodyBase64") is not None:
+        return base64.b64decode(message["BodyBase64"])
+    preview = message.get("BodyPreview")
+    if isinstance(preview, list):
+        # Browse returns the first bytes of a bytes message as signed Java bytes
+        return bytes(b & 0xFF for b in preview)
+    if message.get("Body") is not None:
+        return str(message["Body"])
+    return None
+
+def detect_format(text: str) -> str:
+    """
+    "json", "xml" or "text", judged by the first non-blank character.
+    """
+    start = text[:64].lstrip()[:1]
+    if start in ("{", "["):
+        return "json"
+    if start == "<":
+        return "xml"
+    return "text"
+
+def text_lines(text: str) -> Iterator[str]:
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            if start < len(text):
+                yield text[start:].rstrip("\r")
+            return
+        yield text[start:end].rstrip("\r")
+        start = end + 1
+
+def json_lines(text: str, indent: int = 2) -> Iterator[str]:
+    """
+    Pretty-print JSON token by token. Invalid JSON is still laid out on a best-effort basis.
+    """
+    pad = " " * indent
+    tokens = (m.group() for m in JSON_TOKEN.finditer(text))
+    depth = 0
+    line = ""
+    token = next(tokens, None)
+    while token is not None:
+        following = next(tokens, None)
+        if token in ("{", "["):
+            if following in ("}", "]"):
+                # Keep empty containers on one line
+                line += token + following
+                following = next(tokens, None)
+            else:
+                yield pad * depth + line + token
+                depth += 1
+                line = ""
+        elif token in ("}", "]"):
+            if line:
+                yield pad * depth + line
+            depth = max(depth - 1, 0)
+            line = token
+        elif token == ",":
+            yield pad * depth + line + ","
+            line = ""
+        elif token == ":":
+            line += ": "
+        else:
+            line += token
+        token = following
+    if line:
+        yield pad * depth + line
+
+class _Peekable:
+    def __init__(self, iterator: Iterator[str]):
+        self.iterator = iterator
+        self.buffer: Deque[str] = deque()
+
+    def peek(self, n: int = 0) -> Optional[str]:
+        while len(self.buffer) <= n:
+            item = next(self.iterator, None)
+            if item is None:
+                return None
+            self.buffer.append(item)
+        return self.buffer[n]
+
+    def next(self) -> Optional[str]:
+        return self.buffer.popleft() if self.buffer else next(self.iterator, None)
+
+def xml_lines(text: str, indent: int = 2) -> Iterator[str]:
+    """
+    Indent XML tag by tag. An element holding only text stays on one line.
+    """
+    pad = " " * indent
+    tokens = _Peekable(m.group() for m in XML_TOKEN.finditer(text))
+    depth = 0
+    while True:
+        token = tokens.next()
+        if token is None:
+            return
+        if not token.startswith("<"):
+            for part in token.strip().splitlines():
+                yield pad * depth + part.strip()
+        elif token.startswith("</"):
+            depth = max(depth - 1, 0)
+            yield pad * depth + token
+        elif token.startswith(("<?", "<!")) or token.endswith("/>"):
+            yield pad * depth + token
+        else:
+            content, closing = tokens.peek(0), tokens.peek(1)
+            inline = content is not None and not content.startswith("<") and "\n" not in content.strip()
+            if inline and closing is not None and closing.startswith("</"):
+                tokens.next()
+                tokens.next()
+                yield pad * depth + token + content.strip() + closing
+            else:
+                yield pad * depth + token
+                depth += 1
+
+def hex_lines(data: bytes, width: int = 16) -> Iterator[str]:
+    for offset in range(0, len(data), width):
+        chunk = data[offset:offset + width]
+        hex_part = " ".join(f"{b:02x}" for b in chunk)
+        ascii_part = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
+        yield f"{offset:08x}  {hex_part:<{width * 3 - 1}}  |{ascii_part}|"
+
+def format_lines(payload: Payload, mode: str) -> Tuple[str, Iterator[str]]:
+    """
+    Return (description, line iterator) for a body in "pretty", "raw" or "hex" mode.
+    """
+    if mode == "hex" or isinstance(payload, bytes) and mode == "pretty":
+        data = payload if isinstance(payload, bytes) else payload.encode("utf-8")
+        return f"hex, {len(data)} bytes", hex_lines(data)
+    text = payload if isinstance(payload, str) else payload.decode("utf-8", errors="replace")
+    if mode == "pretty":
+        kind = detect_format(text)
+        if kind == "json":
+            return f"JSON, {len(text)} chars", json_lines(text)
+        if kind == "xml":
+            return f"XML, {len(text)} chars", xml_lines(text)
+    return f"text, {len(text)} chars", text_lines(text)
+
+class FormattedBody:
+    """
+    The lines of a formatted body, produced on demand.
+    """
+
+    def __init__(self, lines: Iterator[str], description: str = ""):
+        self.description = description
+        self.lines: List[str] = []
+        self.width = 0  # longest line produced so far
+        self.complete = False
+        self._source = lines
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_payload(cls, payload: Payload, mode: str) -> "FormattedBody":
+        description, lines = format_lines(payload, mode)
+        return cls(lines, description)
+
+    def fetch(self, count: int) -> int:
+        """
+        Make sure at least `count` lines are produced, if the body has that many. Returns the lines available.
+        """
+        with self._lock:
+            while len(self.lines) < count and not self.complete:
+                line = next(self._source, None)
+                if line is None:
+                    self.complete = True
+                    break
+                line = line.expandtabs(4).translate(CONTROL_CHARS)
+                self.lines.append(line)
+                self.width = max(self.width, len(line))
+            return len(self.lines)
+
+    def find(self, query: str, line: int = 0, column: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Case-insensitive search from (line, column), wrapping around once. Lines are only
+        produced up to the match.
+        """
+        query = query.lower()
+        if not query:
+            return None
+        i = line
+        while self.fetch(i + 1) > i:
+            position = self.lines[i].lower().find(query, column if i == line else 0)
+            if position >= 0:
+                return i, position
+            i += 1
+        for i in range(0, min(line + 1, len(self.lines))):
+            position = self.lines[i].lower().find(query)
+            if position >= 0 and (i < line or position < column):
+                return i, position
+        return None
+
+class BodyCache:
+    """
+    Formatted bodies per (message ID, mode), least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], FormattedBody]" = OrderedDict()
+
+    def get(self, message_id: str, mode: str, payload: Payload) -> FormattedBody:
+        key = (message_id, mode)
+        body = self.entries.get(key)
+        if body is None:
+            body = self.entries[key] = FormattedBody.from_payload(payload, mode)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return body
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from amq_manager.paging import MessagePager
+from amq_manager.summary import MessageSummary
+
+# Counters that change whenever a queue's content changes; read to validate a cached browse
+VERSION_ATTRIBUTES = ["EnqueueCount", "DequeueCount", "QueueSize"]
+
+QueueVersion = Tuple[int, int, int]
+
+def queue_version(attributes: Dict[str, Any]) -> QueueVersion:
+    return (
+        int(attributes.get("EnqueueCount", 0)),
+        int(attributes.get("DequeueCount", 0)),
+        int(attributes.get("QueueSize", 0)),
+    )
+
+@dataclass
+class CachedBrowse:
+    version: QueueVersion
+    messages: List[MessageSummary]
+    pager: MessagePager  # continues paging where the cached messages end
+    size: int = 0
+
+class BrowseCache:
+    """
+    Browse results per (queue, selector), valid as long as the queue's counters are unchanged.
+
+    A queue's EnqueueCount, DequeueCount and QueueSize change with every message added or
+    removed, so comparing them (one cheap attribute read) tells whether a cached browse is
+    still accurate. Our own deletes and moves are applied to the cached messages and to the
+    expected counters, so they don't force a refetch. Entries are evicted least recently
+    used first once the estimated size exceeds max_bytes. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Tuple[str, str], CachedBrowse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, queue_name: str, selector: str, version: QueueVersion) -> Optional[CachedBrowse]:
+        """
+        Return the cached browse if the queue still has the given counters; drop it otherwise.
+        """
+        key = (queue_name, selector)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version:
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, queue_name: str, selector: str, version: QueueVersion,
+            messages: List[MessageSummary], pager: MessagePager) -> None:
+        key = (queue_name, selector)
+        with self._lock:
+            if key in self.entries:
+                self._drop(key)
+            entry = CachedBrowse(version, list(messages), pager, sum(m.size() for m in messages))
+            self.entries[key] = entry
+            self.size += entry.size
+            self._evict()
+
+    def extend(self, queue_name: str, selector: str, pager: MessagePager, messages: List[MessageSummary]) -> None:
+        """
+        Add a later page to the entry that was cached with this pager.
+        """
+        key = (queue_name, selector)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.pager is not pager:
+                return
+            entry.messages.extend(messages)
+            added = sum(m.size() for m in messages)
+            entry.size += added
+            self.size += added
+            self._evict()
+
+    def remove_messages(self, queue_name: str, message_ids: Iterable[str]) -> None:
+        """
+        Apply messages we deleted or moved away: drop them from every cached browse of the
+        queue and expect the broker to count them as dequeued.
+        """
+        removed_ids = set(message_ids)
+        if not removed_ids:
+            return
+        n = len(removed_ids)
+        with self._lock:
+            for (name, _), entry in self.entries.items():
+                if name != queue_name:
+                    continue
+                dropped = [m for m in entry.messages if m.message_id in removed_ids]
+                if dropped:
+                    entry.messages = [m for m in entry.messages if m.message_id not in removed_ids]
+                    freed = sum(m.size() for m in dropped)
+                    entry.size -= freed
+                    self.size -= freed
+                    entry.pager.loaded -= len(dropped)
+                enqueued, dequeued, size = entry.version
+                entry.version = (enqueued, dequeued + n, size - n)
+                if entry.pager.total is not None:
+                    entry.pager.total -= n
+
+    def invalidate(self, queue_name: str) -> None:
+        """
+        Forget every cached browse of a queue, e.g. after a selector-based operation.
+        """
+        with self._lock:
+            for key in [k for k in self.entries if k[0] == queue_name]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        self.size -= self.entries.pop(key).size
+
+    def _evict(self) -> None:
+        # Keep the most recent entry even if it alone exceeds the cap
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            self._drop(next(iter(self.entries)))
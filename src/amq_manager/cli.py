@@ -0,0 +1,334 @@
+"""
+Headless command line interface.
+
+Every command writes JSON Lines to stdout as results arrive, so output can be
+piped into jq or back into another command. Commands that act on individual
+messages read message IDs from stdin: either one ID per line, or JSON objects
+with a JMSMessageID field (the output of `browse`).
+
+This module must not import Textual, so scripts and cron jobs start quickly.
+"""
+import argparse
+from dataclasses import replace
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from amq_manager.archive import TransferStats, export_queue, import_queue
+from amq_manager.batch import BatchExecutor, BatchProgress, ChunkTask, format_progress
+from amq_manager.client import ActiveMQClient, OperationPending, QUEUE_LIST_ATTRIBUTES
+from amq_manager.config import ConfigManager, ConnectionConfig
+from amq_manager.paging import MessagePager
+from amq_manager.stats import QueueSampler
+from amq_manager.stomp_transport import StompTransport
+
+def emit(record: Dict[str, Any], out: TextIO = sys.stdout) -> None:
+    out.write(json.dumps(record, default=str) + "\n")
+    out.flush()
+
+def read_message_ids(stream: TextIO) -> Iterator[str]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            message_id = json.loads(line).get("JMSMessageID")
+            if message_id:
+                yield message_id
+        else:
+            yield line
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="amq-manager",
+        description="Manage ActiveMQ brokers. Without a command, starts the TUI.",
+    )
+    parser.add_argument("--connection", help="Saved connection name (default: the default connection)")
+    parser.add_argument("--host", help="Broker host; overrides the saved connection")
+    parser.add_argument("--port", type=int, default=8161)
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--ssl", action="store_true", help="Use HTTPS")
+    parser.add_argument("--context-path", default="/api/jolokia")
+    parser.add_argument("--stomp-port", type=int, help="STOMP port for drain/redrive/requeue (default: from the connection, 61613)")
+    parser.add_argument("--metrics-textfile", help="Write request metrics in Prometheus text format to this file on exit (default: from the connection)")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    list_queues = commands.add_parser("list-queues", help="List queues and their stats")
+    list_queues.add_argument("--all-attributes", action="store_true", help="Read every queue attribute")
+
+    browse = commands.add_parser("browse", help="Stream the messages of a queue")
+    browse.add_argument("queue")
+    browse.add_argument("--selector", default="", help="JMS selector")
+    browse.add_argument("--limit", type=int, help="Stop after this many messages")
+    browse.add_argument("--headers-only", action="store_true", help="Only list ID, timestamp, priority, redelivered and type")
+
+    # Per-message move and delete run chunks concurrently through BatchExecutor
+    batch_options = argparse.ArgumentParser(add_help=False)
+    batch_options.add_argument("--workers", type=int, help="Bulk requests in flight at once (default: batch_workers)")
+    batch_options.add_argument("--max-rate", type=float, help="Messages per second at most, 0 for no limit (default: batch_max_rate)")
+
+    move = commands.add_parser("move", parents=[batch_options], help="Move messages (IDs from stdin, or --selector/--all)")
+    move.add_argument("source")
+    move.add_argument("target")
+    move.add_argument("--selector", help="Move every message matching this selector inside the broker")
+    move.add_argument("--all", action="store_true", help="Move the whole queue inside the broker")
+
+    delete = commands.add_parser("delete", parents=[batch_options], help="Delete messages (IDs from stdin, or --selector)")
+    delete.add_argument("queue")
+    delete.add_argument("--selector", help="Delete every message matching this selector inside the broker")
+
+    purge = commands.add_parser("purge", help="Remove all messages from a queue")
+    purge.add_argument("queue")
+
+    export = commands.add_parser("export", help="Snapshot a queue to a JSON Lines archive (.gz, .zst or plain)")
+    export.add_argument("queue")
+    export.add_argument("file")
+    export.add_argument("--selector", default="", help="JMS selector")
+
+    import_ = commands.add_parser("import", help="Send the text messages of an archive to a queue")
+    import_.add_argument("file")
+    import_.add_argument("queue")
+    import_.add_argument("--chunk-size", type=int, help="Messages per bulk request (default: bulk_chunk_size)")
+
+    # Data plane commands consume over STOMP instead of browsing over Jolokia
+    stomp_options = argparse.ArgumentParser(add_help=False)
+    stomp_options.add_argument("--max", type=int, help="Stop after this many messages")
+    stomp_options.add_argument("--selector", help="JMS selector")
+    stomp_options.add_argument("--prefetch", type=int, default=500, help="activemq.prefetchSize of the subscription")
+    stomp_options.add_argument("--ack-window", type=int, default=100, help="Messages per acknowledgement")
+
+    drain = commands.add_parser("drain", parents=[stomp_options], help="Consume messages into an archive over STOMP (removes them)")
+    drain.add_argument("queue")
+    drain.add_argument("file")
+
+    redrive = commands.add_parser("redrive", parents=[stomp_options], help="Consume messages and republish them to another queue over STOMP")
+    redrive.add_argument("source")
+    redrive.add_argument("target")
+
+    requeue = commands.add_parser("requeue", parents=[stomp_options], help="Send dead letters back to their original queue over STOMP")
+    requeue.add_argument("dlq")
+    requeue.add_argument("--target", help="Queue for messages without an original destination")
+
+    stats = commands.add_parser("stats", help="Sample queue counters and report rates")
+    stats.add_argument("queues", nargs="*", help="Queues to report (default: all)")
+    stats.add_argument("--interval", type=float, default=5.0, help="Seconds between samples")
+    stats.add_argument("--count", type=int, default=1, help="Number of reports (0 = forever)")
+    return parser
+
+def connection_from_args(args: argparse.Namespace) -> Optional[ConnectionConfig]:
+    if args.host:
+        config = ConnectionConfig("cli", args.host, args.port, args.user, args.password,
+                                  ssl=args.ssl, context_path=args.context_path)
+    else:
+        config_manager = ConfigManager()
+        if args.connection:
+            config = next((c for c in config_manager.connections if c.name == args.connection), None)
+        else:
+            config = config_manager.get_default_connection()
+    if config is not None and args.stomp_port:
+        config = replace(config, stomp_port=args.stomp_port)
+    if config is not None and getattr(args, "workers", None):
+        config = replace(config, batch_workers=args.workers)
+    if config is not None and getattr(args, "max_rate", None) is not None:
+        config = replace(config, batch_max_rate=args.max_rate)
+    return config
+
+def cmd_list_queues(client: ActiveMQClient, args: argparse.Namespace) -> int:
+    # Each queue is printed as soon as it is decoded, not after the whole listing arrived
+    for q in client.iter_queues(None if args.all_attributes else QUEUE_LIST_ATTRIBUTES):
+        emit(q)
+    return 0
+
+def cmd_browse(client: ActiveMQClient, args: argparse.Namespace) -> int:
+    pager = MessagePager(client, args.queue, args.selector, headers_only=args.headers_only)
+    pager.fetch_total()
+    for emitted, message in enumerate(pager.iter_messages(), 1):
+        emit(message)
+        if args.limit is not None and emitted >= args.limit:
+            break
+    # QueueSize, read up front, tells when the broker's browse cap ended the listing early
+    if pager.capped:
+        print(f"Warning: browsed only {pager.loaded} of {pager.total} messages; "
+              f"the broker's browse cap (maxBrowsePageSize) hides the rest", file=sys.stderr)
+    return 0
+
+def run_batch(config: ConnectionConfig, task: ChunkTask, message_ids: List[str]) -> int:
+    """
+    Run a per-message operation over all IDs, emitting each result as its chunk completes.
+    """
+    def emit_chunk(results: Dict[str, bool]) -> None:
+        for message_id, ok in results.items():
+            emit({"JMSMessageID": message_id, "ok": ok})
+
+    def report(progress: BatchProgress) -> None:
+        # Progress goes to stderr so stdout stays valid JSON Lines
+        if sys.stderr.isatty():
+            sys.stderr.write(f"\r{format_progress(progress)}")
+            sys.stderr.flush()
+
+    executor = BatchExecutor.from_config(config, task, on_progress=report, on_chunk=emit_chunk)
+    results = executor.run(message_ids)
+    if sys.stderr.isatty() and message_ids:
+        sys.stderr.write("\n")
+    return 1 if not all(results.values()) else 0
+
+def cmd_move(client: ActiveMQClient, config: ConnectionConfig, args: argparse.Namespace, stdin: TextIO) -> int:
+    if args.selector is not None or args.all:
+        record = {"source": args.source, "target": args.target, "selector": args.selector or ""}
+        try:
+            record["moved"] = client.move_matching_messages(args.source, args.target, args.selector or "")
+        except OperationPending as e:
+            record.update(pending_record(e))
+        emit(record)
+        return 0
+    return run_batch(config, lambda ids: client.move_chunk(ids, args.source, args.target), list(read_message_ids(stdin)))
+
+def cmd_delete(client: ActiveMQClient, config: ConnectionConfig, args: argparse.Namespace, stdin: TextIO) -> int:
+    if args.selector is not None:
+        record = {"queue": args.queue, "selector": args.selector}
+        try:
+            record["deleted"] = client.remove_matching_messages(args.queue, args.selector)
+        except OperationPending as e:
+            record.update(pending_record(e))
+        emit(record)
+        return 0
+    return run_batch(config, lambda ids: client.delete_chunk(ids, args.queue), list(read_message_ids(stdin)))
+
+def cmd_purge(client: ActiveMQClient, args: argparse.Namespace) -> int:
+    try:
+        client.purge(args.queue)
+    except OperationPending as e:
+        emit({"queue": args.queue, **pending_record(e)})
+        return 0
+    emit({"queue": args.queue, "purged": True})
+    return 0
+
+def pending_record(pending: OperationPending) -> Dict[str, Any]:
+    """
+    Result fields of a selector operation or purge still running on the broker.
+    """
+    print(f"Warning: {pending}", file=sys.stderr)
+    return {"pending": True, "queue_size": pending.queue_size}
+
+def report_progress(stats: TransferStats) -> None:
+    # Progress goes to stderr so stdout stays valid JSON Lines
+    if sys.stderr.isatty():
+        sys.stderr.write(f"\r{stats.messages} messages, {stats.rate:.0f} msg/s")
+        sys.stderr.flush()
+
+def cmd_export(client: ActiveMQClient, args: argparse.Namespace) -> int:
+    stats = export_queue(client, args.queue, args.file, args.selector, progress=report_progress)
+    if sys.stderr.isatty():
+        sys.stderr.write("\n")
+    emit({"queue": args.queue, "file": args.file, **stats.as_dict()})
+    if stats.truncated:
+        print(f"Error: exported only {stats.messages} of {stats.expected} messages; "
+              f"the broker's browse cap (maxBrowsePageSize) hides the rest", file=sys.stderr)
+        return 1
+    return 0
+
+def cmd_import(client: ActiveMQClient, args: argparse.Namespace) -> int:
+    stats = import_queue(client, args.queue, args.file, args.chunk_size, progress=report_progress)
+    if sys.stderr.isatty():
+        sys.stderr.write("\n")
+    emit({"queue": args.queue, "file": args.file, **stats.as_dict()})
+    return 1 if stats.failed else 0
+
+def cmd_stomp(config: ConnectionConfig, args: argparse.Namespace) -> int:
+    with StompTransport.from_config(config, prefetch=args.prefetch, ack_window=args.ack_window) as transport:
+        if args.command == "drain":
+            stats = transport.drain_to_file(args.queue, args.file, args.max, args.selector, progress=report_progress)
+            summary = {"queue": args.queue, "file": args.file}
+        elif args.command == "redrive":
+            stats = transport.move(args.source, args.target, args.max, args.selector, progress=report_progress)
+            summary = {"source": args.source, "target": args.target}
+        else:
+            stats = transport.requeue(args.dlq, args.target, args.max, args.selector, progress=report_progress)
+            summary = {"dlq": args.dlq}
+    if sys.stderr.isatty():
+        sys.stderr.write("\n")
+    emit({**summary, **stats.as_dict()})
+    return 0
+
+def cmd_stats(client: ActiveMQClient, args: argparse.Namespace) -> int:
+    sampler = QueueSampler()
+    wanted = set(args.queues)
+    sampler.record(client.list_queues())
+    reports = 0
+    while args.count == 0 or reports < args.count:
+        time.sleep(args.interval)
+        queues = client.list_queues()
+        sampler.record(queues)
+        for q in queues:
+            name = q.get("Name", "Unknown")
+            if wanted and name not in wanted:
+                continue
+            rates = sampler.rates(name)
+            emit({
+                "Name": name,
+                "QueueSize": q.get("QueueSize", 0),
+                "enqueue_rate": rates.enqueue_rate if rates else None,
+                "dequeue_rate": rates.dequeue_rate if rates else None,
+                "growth_rate": rates.growth_rate if rates else None,
+                "drain_seconds": rates.drain_seconds if rates else None,
+            })
+        reports += 1
+    return 0
+
+def main(argv: Optional[List[str]] = None, stdin: TextIO = sys.stdin) -> int:
+    """
+    Run a headless command. Returns the process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    config = connection_from_args(args)
+    if config is None:
+        print("No connection configured; use --host or --connection", file=sys.stderr)
+        return 2
+
+    if args.command in ("drain", "redrive", "requeue"):
+        try:
+            return cmd_stomp(config, args)
+        except KeyboardInterrupt:
+            return 130
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
+    client = ActiveMQClient.from_config(config)
+    try:
+        if args.command == "list-queues":
+            return cmd_list_queues(client, args)
+        if args.command == "browse":
+            return cmd_browse(client, args)
+        if args.command == "move":
+            return cmd_move(client, config, args, stdin)
+        if args.command == "delete":
+            return cmd_delete(client, config, args, stdin)
+        if args.command == "purge":
+            return cmd_purge(client, args)
+        if args.command == "export":
+            return cmd_export(client, args)
+        if args.command == "import":
+            return cmd_import(client, args)
+        if args.command == "stats":
+            return cmd_stats(client, args)
+        build_parser().print_help(sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. `| head`)
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+        textfile = args.metrics_textfile or config.metrics_textfile
+        if textfile:
+            try:
+                client.metrics.write_textfile(textfile)
+            except OSError as e:
+                print(f"Failed to write metrics to {textfile}: {e}", file=sys.stderr)
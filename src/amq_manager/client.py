@@ -1,12 +1,49 @@
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from typing import List, Dict, Any, Optional
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
 import logging
+import time
+
+from amq_manager.json_stream import CHUNK_SIZE, ValueStream
+from amq_manager.metrics import CONNECTION_ERROR, DECODE_ERROR, HTTP_ERROR, JOLOKIA_ERROR, Metrics, operation_name
+
+if TYPE_CHECKING:
+    from amq_manager.config import ConnectionConfig
 
 logger = logging.getLogger(__name__)
 
+# Attributes shown on the queue dashboard; list_queues reads only these by default
+QUEUE_LIST_ATTRIBUTES = ["Name", "QueueSize", "ConsumerCount", "EnqueueCount", "DequeueCount"]
+# Message headers shown in the message list; browse_headers fetches only these
+LISTING_FIELDS = ["JMSMessageID", "JMSTimestamp", "JMSPriority", "JMSRedelivered", "JMSType"]
+# Jolokia error_type of per-operation failures that mean the broker turned the operation
+# away before running it, so a bulk chunk may send it again
+TRANSIENT_ERROR_TYPES = {
+    "java.util.concurrent.RejectedExecutionException",
+    "org.apache.activemq.broker.BrokerStoppedException",
+}
+
+class OperationPending(Exception):
+    """
+    A broker-side operation (selector move/copy/remove, purge) got no answer within
+    operation_timeout. The broker usually carries on regardless, so this is not a
+    failure: `queue_size` is the queue's QueueSize read afterwards, or None if that
+    failed too.
+    """
+
+    def __init__(self, operation: str, queue_name: str, queue_size: Optional[int], timeout: float):
+        self.operation = operation
+        self.queue_name = queue_name
+        self.queue_size = queue_size
+        remaining = f"{queue_size} messages left in {queue_name}" if queue_size is not None else f"size of {queue_name} unknown"
+        super().__init__(f"{operation.split('(')[0]} on {queue_name} still running on the broker after {timeout:g}s ({remaining})")
+
 class ActiveMQClient:
-    def __init__(self, host: str, port: int, user: str, password: str, ssl: bool = False, context_path: str = "/api/jolokia", timeout: int = 5):
+    def __init__(self, host: str, port: int, user: str, password: str, ssl: bool = False, context_path: str = "/api/jolokia", timeout: int = 5,
+                 pool_size: int = 10, retries: int = 3, gzip: bool = True, bulk_chunk_size: int = 200,
+                 metrics: Optional[Metrics] = None, operation_timeout: int = 300, bulk_timeout_per_op: float = 0.05):
         scheme = "https" if ssl else "http"
         # Ensure context_path starts with /
         if not context_path.startswith("/"):
@@ -14,66 +51,290 @@ class ActiveMQClient:
         self.base_url = f"{scheme}://{host}:{port}{context_path}"
         self.auth = HTTPBasicAuth(user, password)
         self.headers = {"Origin": f"{scheme}://{host}"}
+        if gzip:
+            self.headers["Accept-Encoding"] = "gzip"
+        else:
+            # Replaces the "gzip, deflate" that requests sends by default
+            self.headers["Accept-Encoding"] = "identity"
         self.timeout = timeout
+        # Read timeout of broker-side operations that walk the whole queue
+        self.operation_timeout = operation_timeout
+        self.bulk_chunk_size = bulk_chunk_size
+        # Seconds added to the read timeout per operation in a bulk request, which the broker runs one by one
+        self.bulk_timeout_per_op = bulk_timeout_per_op
+        self.metrics = metrics or Metrics()
+        # Whether the broker's Jolokia applies wildcard paths to exec results; None until tried
+        self.projected_browse: Optional[bool] = None
+        self.session = self._create_session(pool_size, retries)
+
+    @classmethod
+    def from_config(cls, config: "ConnectionConfig", metrics: Optional[Metrics] = None) -> "ActiveMQClient":
+        """
+        Build a client for a saved connection, recording into `metrics` if given.
+        """
+        return cls(
+            config.host,
+            config.port,
+            config.user,
+            config.password,
+            config.ssl,
+            config.context_path,
+            timeout=config.timeout,
+            pool_size=config.pool_size,
+            retries=config.retries,
+            gzip=config.gzip,
+            bulk_chunk_size=config.bulk_chunk_size,
+            metrics=metrics,
+            operation_timeout=config.operation_timeout,
+            bulk_timeout_per_op=config.bulk_timeout_per_op,
+        )
 
-    def list_queues(self) -> List[Dict[str, Any]]:
+    def _create_session(self, pool_size: int, retries: int) -> requests.Session:
+        """
+        Create a keep-alive session so consecutive Jolokia calls reuse their TCP/TLS connection.
+        """
+        session = requests.Session()
+        session.auth = self.auth
+        session.headers.update(self.headers)
+        # Only connection failures are retried: Jolokia exec requests (move, delete)
+        # are POSTs and must not be replayed once the broker has received them.
+        retry = Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.2)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _post(self, payload: Any, timeout: Optional[float] = None) -> requests.Response:
+        operation = operation_name(payload)
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.base_url, json=payload, timeout=timeout or self.timeout)
+        except requests.RequestException:
+            self.metrics.record_error(operation, CONNECTION_ERROR)
+            raise
+        # The body has been downloaded (and decompressed) by now, so this covers the full transfer
+        self.metrics.record_request(operation, time.perf_counter() - start, len(response.content))
+        if response.status_code >= 400:
+            self.metrics.record_error(operation, HTTP_ERROR)
+        return response
+
+    def _json(self, response: requests.Response, payload: Any) -> Any:
+        """
+        Decode a Jolokia response, recording decode time and failed Jolokia statuses.
+        """
+        operation = operation_name(payload)
+        start = time.perf_counter()
+        try:
+            data = response.json()
+        except ValueError:
+            self.metrics.record_error(operation, DECODE_ERROR)
+            raise
+        self.metrics.record_decode(operation, time.perf_counter() - start)
+        responses = data if isinstance(data, list) else [data]
+        failed = sum(1 for item in responses if not isinstance(item, dict) or item.get("status") != 200)
+        if failed:
+            self.metrics.record_error(operation, JOLOKIA_ERROR, failed)
+        return data
+
+    def _stream(self, payload: Dict[str, Any]) -> Iterator[Any]:
+        """
+        Post a single request and yield the elements of its value as the response downloads.
+
+        Raises on connection, HTTP and decode errors, and once the value is exhausted if
+        Jolokia reported a failure. Request time covers the transfer only, not the time
+        the caller spends between elements.
+        """
+        operation = operation_name(payload)
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.base_url, json=payload, timeout=self.timeout, stream=True)
+        except requests.RequestException:
+            self.metrics.record_error(operation, CONNECTION_ERROR)
+            raise
+        with response:
+            if response.status_code >= 400:
+                self.metrics.record_request(operation, time.perf_counter() - start, len(response.content))
+                self.metrics.record_error(operation, HTTP_ERROR)
+                response.raise_for_status()
+            received = 0
+
+            def chunks() -> Iterator[bytes]:
+                nonlocal received
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    received += len(chunk)
+                    yield chunk
+
+            stream = ValueStream(chunks())
+            items = stream.items()
+            connected = time.perf_counter() - start
+            busy = 0.0
+            try:
+                while True:
+                    resumed = time.perf_counter()
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        break
+                    except ValueError:
+                        self.metrics.record_error(operation, DECODE_ERROR)
+                        raise
+                    except requests.RequestException:
+                        self.metrics.record_error(operation, CONNECTION_ERROR)
+                        raise
+                    finally:
+                        busy += time.perf_counter() - resumed
+                    yield item
+            finally:
+                # Also recorded when the caller stops early or a read fails
+                self.metrics.record_request(operation, connected + stream.read_seconds, received)
+                self.metrics.record_decode(operation, busy - stream.read_seconds)
+        if stream.fields.get("status") != 200:
+            self.metrics.record_error(operation, JOLOKIA_ERROR)
+            logger.error(f"Jolokia error in {operation}: {stream.fields.get('status')} {stream.fields.get('error', '')}")
+            raise Exception(f"Jolokia error: {stream.fields.get('error') or stream.fields.get('status')}")
+
+    def close(self) -> None:
+        """
+        Release pooled connections.
+        """
+        self.session.close()
+
+    def list_queues(self, attributes: Optional[List[str]] = QUEUE_LIST_ATTRIBUTES) -> List[Dict[str, Any]]:
         """
         List all queues and their stats.
+        Only the given attributes are read; pass None to read every attribute.
+        """
+        # Let exceptions propagate to the UI
+        return list(self.iter_queues(attributes))
+
+    def iter_queues(self, attributes: Optional[List[str]] = QUEUE_LIST_ATTRIBUTES) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the stats of each queue as soon as it is decoded from the response.
         """
         payload = {
             "type": "read",
             "mbean": "org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName=*"
         }
-        # Let exceptions propagate to the UI
-        response = requests.post(self.base_url, json=payload, auth=self.auth, headers=self.headers, timeout=self.timeout)
-        response.raise_for_status()
-        
+        if attributes:
+            payload["attribute"] = list(attributes)
         try:
-            data = response.json()
+            # Key format: org.apache.activemq:brokerName=localhost,destinationName=...,destinationType=Queue,type=Broker
+            for key, stats in self._stream(payload):
+                yield stats
         except ValueError as e:
-            logger.error(f"Failed to decode JSON. Response content: {response.text[:1000]}") # Log first 1000 chars
+            logger.error(f"Failed to decode JSON listing queues: {e}")
             raise Exception(f"Invalid JSON response from server. Check logs for details. Error: {e}")
-        
+
+    def get_queue_attributes(self, queue_name: str, attributes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Read attributes of a single queue. Reads every attribute when none are given.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
+        payload = {
+            "type": "read",
+            "mbean": mbean
+        }
+        if attributes:
+            payload["attribute"] = attributes
+        response = self._post(payload)
+        response.raise_for_status()
+        data = self._json(response, payload)
         if data.get("status") != 200:
-            logger.error(f"Jolokia error listing queues: {data.get('status')}")
-            raise Exception(f"Jolokia error: {data.get('status')}")
-        
-        queues = []
-        value = data.get("value", {})
-        for key, stats in value.items():
-            # Extract queue name from the key or stats
-            # Key format: org.apache.activemq:brokerName=localhost,destinationName=...,destinationType=Queue,type=Broker
-            queue_name = stats.get("Name")
-            queues.append(stats)
-        
-        return queues
+            logger.error(f"Jolokia error reading queue {queue_name}: {data.get('status')}")
+            raise Exception(f"Jolokia error: {data.get('error') or data.get('status')}")
+        return data.get("value", {})
+
+    def browse_messages(self, queue_name: str, selector: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Browse messages in a specific queue, optionally restricted by a JMS selector.
+        Raises if the browse fails, like iter_messages.
+        """
+        try:
+            return list(self.iter_messages(queue_name, selector))
+        except Exception as e:
+            # stdout may be the CLI's JSON Lines output
+            logger.error(f"Error browsing queue {queue_name}: {e}")
+            raise
 
-    def browse_messages(self, queue_name: str) -> List[Dict[str, Any]]:
+    def iter_messages(self, queue_name: str, selector: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
-        Browse messages in a specific queue.
+        Yield browsed messages one at a time as the response downloads, so only the
+        message being decoded is held in memory. Raises if the browse fails.
         """
         # Jolokia exec operation to browse messages
-        # Operation: browse() on the Queue MBean
+        # Operation: browse() or browse(String selector) on the Queue MBean
         mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
         payload = {
             "type": "exec",
             "mbean": mbean,
             "operation": "browse()"
         }
-        try:
-            response = requests.post(self.base_url, json=payload, auth=self.auth, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") != 200:
-                print(f"Jolokia error browsing queue {queue_name}: {data.get('status')}")
-                return []
-            
-            # The value is a list of CompositeData, which are dicts
-            return data.get("value", [])
-        except Exception as e:
-            print(f"Error browsing queue {queue_name}: {e}")
-            return []
+        if selector:
+            payload["operation"] = "browse(java.lang.String)"
+            payload["arguments"] = [selector]
+        # The value is a list of CompositeData, which are dicts
+        yield from self._stream(payload)
+
+    def browse_headers(self, queue_name: str, selector: Optional[str] = None,
+                       fields: List[str] = LISTING_FIELDS) -> List[Dict[str, Any]]:
+        """
+        Browse only some header fields of each message, leaving the bodies on the broker.
+
+        One bulk request runs one browse per field, each with the Jolokia path `*/<field>`,
+        so the broker serializes just that field of every message. Where Jolokia does not
+        support wildcard paths on operation results, this falls back to a full browse with
+        the other fields dropped, which saves memory but not transfer.
+
+        That bulk is len(fields) + 1 browses (6 for LISTING_FIELDS), each walking the
+        broker's browse page, and it is sent up to 3 times if the queue changes while it
+        runs (see _browse_projected). Raises if the browse fails, like iter_messages.
+        """
+        if self.projected_browse is not False:
+            try:
+                messages = self._browse_projected(queue_name, selector, fields)
+            except Exception as e:
+                # Not a verdict on projection support: the next page tries again
+                logger.error(f"Projected browse of {queue_name} failed: {e}")
+                raise
+            if messages is not None:
+                self.projected_browse = True
+                return messages
+            if self.projected_browse is None:
+                logger.info("Projected browse unsupported by the broker; falling back to full browse")
+                self.projected_browse = False
+        return [{f: m.get(f) for f in fields} for m in self.iter_messages(queue_name, selector)]
+
+    def _browse_projected(self, queue_name: str, selector: Optional[str], fields: List[str],
+                          attempts: int = 3) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the projected browse, or None if the broker doesn't support it.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
+        operation, arguments = ("browse(java.lang.String)", [selector]) if selector else ("browse()", [])
+        # The IDs are browsed first and again last: columns only line up if the queue
+        # didn't change while the browses ran
+        paths = ["JMSMessageID"] + [f for f in fields if f != "JMSMessageID"] + ["JMSMessageID"]
+        payloads = [
+            {"type": "exec", "mbean": mbean, "operation": operation, "arguments": arguments, "path": f"*/{field}"}
+            for field in paths
+        ]
+        for _ in range(attempts):
+            responses = self._post_bulk(payloads)
+            columns = [data.get("value") for data in responses]
+            missing = next((data for data in responses if data.get("status") == 404), None)
+            if missing is not None:
+                raise Exception(f"Jolokia error: {missing.get('error') or 404}")
+            if any(data.get("status") != 200 or not isinstance(value, list) for data, value in zip(responses, columns)):
+                return None
+            if not all(isinstance(message_id, str) for message_id in columns[0]):
+                # The path was ignored and whole messages came back
+                return None
+            if columns[0] == columns[-1] and len({len(column) for column in columns}) == 1:
+                rows = [dict(zip(paths, values)) for values in zip(*columns[:-1])]
+                return [{f: row.get(f) for f in fields} for row in rows]
+        # The queue is too busy for the browses to agree; take one consistent full browse instead
+        logger.warning(f"Projected browse of {queue_name} kept changing; using a full browse")
+        return [{f: m.get(f) for f in fields} for m in self.iter_messages(queue_name, selector)]
 
     def move_message(self, message_id: str, source_queue: str, target_queue: str) -> bool:
         """
@@ -88,9 +349,9 @@ class ActiveMQClient:
             "arguments": [message_id, target_queue]
         }
         try:
-            response = requests.post(self.base_url, json=payload, auth=self.auth, headers=self.headers, timeout=self.timeout)
+            response = self._post(payload)
             response.raise_for_status()
-            data = response.json()
+            data = self._json(response, payload)
             return data.get("status") == 200 and data.get("value") is True
         except Exception as e:
             print(f"Error moving message {message_id}: {e}")
@@ -109,10 +370,200 @@ class ActiveMQClient:
             "arguments": [message_id]
         }
         try:
-            response = requests.post(self.base_url, json=payload, auth=self.auth, headers=self.headers, timeout=self.timeout)
+            response = self._post(payload)
             response.raise_for_status()
-            data = response.json()
+            data = self._json(response, payload)
             return data.get("status") == 200 and data.get("value") is True
         except Exception as e:
             print(f"Error deleting message {message_id}: {e}")
             return False
+
+    def move_matching_messages(self, source_queue: str, target_queue: str, selector: str = "") -> int:
+        """
+        Move every message matching a JMS selector inside the broker.
+        An empty selector moves the whole queue. Returns the number of messages moved.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={source_queue}"
+        return self._exec_long(source_queue, mbean, "moveMatchingMessagesTo(java.lang.String,java.lang.String)", [selector, target_queue])
+
+    def copy_matching_messages(self, source_queue: str, target_queue: str, selector: str = "") -> int:
+        """
+        Copy every message matching a JMS selector inside the broker.
+        An empty selector copies the whole queue. Returns the number of messages copied.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={source_queue}"
+        return self._exec_long(source_queue, mbean, "copyMatchingMessagesTo(java.lang.String,java.lang.String)", [selector, target_queue])
+
+    def remove_matching_messages(self, queue_name: str, selector: str) -> int:
+        """
+        Remove every message matching a JMS selector. Returns the number of messages removed.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
+        return self._exec_long(queue_name, mbean, "removeMatchingMessages(java.lang.String)", [selector])
+
+    def purge(self, queue_name: str) -> None:
+        """
+        Remove all messages from a queue.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
+        self._exec_long(queue_name, mbean, "purge()", [])
+
+    def _exec_long(self, queue_name: str, mbean: str, operation: str, arguments: List[Any]) -> Any:
+        """
+        Run an operation that can take minutes on a deep queue, allowing operation_timeout.
+        If it still gets no answer, QueueSize is read and OperationPending raised.
+        """
+        try:
+            return self._exec(mbean, operation, arguments, self.operation_timeout)
+        except requests.exceptions.ReadTimeout:
+            # The request reached the broker, which keeps working on it; never replay it
+            try:
+                queue_size = self.get_queue_attributes(queue_name, ["QueueSize"]).get("QueueSize")
+            except Exception as e:
+                logger.error(f"Failed to read size of queue {queue_name} after {operation} timed out: {e}")
+                queue_size = None
+            pending = OperationPending(operation, queue_name, queue_size, self.operation_timeout)
+            logger.warning(str(pending))
+            raise pending
+
+    def _exec(self, mbean: str, operation: str, arguments: List[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a single MBean operation and return its value. Errors are raised to the caller.
+        """
+        payload = {
+            "type": "exec",
+            "mbean": mbean,
+            "operation": operation,
+            "arguments": arguments
+        }
+        response = self._post(payload, timeout)
+        response.raise_for_status()
+        data = self._json(response, payload)
+        if data.get("status") != 200:
+            logger.error(f"Jolokia error running {operation}: {data.get('status')} {data.get('error')}")
+            raise Exception(f"Jolokia error: {data.get('error') or data.get('status')}")
+        return data.get("value")
+
+    def delete_messages(self, message_ids: List[str], queue_name: str, chunk_size: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Delete many messages using chunked Jolokia bulk requests.
+        Returns a mapping of message ID to success.
+        """
+        return self._exec_bulk(message_ids, self._delete_payloads(message_ids, queue_name), chunk_size)
+
+    def delete_chunk(self, message_ids: List[str], queue_name: str) -> Dict[str, Optional[bool]]:
+        """
+        Delete messages in a single bulk request, reporting transient failures (see _exec_chunk).
+        """
+        return self._exec_chunk(message_ids, self._delete_payloads(message_ids, queue_name))
+
+    def _delete_payloads(self, message_ids: List[str], queue_name: str) -> List[Dict[str, Any]]:
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
+        return [
+            {
+                "type": "exec",
+                "mbean": mbean,
+                "operation": "removeMessage(java.lang.String)",
+                "arguments": [message_id]
+            }
+            for message_id in message_ids
+        ]
+
+    def move_messages(self, message_ids: List[str], source_queue: str, target_queue: str, chunk_size: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Move many messages using chunked Jolokia bulk requests.
+        Returns a mapping of message ID to success.
+        """
+        return self._exec_bulk(message_ids, self._move_payloads(message_ids, source_queue, target_queue), chunk_size)
+
+    def move_chunk(self, message_ids: List[str], source_queue: str, target_queue: str) -> Dict[str, Optional[bool]]:
+        """
+        Move messages in a single bulk request, reporting transient failures (see _exec_chunk).
+        """
+        return self._exec_chunk(message_ids, self._move_payloads(message_ids, source_queue, target_queue))
+
+    def _move_payloads(self, message_ids: List[str], source_queue: str, target_queue: str) -> List[Dict[str, Any]]:
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={source_queue}"
+        return [
+            {
+                "type": "exec",
+                "mbean": mbean,
+                "operation": "moveMessageTo(java.lang.String,java.lang.String)",
+                "arguments": [message_id, target_queue]
+            }
+            for message_id in message_ids
+        ]
+
+    def send_text_messages(self, queue_name: str, messages: List[Tuple[Dict[str, str], str]], chunk_size: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Send (headers, body) text messages to a queue using chunked Jolokia bulk requests.
+        Returns the new message ID for each message, or None where sending failed.
+        """
+        mbean = f"org.apache.activemq:type=Broker,brokerName=localhost,destinationType=Queue,destinationName={queue_name}"
+        payloads = [
+            {
+                "type": "exec",
+                "mbean": mbean,
+                "operation": "sendTextMessage(java.util.Map,java.lang.String,java.lang.String,java.lang.String)",
+                "arguments": [headers, body, self.auth.username, self.auth.password]
+            }
+            for headers, body in messages
+        ]
+        chunk_size = chunk_size or self.bulk_chunk_size
+        results: List[Optional[str]] = []
+        for start in range(0, len(payloads), chunk_size):
+            chunk = payloads[start:start + chunk_size]
+            try:
+                responses = self._post_bulk(chunk)
+            except Exception as e:
+                logger.error(f"Bulk send of {len(chunk)} messages to {queue_name} failed: {e}")
+                results.extend([None] * len(chunk))
+                continue
+            results.extend(data.get("value") if data.get("status") == 200 else None for data in responses)
+        return results
+
+    def _exec_bulk(self, message_ids: List[str], payloads: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> Dict[str, bool]:
+        chunk_size = chunk_size or self.bulk_chunk_size
+        results: Dict[str, bool] = {}
+        for start in range(0, len(payloads), chunk_size):
+            chunk_ids = message_ids[start:start + chunk_size]
+            try:
+                chunk_results = self._exec_chunk(chunk_ids, payloads[start:start + chunk_size])
+            except Exception as e:
+                logger.error(f"Bulk request for {len(chunk_ids)} messages failed: {e}")
+                results.update((message_id, False) for message_id in chunk_ids)
+                continue
+            results.update((message_id, bool(ok)) for message_id, ok in chunk_results.items())
+        return results
+
+    def _exec_chunk(self, message_ids: List[str], payloads: List[Dict[str, Any]]) -> Dict[str, Optional[bool]]:
+        """
+        Run one bulk request of per-message operations. Maps each message ID to True when the
+        operation succeeded, None when the broker turned it away unrun (TRANSIENT_ERROR_TYPES)
+        so it may be retried, or False otherwise: refused (e.g. the message is gone) or failed
+        partway. Raises if the request as a whole failed.
+        """
+        responses = self._post_bulk(payloads)
+        results: Dict[str, Optional[bool]] = {}
+        # Jolokia answers a bulk request with one response per request, in order
+        for message_id, data in zip(message_ids, responses):
+            status = data.get("status")
+            if status == 200:
+                results[message_id] = data.get("value") is True
+            else:
+                # Jolokia reports every exception as 500, whether or not the operation took
+                # effect, so only the exception type can tell a retry is safe
+                results[message_id] = None if data.get("error_type") in TRANSIENT_ERROR_TYPES else False
+        return results
+
+    def _post_bulk(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send several Jolokia requests in a single POST. The read timeout grows with the
+        number of requests, since Jolokia only answers once it has run all of them.
+        """
+        response = self._post(payloads, self.timeout + len(payloads) * self.bulk_timeout_per_op)
+        response.raise_for_status()
+        data = self._json(response, payloads)
+        if not isinstance(data, list) or len(data) != len(payloads):
+            raise Exception(f"Unexpected bulk response for {len(payloads)} requests")
+        return data
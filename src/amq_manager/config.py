@@ -16,6 +16,22 @@ class ConnectionConfig:
     is_default: bool = False
     ssl: bool = False
     context_path: str = "/api/jolokia"
+    pool_size: int = 10
+    retries: int = 3
+    timeout: int = 5
+    operation_timeout: int = 300
+    gzip: bool = True
+    bulk_chunk_size: int = 200
+    bulk_timeout_per_op: float = 0.05
+    batch_workers: int = 4
+    batch_max_rate: float = 0.0
+    batch_retries: int = 3
+    browse_page_size: int = 200
+    browse_cache_mb: int = 64
+    refresh_interval: float = 2.0
+    stomp_port: int = 61613
+    advisories: bool = False
+    metrics_textfile: str = ""
 
 class ConfigManager:
     def __init__(self):
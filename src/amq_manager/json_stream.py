@@ -0,0 +1,171 @@
+"""
+Incremental decoding of Jolokia responses.
+
+A Jolokia response is one JSON object whose "value" holds the result: a list
+of messages for a browse, an object of MBean name -> attributes for a wildcard
+read. ValueStream reads the response in chunks as it downloads and yields each
+element of that value as soon as it is complete, so only one element and one
+chunk are held at a time instead of the raw bytes, the text and the whole
+object tree of a response that can be hundreds of megabytes.
+"""
+import codecs
+import json
+import re
+import time
+from typing import Any, Dict, Iterable, Iterator
+
+# Bytes read from the response at a time
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+COMMA = re.compile(r"[ \t\n\r]*,[ \t\n\r]*")
+COLON = re.compile(r"[ \t\n\r]*:[ \t\n\r]*")
+
+class ValueStream:
+    """
+    Parses one Jolokia response from an iterable of byte chunks.
+
+    items() yields the elements of a list value, or (key, value) pairs of an
+    object value. The response's other members (status, error, request, ...)
+    are collected in `fields`; Jolokia may put them after the value, so they
+    are only complete once items() is exhausted.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.fields: Dict[str, Any] = {}
+        self.read_seconds = 0.0  # time spent waiting for data; the rest of items() is decoding
+        self._json = json.JSONDecoder()
+
+    def _fill(self, wanted: int) -> None:
+        """
+        Read until at least `wanted` unparsed characters are buffered, or the data ends.
+        """
+        if self.pos > len(self.buffer) // 2:
+            # Drop what was parsed; amortized, this copies each character about once
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        start = time.perf_counter()
+        parts = [self.buffer]
+        available = len(self.buffer) - self.pos
+        while available < wanted and not self.eof:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                parts.append(self.decoder.decode(b"", final=True))
+                break
+            text = self.decoder.decode(chunk)
+            parts.append(text)
+            available += len(text)
+        self.buffer = "".join(parts)
+        self.read_seconds += time.perf_counter() - start
+
+    def _peek(self) -> str:
+        """
+        The next non-whitespace character, without consuming it; "" at the end of the data.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ""
+            self._fill(1)
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected {' or '.join(repr(c) for c in chars)} at offset {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def _decode(self) -> Any:
+        """
+        Decode the JSON value at the current position, reading more data until it is complete.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                end = None
+            # A number at the very end of the buffer may continue in the next chunk
+            if end is not None and (end < len(self.buffer) or self.eof):
+                self.pos = end
+                return value
+            # Grow geometrically, so a large element is not re-parsed once per chunk
+            self._fill(2 * (len(self.buffer) - self.pos) + CHUNK_SIZE)
+
+    def items(self) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._decode()
+            self._expect(":")
+            if key == "value":
+                yield from self._value_items()
+            else:
+                self.fields[key] = self._decode()
+            if self._expect(",}") == "}":
+                return
+
+    def _value_items(self) -> Iterator[Any]:
+        opening = self._peek()
+        if opening not in ("[", "{"):
+            # A scalar result, e.g. of a single attribute read
+            self.fields["value"] = self._decode()
+            return
+        self.pos += 1
+        closing = "]" if opening == "[" else "}"
+        if self._peek() == closing:
+            self.pos += 1
+            return
+        while True:
+            if opening == "[":
+                yield self._decode()
+            else:
+                key = self._decode()
+                self._expect(":")
+                yield key, self._decode()
+            yield from self._buffered_items(opening == "[")
+            if self._expect("," + closing) == closing:
+                return
+
+    def _buffered_items(self, is_list: bool) -> Iterator[Any]:
+        """
+        Yield the following elements that are already complete in the buffer.
+
+        This is the same as the general loop in _value_items, minus the checks for
+        running out of data, which make up most of the cost of small elements.
+        Anything unusual, including a syntax error, is left to the general loop.
+        """
+        buffer = self.buffer
+        scan = self._json.scan_once
+        while True:
+            match = COMMA.match(buffer, self.pos)
+            if match is None:
+                return
+            try:
+                if is_list:
+                    item, end = scan(buffer, match.end())
+                else:
+                    key, end = scan(buffer, match.end())
+                    match = COLON.match(buffer, end)
+                    if match is None:
+                        return
+                    value, end = scan(buffer, match.end())
+                    item = (key, value)
+            except (StopIteration, ValueError):
+                return
+            if end >= len(buffer):
+                # A number may continue in the next chunk
+                return
+            self.pos = end
+            yield item
@@ -0,0 +1,106 @@
+"""
+Incremental reading of the application log.
+
+The first view reads the file backwards from the end in blocks until enough
+lines are found, so its cost depends on the lines shown, not on the file size.
+After that only the bytes appended since the remembered offset are read.
+Truncation and rotation are detected by comparing size and inode.
+"""
+from collections import deque
+from dataclasses import dataclass
+import os
+import re
+from typing import Deque, Iterable, List, Optional
+
+# Matches the format configured in main.py: "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+RECORD_PATTERN = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d - \S+ - ([A-Z]+) - ")
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+class LogTail:
+    def __init__(self, path: str, block_size: int = 64 * 1024):
+        self.path = path
+        self.block_size = block_size
+        self.offset = 0  # start of the first byte not yet returned
+        self.inode: Optional[int] = None
+
+    def tail(self, max_lines: int) -> List[str]:
+        """
+        Return the last `max_lines` complete lines and continue from the end of the file.
+        """
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.inode = stat.st_ino
+            end = stat.st_size
+            position = end
+            data = b""
+            # One more newline than lines wanted, so the first line is known to be complete
+            while position > 0 and data.count(b"\n") <= max_lines:
+                step = min(self.block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        # A last line without newline is still being written; follow mode reads it once complete
+        complete = data.rfind(b"\n") + 1
+        self.offset = end - (len(data) - complete)
+        lines = data[:complete].decode("utf-8", errors="replace").splitlines()
+        if position > 0:
+            lines = lines[1:]
+        return lines[-max_lines:] if max_lines else []
+
+    def read_new(self) -> List[str]:
+        """
+        Return the complete lines appended since the last call. Starts over if the file was truncated or replaced.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.inode = stat.st_ino
+            self.offset = 0
+        if stat.st_size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        complete = data.rfind(b"\n") + 1
+        self.offset += complete
+        return data[:complete].decode("utf-8", errors="replace").splitlines()
+
+@dataclass
+class LogLine:
+    text: str
+    level: str  # continuation lines (tracebacks) carry the level of their record
+
+class LogBuffer:
+    """
+    The most recent log lines with their levels, so filtering never re-reads the file.
+    """
+
+    def __init__(self, max_lines: int = 2000):
+        self.lines: Deque[LogLine] = deque(maxlen=max_lines)
+        self._level = "INFO"
+
+    def add(self, texts: Iterable[str]) -> List[LogLine]:
+        added = []
+        for text in texts:
+            match = RECORD_PATTERN.match(text)
+            if match:
+                self._level = match.group(1)
+            line = LogLine(text, self._level)
+            self.lines.append(line)
+            added.append(line)
+        return added
+
+    def clear(self) -> None:
+        self.lines.clear()
+        self._level = "INFO"
+
+def matches(line: LogLine, min_level: str = "DEBUG", text: str = "") -> bool:
+    """
+    True if a line is at least `min_level` and contains `text` (case-insensitive; pass it lowercased).
+    """
+    level = LEVELS.index(line.level) if line.level in LEVELS else 0
+    if level < LEVELS.index(min_level):
+        return False
+    return not text or text in line.text.lower()
@@ -1,6 +1,6 @@
 import logging
 import os
-from amq_manager.ui.app import ActiveMQManagerApp
+import sys
 
 # Configure logging
 LOG_FILE = "amq_manager.log"
@@ -13,10 +13,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def main():
+    # Imported here so headless commands never load Textual
+    from amq_manager.ui.app import ActiveMQManagerApp
+
     logger.info("Starting ActiveMQ Manager")
     app = ActiveMQManagerApp()
     app.run()
     logger.info("ActiveMQ Manager stopped")
 
-if __name__ == "__main__":
+def run():
+    """
+    Console entry point: starts the TUI, or runs a headless command when arguments are given.
+    """
+    if len(sys.argv) > 1:
+        from amq_manager.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
     main()
+
+if __name__ == "__main__":
+    run()
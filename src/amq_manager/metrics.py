@@ -0,0 +1,200 @@
+"""
+Request-level instrumentation.
+
+ActiveMQClient records every Jolokia request here: round-trip latency, response
+size, JSON decode time and errors, per operation. The UI records how long it
+spends rebuilding its tables. Together they tell a slow broker apart from slow
+client-side parsing or rendering. Metrics can be exported in the Prometheus
+text format, e.g. for node_exporter's textfile collector.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import copy
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Upper bounds in seconds, as in Prometheus' default buckets plus finer steps for decode and render times
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Error kinds
+CONNECTION_ERROR = "connection"  # no HTTP response at all (refused, timeout, TLS)
+HTTP_ERROR = "http"  # HTTP status >= 400
+JOLOKIA_ERROR = "jolokia"  # HTTP 200 with a failed Jolokia status
+DECODE_ERROR = "decode"  # response body is not JSON
+
+class Histogram:
+    """
+    Counts of observations per bucket, plus their count, sum and maximum.
+    """
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by interpolating within its bucket, like Prometheus' histogram_quantile.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+@dataclass
+class RequestStats:
+    latency: Histogram = field(default_factory=Histogram)  # request sent until the whole body arrived
+    decode: Histogram = field(default_factory=Histogram)  # JSON decoding of the body
+    response_bytes: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return self.latency.count
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+def operation_name(payload: Any) -> str:
+    """
+    Name a Jolokia request for metrics: the MBean operation without its signature,
+    "list_queues" for wildcard reads, "read" for other reads and "bulk <op>" for bulk requests.
+    """
+    if isinstance(payload, list):
+        return f"bulk {operation_name(payload[0])}" if payload else "bulk"
+    if payload.get("type") == "read":
+        return "list_queues" if payload.get("mbean", "").endswith("=*") else "read"
+    return payload.get("operation", payload.get("type", "unknown")).split("(")[0]
+
+class Metrics:
+    """
+    Thread-safe registry of request stats per operation and of client-side timings per name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[str, RequestStats] = {}
+        self.timings: Dict[str, Histogram] = {}
+        self.started = time.time()
+
+    def _stats(self, operation: str) -> RequestStats:
+        stats = self.requests.get(operation)
+        if stats is None:
+            stats = self.requests[operation] = RequestStats()
+        return stats
+
+    def record_request(self, operation: str, seconds: float, response_bytes: int = 0) -> None:
+        with self._lock:
+            stats = self._stats(operation)
+            stats.latency.observe(seconds)
+            stats.response_bytes += response_bytes
+
+    def record_decode(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._stats(operation).decode.observe(seconds)
+
+    def record_error(self, operation: str, kind: str, count: int = 1) -> None:
+        with self._lock:
+            errors = self._stats(operation).errors
+            errors[kind] = errors.get(kind, 0) + count
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Record a client-side duration, e.g. a table rebuild.
+        """
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[Dict[str, RequestStats], Dict[str, Histogram]]:
+        """
+        Consistent copies of the request stats and timings, for display or export.
+        """
+        with self._lock:
+            return copy.deepcopy(self.requests), copy.deepcopy(self.timings)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = {}
+            self.timings = {}
+            self.started = time.time()
+
+    def to_prometheus(self) -> str:
+        requests, timings = self.snapshot()
+        lines: List[str] = []
+
+        def histogram(metric: str, help_text: str, label: str, values: Dict[str, Histogram]) -> None:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, h in sorted(values.items()):
+                labels = f'{label}="{_escape(name)}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {h.sum!r}")
+                lines.append(f"{metric}_count{{{labels}}} {h.count}")
+
+        histogram("amq_manager_request_duration_seconds", "Jolokia request round trip including the response body.",
+                  "operation", {name: s.latency for name, s in requests.items()})
+        histogram("amq_manager_json_decode_seconds", "Time spent decoding Jolokia responses.",
+                  "operation", {name: s.decode for name, s in requests.items() if s.decode.count})
+        lines.append("# HELP amq_manager_response_bytes_total Bytes of Jolokia responses after decompression.")
+        lines.append("# TYPE amq_manager_response_bytes_total counter")
+        for name, s in sorted(requests.items()):
+            lines.append(f'amq_manager_response_bytes_total{{operation="{_escape(name)}"}} {s.response_bytes}')
+        lines.append("# HELP amq_manager_request_errors_total Failed Jolokia requests; bulk requests count each failed item.")
+        lines.append("# TYPE amq_manager_request_errors_total counter")
+        for name, s in sorted(requests.items()):
+            for kind, n in sorted(s.errors.items()):
+                lines.append(f'amq_manager_request_errors_total{{operation="{_escape(name)}",kind="{kind}"}} {n}')
+        histogram("amq_manager_client_duration_seconds", "Client-side work outside requests, e.g. table rebuilds.",
+                  "name", timings)
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Write the Prometheus text format atomically, so a collector never reads a partial file.
+        """
+        path = os.path.expanduser(path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Set
+import logging
+
+from amq_manager.client import ActiveMQClient
+
+logger = logging.getLogger(__name__)
+
+# IDs excluded at the cursor timestamp before paging gives up, to keep the selector bounded
+MAX_CURSOR_IDS = 500
+
+def timestamp_millis(value: Any) -> Optional[int]:
+    """
+    Convert a JMSTimestamp as serialized by Jolokia (epoch millis or ISO 8601) to epoch millis.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str) or not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, "%Y-%m-%dT%H:%M:%S%z")):
+        try:
+            return int(parse(value).timestamp() * 1000)
+        except ValueError:
+            continue
+    return None
+
+def quote_selector_value(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def fetch_message(client: ActiveMQClient, queue_name: str, message_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Browse a single message, body included, by its ID. Returns None if it is no longer in the queue,
+    and raises if the browse fails.
+    """
+    messages = client.browse_messages(queue_name, f"JMSMessageID = {quote_selector_value(message_id)}")
+    return next((m for m in messages if m.get("JMSMessageID") == message_id), None)
+
+class MessagePager:
+    """
+    Fetches a queue's messages one page at a time.
+
+    Broker pages are requested with keyset pagination on JMSTimestamp: each request
+    adds `JMSTimestamp >= <last seen>` to the user's selector and excludes the IDs
+    already seen at that timestamp. Messages from a broker page are handed out in
+    windows of `page_size`, so the UI only renders what the user scrolls to.
+    With `headers_only`, messages carry just the LISTING_FIELDS headers and no body.
+
+    ActiveMQ's browse takes the first maxBrowsePageSize messages (400 by default)
+    and only then applies the selector, so on a real broker the keyset clauses
+    match nothing new and paging ends there. `capped` tells when it ended short
+    of QueueSize, so callers can say that the listing is incomplete.
+    """
+
+    def __init__(self, client: ActiveMQClient, queue_name: str, selector: str = "", page_size: int = 200,
+                 headers_only: bool = False):
+        self.client = client
+        self.queue_name = queue_name
+        self.selector = selector
+        self.page_size = page_size
+        self.headers_only = headers_only
+        self.loaded = 0
+        self.total: Optional[int] = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._cursor: Optional[int] = None
+        self._cursor_ids: Set[str] = set()
+        self._exhausted = False
+        self._short_checked = False
+
+    @property
+    def has_more(self) -> bool:
+        if self._buffer:
+            return True
+        if self._exhausted:
+            return False
+        return self.total is None or self.loaded < self.total
+
+    @property
+    def capped(self) -> bool:
+        """
+        True if paging ended before QueueSize messages were handed out, i.e. the
+        broker's browse cap hid the rest. Only known without a selector, since
+        QueueSize counts the whole queue.
+        """
+        return (self._exhausted and not self.selector and self.total is not None
+                and self.loaded + len(self._buffer) < self.total)
+
+    def fetch_total(self) -> Optional[int]:
+        """
+        Read QueueSize so the UI can show how deep the queue is.
+        """
+        try:
+            attributes = self.client.get_queue_attributes(self.queue_name, ["QueueSize"])
+            self.total = int(attributes.get("QueueSize", 0))
+        except Exception as e:
+            logger.error(f"Failed to read size of queue {self.queue_name}: {e}")
+            self.total = None
+        return self.total
+
+    def next_page(self) -> List[Dict[str, Any]]:
+        """
+        Return the next window of messages, fetching a broker page if needed.
+        """
+        if not self._buffer and not self._exhausted:
+            self._fetch_broker_page()
+        page = self._buffer[:self.page_size]
+        del self._buffer[:self.page_size]
+        self.loaded += len(page)
+        return page
+
+    def iter_messages(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every remaining message, each as soon as it is decoded from the response.
+
+        Unlike next_page, this never holds a broker page in memory (except with
+        `headers_only`, whose pages are small), so exporting a huge queue needs memory
+        for one message at a time. Errors are raised rather than ending the listing.
+        Don't mix it with next_page on the same pager.
+        """
+        while self._buffer:
+            message = self._buffer.pop(0)
+            self.loaded += 1
+            yield message
+        while not self._exhausted:
+            seen = frozenset(self._cursor_ids)
+            selector = self._page_selector() or None
+            if self.headers_only:
+                messages = self.client.browse_headers(self.queue_name, selector)
+            else:
+                messages = self.client.iter_messages(self.queue_name, selector)
+            pageable = True
+            new = 0
+            for message in messages:
+                if message.get("JMSMessageID") in seen:
+                    continue
+                pageable = self._advance(message) and pageable
+                new += 1
+                self.loaded += 1
+                yield message
+            if not pageable:
+                self._stop_paging()
+            elif not new:
+                self._finish()
+
+    def _fetch_broker_page(self) -> None:
+        if self.headers_only:
+            messages = self.client.browse_headers(self.queue_name, self._page_selector() or None)
+        else:
+            messages = self.client.browse_messages(self.queue_name, self._page_selector() or None)
+        seen = frozenset(self._cursor_ids)
+        new_messages = [m for m in messages if m.get("JMSMessageID") not in seen]
+        if not new_messages:
+            self._finish()
+            return
+        pageable = True
+        for message in new_messages:
+            pageable = self._advance(message) and pageable
+        self._buffer.extend(new_messages)
+        if not pageable:
+            self._stop_paging()
+
+    def _stop_paging(self) -> None:
+        if len(self._cursor_ids) > MAX_CURSOR_IDS:
+            logger.warning(f"Cannot page {self.queue_name}: over {MAX_CURSOR_IDS} messages share JMSTimestamp {self._cursor}")
+        else:
+            # Without comparable timestamps there is no way to ask for the next page
+            logger.warning(f"Cannot page {self.queue_name}: unrecognised JMSTimestamp format")
+        self._finish()
+
+    def _finish(self) -> None:
+        """
+        Stop paging. If that leaves the listing short of QueueSize, re-read QueueSize
+        once, so messages consumed meanwhile aren't taken for capped ones.
+        """
+        self._exhausted = True
+        if self.capped and not self._short_checked:
+            self._short_checked = True
+            self.fetch_total()
+        if self.capped:
+            logger.warning(f"Browsing {self.queue_name} stopped at {self.loaded + len(self._buffer)} of "
+                           f"{self.total} messages: the broker's browse cap (maxBrowsePageSize) hides the rest")
+
+    def _advance(self, message: Dict[str, Any]) -> bool:
+        """
+        Move the cursor past a message. Returns False if its timestamp can't be read,
+        or too many messages share the cursor timestamp to exclude them all.
+        """
+        ts = timestamp_millis(message.get("JMSTimestamp"))
+        if ts is None:
+            return False
+        if self._cursor is None or ts > self._cursor:
+            self._cursor = ts
+            self._cursor_ids = set()
+        if ts == self._cursor:
+            self._cursor_ids.add(message.get("JMSMessageID"))
+        # Excluding every ID at one timestamp would grow the selector without bound
+        return len(self._cursor_ids) <= MAX_CURSOR_IDS
+
+    def _page_selector(self) -> str:
+        clauses = []
+        if self.selector:
+            clauses.append(f"({self.selector})")
+        if self._cursor is not None:
+            clauses.append(f"JMSTimestamp >= {self._cursor}")
+            if self._cursor_ids:
+                ids = ",".join(quote_selector_value(i) for i in sorted(self._cursor_ids))
+                clauses.append(f"JMSMessageID NOT IN ({ids})")
+        return " AND ".join(clauses)
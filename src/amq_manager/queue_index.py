@@ -0,0 +1,187 @@
+"""
+Queue names for the move dialogs' target autocomplete.
+
+One QueueNameIndex per connection is shared by the app. The queue list's
+refreshes and queue advisories keep it current, so a move dialog can suggest
+targets as soon as it opens instead of listing the broker's queues first.
+
+Suggestions are ranked in tiers: the exact name, names starting with the query,
+names with a segment (after ".", "-", "_", "/" or ":") starting with it, names
+containing it, and last fuzzy matches, whose letters appear in order with gaps
+(e.g. "ordinv" for "orders.invoice"). The original queue of a DLQ and recently
+used targets come first.
+"""
+from bisect import bisect_left
+import re
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+SEGMENT_SEPARATORS = re.compile(r"[._\-/:]")
+# Suggestions shown at a time; more would only slow down filling the list
+MAX_SUGGESTIONS = 100
+# Recently used move targets remembered per connection
+RECENT_TARGETS = 10
+# Seconds after which a move dialog re-lists the queues in the background when it opens
+STALE_AFTER = 30.0
+
+def dlq_original(queue_name: str) -> Optional[str]:
+    """
+    The queue a dead letter queue named DLQ.<queue> collects messages of, or None.
+    """
+    if queue_name.lower().startswith("dlq."):
+        return queue_name[4:]
+    return None
+
+class QueueNameIndex:
+    """
+    Ranked queue-name suggestions over a sorted name list.
+
+    Names are kept sorted by their lowercase form, so the names starting with a
+    query are one bisect away, and so are the name segments starting with it, which
+    are indexed as sorted (suffix, position) pairs. A query that extends the previous
+    one (typing one more character) only re-checks the previous matches. Updates
+    swap in new lists under a lock, so suggest() can run while a worker updates.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self.names: List[str] = []
+        self.keys: List[str] = []  # Lowercase names, at the same positions
+        self.segments: List[Tuple[str, int]] = []  # (lowercase name from a segment start on, position), sorted
+        self.recent: List[str] = []  # Most recently used move target first
+        self.updated_at: Optional[float] = None  # time.monotonic() of the last full listing
+        self._last: Tuple[List[str], str, List[int]] = ([], "", [])
+        self.update(names, full=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def age(self) -> Optional[float]:
+        """
+        Seconds since the names were last listed in full, or None if they never were.
+        """
+        return time.monotonic() - self.updated_at if self.updated_at is not None else None
+
+    def update(self, names: Iterable[str], full: bool = True) -> None:
+        """
+        Replace the names, e.g. with the result of list_queues. Pass full=False for a
+        partial source such as a cached snapshot, which doesn't count as a listing.
+        """
+        names = sorted({name for name in names if name}, key=lambda name: (name.lower(), name))
+        if full:
+            self.mark_listed()
+        if names == self.names:
+            return
+        keys = [name.lower() for name in names]
+        segments = sorted(
+            (key[match.end():], position)
+            for position, key in enumerate(keys)
+            for match in SEGMENT_SEPARATORS.finditer(key)
+            if match.end() < len(key)
+        )
+        with self._lock:
+            self.names, self.keys, self.segments = names, keys, segments
+
+    def mark_listed(self) -> None:
+        """
+        Note that the names were just confirmed by a full listing.
+        """
+        self.updated_at = time.monotonic()
+
+    def add(self, name: str) -> None:
+        if name not in self.names:
+            self.update(self.names + [name], full=False)
+
+    def remove(self, name: str) -> None:
+        if name in self.names:
+            self.update([n for n in self.names if n != name], full=False)
+
+    def record_target(self, name: str) -> None:
+        """
+        Remember a queue messages were moved to, so it is suggested first next time.
+        """
+        with self._lock:
+            self.recent = ([name] + [n for n in self.recent if n != name])[:RECENT_TARGETS]
+
+    def suggest(self, query: str, exclude: Optional[str] = None, original: Optional[str] = None,
+                limit: int = MAX_SUGGESTIONS) -> List[str]:
+        """
+        Return up to `limit` names matching query, best first, leaving out `exclude`.
+        `original` (the source DLQ's original queue) and recent targets lead when they match.
+        """
+        with self._lock:
+            names, keys, segments, recent = self.names, self.keys, self.segments, self.recent
+        query = query.lower()
+        if query:
+            matches = self._fuzzy_matches(names, keys, query)
+            matched = set(matches)
+        else:
+            matches = range(len(names))
+            matched = None
+
+        ranked: List[int] = []
+        seen = set()
+
+        def take(positions: Iterable[int]) -> None:
+            for position in positions:
+                if len(ranked) >= limit:
+                    return
+                if position not in seen and (matched is None or position in matched) and names[position] != exclude:
+                    seen.add(position)
+                    ranked.append(position)
+
+        for name in ([original] if original else []) + recent:
+            position = bisect_left(keys, name.lower())
+            # Several names can share a lowercase form; find the exact one
+            while position < len(keys) and keys[position] == name.lower() and names[position] != name:
+                position += 1
+            if position < len(keys) and names[position] == name:
+                take([position])
+        if not query:
+            take(matches)
+            return [names[position] for position in ranked]
+
+        start = bisect_left(keys, query)
+        end = bisect_left(keys, query + "\uffff", start)
+        take(position for position in range(start, end) if keys[position] == query)
+        take(range(start, end))
+        if len(ranked) < limit:
+            first = bisect_left(segments, (query,))
+            take(sorted({position for _, position in self._prefixed(segments, first, query)}))
+        if len(ranked) < limit:
+            take(sorted((p for p in matches if query in keys[p]), key=lambda p: (keys[p].index(query), p)))
+        if len(ranked) < limit:
+            pattern = self._pattern(query)
+            take(sorted(matches, key=lambda p: self._span(pattern, keys[p]) + (p,)))
+        return [names[position] for position in ranked]
+
+    def _fuzzy_matches(self, names: List[str], keys: List[str], query: str) -> List[int]:
+        """
+        Positions of every name containing the letters of query in order, which every other tier implies.
+        """
+        last_names, last_query, last_matches = self._last
+        candidates = last_matches if last_names is names and last_query and query.startswith(last_query) else range(len(keys))
+        search = self._pattern(query).search
+        matches = [position for position in candidates if search(keys[position])]
+        self._last = (names, query, matches)
+        return matches
+
+    @staticmethod
+    def _prefixed(segments: List[Tuple[str, int]], start: int, query: str) -> Iterable[Tuple[str, int]]:
+        for index in range(start, len(segments)):
+            if not segments[index][0].startswith(query):
+                return
+            yield segments[index]
+
+    @staticmethod
+    def _pattern(query: str) -> "re.Pattern[str]":
+        return re.compile(".*?".join(re.escape(char) for char in query))
+
+    @staticmethod
+    def _span(pattern: "re.Pattern[str]", key: str) -> Tuple[int, int]:
+        """
+        How tightly a fuzzy match fits: the length of the matched stretch, then where it starts.
+        """
+        match = pattern.search(key)
+        return (match.end() - match.start(), match.start()) if match else (len(key), len(key))
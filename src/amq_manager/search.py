@@ -0,0 +1,97 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Joins the fields of a record so a query can never match across two fields
+FIELD_SEPARATOR = "\x1f"
+
+def search_key(fields: Iterable[object]) -> str:
+    """
+    Normalize the searchable fields of a record into a single lowercase key.
+    """
+    return FIELD_SEPARATOR.join(str(f) for f in fields).lower()
+
+class SearchIndex:
+    """
+    Case-insensitive substring search over a list of records.
+
+    Keys are normalized once when records are added. Large lists also get a
+    trigram index, so a query only has to check records that contain its
+    rarest trigram. A query that extends the previous one (typing one more
+    character) only re-checks the previous results.
+    """
+    NGRAM = 3
+    # Below this many records a plain scan is faster than maintaining trigrams
+    NGRAM_MIN_RECORDS = 2000
+
+    def __init__(self, keys: Sequence[str] = ()):
+        self.keys: List[str] = []
+        self.grams: Optional[Dict[str, array]] = None
+        self._last_query = ""
+        self._last_result: Optional[List[int]] = None
+        self.add(keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, keys: Iterable[str]) -> None:
+        """
+        Append normalized keys (see search_key); positions continue from the current size.
+        """
+        start = len(self.keys)
+        self.keys.extend(keys)
+        self._last_query = ""
+        self._last_result = None
+        if self.grams is None:
+            if len(self.keys) >= self.NGRAM_MIN_RECORDS:
+                self.grams = {}
+                self._index_grams(0)
+        else:
+            self._index_grams(start)
+
+    def _index_grams(self, start: int) -> None:
+        n = self.NGRAM
+        grams = self.grams
+        for position in range(start, len(self.keys)):
+            key = self.keys[position]
+            for gram in {key[i:i + n] for i in range(len(key) - n + 1)}:
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = array("I")
+                postings.append(position)
+
+    def search(self, query: str) -> List[int]:
+        """
+        Return the positions of all records containing query, in insertion order.
+        """
+        query = query.lower()
+        if not query:
+            self._last_query = ""
+            self._last_result = None
+            return list(range(len(self.keys)))
+
+        candidates: Sequence[int] = range(len(self.keys))
+        if self._last_result is not None and self._last_query in query:
+            # Narrowing: every match must also match the previous, shorter query
+            candidates = self._last_result
+        if self.grams is not None and len(query) >= self.NGRAM:
+            postings = self._rarest_postings(query)
+            if postings is not None and len(postings) < len(candidates):
+                candidates = postings
+
+        keys = self.keys
+        result = [i for i in candidates if query in keys[i]]
+        self._last_query = query
+        self._last_result = result
+        return result
+
+    def _rarest_postings(self, query: str) -> Optional[Sequence[int]]:
+        n = self.NGRAM
+        rarest: Optional[Sequence[int]] = None
+        for i in range(len(query) - n + 1):
+            postings = self.grams.get(query[i:i + n])
+            if postings is None:
+                # A trigram no record contains: nothing can match
+                return ()
+            if rarest is None or len(postings) < len(rarest):
+                rarest = postings
+        return rarest
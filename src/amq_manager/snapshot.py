@@ -0,0 +1,52 @@
+"""
+The last queue list of each connection, kept on disk for the next start.
+
+Showing the saved list while the first live refresh runs gives the queue
+table something useful to show immediately, even over a slow link. Snapshots
+are written atomically, so a crash while saving never leaves a broken file.
+"""
+from dataclasses import dataclass
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from amq_manager.config import CONFIG_DIR, ConnectionConfig
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.path.join(CONFIG_DIR, "snapshots")
+
+@dataclass
+class QueueSnapshot:
+    queues: List[Dict[str, Any]]
+    saved_at: float  # time.time() of the refresh it was taken from
+
+def snapshot_path(config: ConnectionConfig) -> str:
+    key = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{config.name}_{config.host}_{config.port}")
+    return os.path.join(SNAPSHOT_DIR, f"{key}.json")
+
+def load_snapshot(config: ConnectionConfig) -> Optional[QueueSnapshot]:
+    """
+    The saved queue list of a connection, or None if there is none or it can't be read.
+    """
+    path = snapshot_path(config)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return QueueSnapshot(list(data["queues"]), float(data["saved_at"]))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable queue snapshot {path}: {e}")
+        return None
+
+def save_snapshot(config: ConnectionConfig, queues: List[Dict[str, Any]]) -> None:
+    path = snapshot_path(config)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"saved_at": time.time(), "queues": queues}, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,122 @@
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, Optional
+import time
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Per-sample fields, stored interleaved in one array per queue
+_TIME, _ENQUEUED, _DEQUEUED, _SIZE = range(4)
+_FIELDS = 4
+
+@dataclass
+class QueueRates:
+    enqueue_rate: float  # messages/s
+    dequeue_rate: float  # messages/s
+    growth_rate: float  # change in QueueSize per second; negative while draining
+    drain_seconds: Optional[float]  # time until empty at the current rate, None if not draining
+
+class QueueSeries:
+    """
+    Fixed-size ring buffer of (time, EnqueueCount, DequeueCount, QueueSize) samples for one queue.
+    """
+    __slots__ = ("data", "capacity", "head", "count")
+
+    def __init__(self, capacity: int):
+        self.data = array("d", bytes(8 * _FIELDS * capacity))
+        self.capacity = capacity
+        self.head = 0  # slot of the next sample
+        self.count = 0
+
+    def append(self, timestamp: float, enqueued: float, dequeued: float, size: float) -> None:
+        base = self.head * _FIELDS
+        self.data[base:base + _FIELDS] = array("d", (timestamp, enqueued, dequeued, size))
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def get(self, age: int, field: int) -> float:
+        """
+        Read a field of a sample; age 0 is the newest sample.
+        """
+        slot = (self.head - 1 - age) % self.capacity
+        return self.data[slot * _FIELDS + field]
+
+    def values(self, field: int, limit: Optional[int] = None) -> Iterable[float]:
+        """
+        Yield a field of the newest `limit` samples, oldest first.
+        """
+        n = self.count if limit is None else min(limit, self.count)
+        for age in range(n - 1, -1, -1):
+            yield self.get(age, field)
+
+class QueueSampler:
+    """
+    Records queue counters on every refresh and derives rates from them.
+
+    Memory is bounded: each queue keeps at most `capacity` samples in a single
+    array of doubles, and queues that disappear from the broker are dropped.
+    """
+
+    def __init__(self, capacity: int = 60, rate_window: int = 10):
+        self.capacity = capacity
+        # Rates are computed over the newest `rate_window` samples
+        self.rate_window = rate_window
+        self.series: Dict[str, QueueSeries] = {}
+
+    def record(self, queues: Iterable[Dict[str, Any]], timestamp: Optional[float] = None) -> None:
+        now = time.monotonic() if timestamp is None else timestamp
+        seen = set()
+        for q in queues:
+            name = q.get("Name", "Unknown")
+            seen.add(name)
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = QueueSeries(self.capacity)
+            series.append(now, q.get("EnqueueCount", 0), q.get("DequeueCount", 0), q.get("QueueSize", 0))
+        for name in [n for n in self.series if n not in seen]:
+            del self.series[name]
+
+    def clear(self) -> None:
+        self.series = {}
+
+    def rates(self, name: str) -> Optional[QueueRates]:
+        series = self.series.get(name)
+        if series is None or series.count < 2:
+            return None
+        oldest = min(self.rate_window, series.count) - 1
+        elapsed = series.get(0, _TIME) - series.get(oldest, _TIME)
+        if elapsed <= 0:
+            return None
+        enqueued = series.get(0, _ENQUEUED) - series.get(oldest, _ENQUEUED)
+        dequeued = series.get(0, _DEQUEUED) - series.get(oldest, _DEQUEUED)
+        if enqueued < 0 or dequeued < 0:
+            # Counters went backwards: the broker was restarted or the stats were reset
+            return None
+        growth = (series.get(0, _SIZE) - series.get(oldest, _SIZE)) / elapsed
+        size = series.get(0, _SIZE)
+        drain_seconds = size / -growth if growth < 0 and size > 0 else None
+        return QueueRates(enqueued / elapsed, dequeued / elapsed, growth, drain_seconds)
+
+    def sparkline(self, name: str, width: int = 20) -> str:
+        """
+        Render the newest `width` QueueSize samples as a unicode sparkline.
+        """
+        series = self.series.get(name)
+        if series is None:
+            return ""
+        sizes = list(series.values(_SIZE, width))
+        low, high = min(sizes), max(sizes)
+        if high == low:
+            return SPARK_CHARS[0] * len(sizes)
+        scale = (len(SPARK_CHARS) - 1) / (high - low)
+        return "".join(SPARK_CHARS[int((v - low) * scale)] for v in sizes)
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
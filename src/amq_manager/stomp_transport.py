@@ -0,0 +1,316 @@
+"""
+STOMP data plane for high-volume message transfer.
+
+Jolokia stays the control plane: it is one HTTP request per management
+operation and browse is capped by the broker's page size. For bulk work
+(draining a queue to a file, redriving a DLQ) consuming over STOMP streams
+messages at broker speed instead.
+
+Messages are consumed with `client` acknowledgement. ActiveMQ treats such an
+ACK as cumulative, so one ACK per window of `ack_window` messages confirms the
+whole window. `activemq.prefetchSize` bounds how many unacknowledged messages
+the broker pushes ahead, which also bounds memory.
+"""
+import base64
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import stomp
+
+from amq_manager.archive import TransferStats, open_archive
+
+if TYPE_CHECKING:
+    from amq_manager.config import ConnectionConfig
+
+logger = logging.getLogger(__name__)
+
+# Headers set by the broker or the STOMP protocol; they must not be copied onto a republished message
+DROPPED_HEADERS = {"message-id", "destination", "subscription", "ack", "redelivered", "original-destination", "timestamp", "receipt"}
+# STOMP headers that map onto JMS headers in an exported record
+JMS_HEADERS = {
+    "correlation-id": "JMSCorrelationID",
+    "type": "JMSType",
+    "reply-to": "JMSReplyTo",
+}
+
+ConnectionFactory = Callable[[List[Tuple[str, int]], bool], Any]
+
+def default_connection_factory(host_and_ports: List[Tuple[str, int]], use_ssl: bool) -> stomp.Connection12:
+    # Bodies stay bytes and content-length is only sent when copied from the source frame,
+    # so ActiveMQ keeps text messages as text and bytes messages as bytes
+    conn = stomp.Connection12(host_and_ports, auto_decode=False, auto_content_length=False)
+    if use_ssl:
+        conn.set_ssl(for_hosts=host_and_ports)
+    return conn
+
+def queue_destination(name: str) -> str:
+    return name if name.startswith("/") else f"/queue/{name}"
+
+def frame_to_record(frame: Any) -> Dict[str, Any]:
+    """
+    Convert a MESSAGE frame to the record format used by queue archives (see archive.py).
+    """
+    headers = frame.headers
+    record: Dict[str, Any] = {
+        "JMSMessageID": headers.get("message-id"),
+        "JMSDestination": headers.get("destination"),
+        "JMSTimestamp": int(headers.get("timestamp", 0)),
+        "JMSPriority": int(headers.get("priority", 4)),
+        "JMSDeliveryMode": "PERSISTENT" if headers.get("persistent") == "true" else "NON-PERSISTENT",
+        "JMSExpiration": int(headers.get("expires", 0)),
+        "JMSRedelivered": headers.get("redelivered") == "true",
+    }
+    properties = {}
+    for name, value in headers.items():
+        if name in JMS_HEADERS:
+            record[JMS_HEADERS[name]] = value
+        elif name not in DROPPED_HEADERS and name not in ("priority", "persistent", "expires", "content-length"):
+            properties[name] = value
+    record["StringProperties"] = properties
+    body = frame.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if "content-length" in headers:
+        # ActiveMQ only sends content-length for bytes messages
+        record["BodyBase64"] = base64.b64encode(body).decode("ascii")
+    else:
+        record["Text"] = body.decode("utf-8", errors="replace")
+    return record
+
+class _Listener(stomp.ConnectionListener):
+    """
+    Hands frames from the stomp.py receiver thread to the consuming thread.
+    """
+
+    def __init__(self):
+        self.frames: "queue.Queue[Any]" = queue.Queue()
+        self.subscription: Optional[str] = None
+        self.receipts: Dict[str, threading.Event] = {}
+        self.error: Optional[str] = None
+
+    def on_message(self, frame) -> None:
+        # Frames of an earlier subscription can still be in flight after it was
+        # unsubscribed; the broker redelivers them, so they are dropped here
+        if frame.headers.get("subscription") == self.subscription:
+            self.frames.put(frame)
+
+    def on_receipt(self, frame) -> None:
+        event = self.receipts.get(frame.headers.get("receipt-id"))
+        if event:
+            event.set()
+
+    def on_disconnected(self) -> None:
+        # Wake the consuming thread, which would otherwise wait out its idle or receipt timeout
+        self.frames.put(None)
+        for event in list(self.receipts.values()):
+            event.set()
+
+    def on_error(self, frame) -> None:
+        body = frame.body.decode("utf-8", errors="replace") if isinstance(frame.body, bytes) else frame.body
+        self.error = frame.headers.get("message") or body
+        logger.error(f"STOMP error: {self.error}")
+
+class StompTransport:
+    def __init__(self, host: str, port: int, user: str, password: str, ssl: bool = False,
+                 prefetch: int = 500, ack_window: int = 100, timeout: float = 10.0,
+                 connection_factory: Optional[ConnectionFactory] = None):
+        self.host_and_ports = [(host, port)]
+        self.user = user
+        self.password = password
+        self.ssl = ssl
+        self.prefetch = prefetch
+        # The broker stops delivering once `prefetch` messages are unacknowledged,
+        # so a window larger than that would never fill
+        self.ack_window = max(1, min(ack_window, prefetch))
+        self.timeout = timeout
+        self.connection_factory = connection_factory or default_connection_factory
+        self.conn = None
+        self.listener = _Listener()
+        self._next_id = 0
+
+    @classmethod
+    def from_config(cls, config: "ConnectionConfig", **kwargs) -> "StompTransport":
+        """
+        Build a transport for a saved connection, on its `stomp_port`.
+        """
+        return cls(config.host, config.stomp_port, config.user, config.password, config.ssl, **kwargs)
+
+    def connect(self) -> None:
+        host, port = self.host_and_ports[0]
+        self.conn = self.connection_factory(self.host_and_ports, self.ssl)
+        self.conn.set_listener("", self.listener)
+        try:
+            self.conn.connect(self.user, self.password, wait=True)
+        except stomp.exception.ConnectFailedException:
+            self.conn = None
+            raise Exception(f"Could not connect to STOMP at {host}:{port}")
+
+    def close(self) -> None:
+        if self.conn is not None and self.conn.is_connected():
+            self.conn.disconnect()
+        self.conn = None
+
+    def __enter__(self) -> "StompTransport":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return f"amq-manager-{self._next_id}"
+
+    def _ack(self, frame: Any) -> None:
+        """
+        Acknowledge a frame and every frame received before it, and wait until the broker has processed it.
+
+        The broker handles a connection's frames in order, so once the receipt arrives
+        every SEND issued before the ACK has been processed too.
+        """
+        receipt = self._new_id()
+        event = self.listener.receipts[receipt] = threading.Event()
+        try:
+            # STOMP 1.2 acknowledges by the ack header of the MESSAGE frame
+            self.conn.ack(frame.headers.get("ack") or frame.headers.get("message-id"), receipt=receipt)
+            if not event.wait(self.timeout):
+                raise Exception(f"No receipt from broker within {self.timeout}s")
+            if not self.conn.is_connected():
+                # The window is not confirmed, so the broker redelivers it
+                raise Exception("STOMP connection lost before the broker confirmed the acknowledgement")
+        finally:
+            del self.listener.receipts[receipt]
+        if self.listener.error:
+            raise Exception(f"STOMP error: {self.listener.error}")
+
+    def consume(self, queue_name: str, handler: Callable[[Any], None], max_messages: Optional[int] = None,
+                selector: Optional[str] = None, idle_timeout: float = 2.0,
+                on_window: Optional[Callable[[], None]] = None) -> int:
+        """
+        Pass messages of a queue to `handler` until `max_messages` were handled or none arrived for `idle_timeout` seconds.
+
+        Messages are acknowledged once per window, after `on_window` ran. If handler or
+        on_window raises, the current window is not acknowledged and the broker redelivers it.
+        Returns the number of messages handled.
+        """
+        if self.conn is None:
+            self.connect()
+        subscription = self._new_id()
+        self.listener.frames = queue.Queue()
+        self.listener.subscription = subscription
+        headers = {"activemq.prefetchSize": str(self.prefetch)}
+        if selector:
+            headers["selector"] = selector
+        self.conn.subscribe(queue_destination(queue_name), subscription, ack="client", headers=headers)
+
+        count = 0
+        unacked = None
+        try:
+            while max_messages is None or count < max_messages:
+                try:
+                    frame = self.listener.frames.get(timeout=idle_timeout)
+                except queue.Empty:
+                    break
+                if frame is None:
+                    # Unacknowledged messages stay on the broker and are redelivered
+                    raise Exception(f"STOMP connection lost after {count} messages from {queue_name}")
+                handler(frame)
+                count += 1
+                unacked = frame
+                if count % self.ack_window == 0:
+                    if on_window:
+                        on_window()
+                    self._ack(unacked)
+                    unacked = None
+            if unacked is not None:
+                if on_window:
+                    on_window()
+                self._ack(unacked)
+        finally:
+            # Prefetched messages that were not handled go back to the queue
+            if self.conn.is_connected():
+                self.conn.unsubscribe(subscription)
+        return count
+
+    def drain_to_file(self, queue_name: str, path: str, max_messages: Optional[int] = None,
+                      selector: Optional[str] = None, progress: Optional[Callable[[TransferStats], None]] = None) -> TransferStats:
+        """
+        Consume messages into a queue archive. A window is acknowledged only after it was flushed to the file.
+        """
+        stats = TransferStats(started=time.monotonic())
+        with open_archive(path, "w") as out:
+            def write(frame: Any) -> None:
+                line = json.dumps(frame_to_record(frame)) + "\n"
+                out.write(line)
+                stats.bytes += len(line)
+                stats.messages += 1
+                stats.finished = time.monotonic()
+
+            def flush() -> None:
+                out.flush()
+                if progress:
+                    progress(stats)
+
+            self.consume(queue_name, write, max_messages, selector, on_window=flush)
+        # Throughput is measured up to the last message, not including the idle timeout
+        if stats.finished is None:
+            stats.finished = time.monotonic()
+        logger.info(f"Drained {stats.messages} messages from {queue_name} to {path} ({stats.rate:.0f} msg/s)")
+        return stats
+
+    def redrive(self, source_queue: str, target: Callable[[Any], str], max_messages: Optional[int] = None,
+                selector: Optional[str] = None, progress: Optional[Callable[[TransferStats], None]] = None) -> TransferStats:
+        """
+        Consume messages and republish each to the queue returned by `target(frame)`.
+        A window is acknowledged only after the broker has processed its sends, so a
+        failure can duplicate messages but never lose them.
+        """
+        stats = TransferStats(started=time.monotonic())
+
+        def republish(frame: Any) -> None:
+            headers = {k: v for k, v in frame.headers.items() if k not in DROPPED_HEADERS}
+            self.conn.send(queue_destination(target(frame)), frame.body or b"", headers=headers)
+            stats.bytes += len(frame.body or b"")
+            stats.messages += 1
+            stats.finished = time.monotonic()
+
+        def report() -> None:
+            if progress:
+                progress(stats)
+
+        self.consume(source_queue, republish, max_messages, selector, on_window=report)
+        if stats.finished is None:
+            stats.finished = time.monotonic()
+        logger.info(f"Redrove {stats.messages} messages from {source_queue} ({stats.rate:.0f} msg/s)")
+        return stats
+
+    def move(self, source_queue: str, target_queue: str, max_messages: Optional[int] = None,
+             selector: Optional[str] = None, progress: Optional[Callable[[TransferStats], None]] = None) -> TransferStats:
+        """
+        Consume-and-republish every message of one queue to another.
+        """
+        return self.redrive(source_queue, lambda frame: target_queue, max_messages, selector, progress)
+
+    def requeue(self, dlq: str, default_target: Optional[str] = None, max_messages: Optional[int] = None,
+                selector: Optional[str] = None, progress: Optional[Callable[[TransferStats], None]] = None) -> TransferStats:
+        """
+        Send dead letters back to the queue they came from.
+
+        The target is the message's original-destination header, then `default_target`,
+        then the DLQ name without its `DLQ.` prefix (individual dead letter strategy).
+        """
+        fallback = default_target
+        if fallback is None and dlq.startswith("DLQ."):
+            fallback = dlq[len("DLQ."):]
+
+        def original_queue(frame: Any) -> str:
+            destination = frame.headers.get("original-destination") or fallback
+            if not destination:
+                raise Exception(f"Message {frame.headers.get('message-id')} has no original destination")
+            return destination
+
+        return self.redrive(dlq, original_queue, max_messages, selector, progress)
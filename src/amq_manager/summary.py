@@ -0,0 +1,57 @@
+"""
+Compact records for the messages shown in the message list.
+
+A browsed message is a dict holding its own copy of every header name, and in
+a full browse every property and the body as well. The list only shows five
+headers, so it keeps a slotted MessageSummary per message instead: no per-message
+dict or key strings, and JMSType values interned so repeated types are stored
+once. The full message is fetched by ID when it is opened (see fetch_message).
+"""
+import sys
+from typing import Any, Dict, Optional
+
+class MessageSummary:
+    """
+    The LISTING_FIELDS headers of one message.
+    """
+    __slots__ = ("message_id", "timestamp", "priority", "redelivered", "jms_type")
+
+    def __init__(self, message_id: str, timestamp: Any = None, priority: Optional[int] = None,
+                 redelivered: Optional[bool] = None, jms_type: Optional[str] = None):
+        self.message_id = message_id
+        self.timestamp = timestamp  # As serialized by Jolokia: epoch millis or ISO 8601
+        self.priority = priority
+        self.redelivered = redelivered
+        self.jms_type = jms_type
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "MessageSummary":
+        jms_type = message.get("JMSType")
+        return cls(
+            message.get("JMSMessageID", "Unknown"),
+            message.get("JMSTimestamp"),
+            message.get("JMSPriority"),
+            message.get("JMSRedelivered"),
+            sys.intern(jms_type) if isinstance(jms_type, str) else jms_type,
+        )
+
+    def as_message(self) -> Dict[str, Any]:
+        """
+        The headers as a header-only message, as browse_headers returns it.
+        """
+        return {
+            "JMSMessageID": self.message_id,
+            "JMSTimestamp": self.timestamp,
+            "JMSPriority": self.priority,
+            "JMSRedelivered": self.redelivered,
+            "JMSType": self.jms_type,
+        }
+
+    def size(self) -> int:
+        """
+        Approximate bytes held by this summary alone; interned and small values are shared.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.message_id)
+        if isinstance(self.timestamp, (int, str)):
+            size += sys.getsizeof(self.timestamp)
+        return size
@@ -1,73 +1,300 @@
+from textual import work
 from textual.app import App, ComposeResult
+from textual.message import Message
+from textual.worker import get_current_worker
 from textual.widgets import Header, Footer, DataTable, Static, Input
 from textual.containers import Container
-from amq_manager.client import ActiveMQClient
+from rich.text import Text
+from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING
+from amq_manager.body_format import BodyCache
+from amq_manager.browse_cache import BrowseCache
+from amq_manager.client import ActiveMQClient, QUEUE_LIST_ATTRIBUTES
 from amq_manager.config import ConfigManager, ConnectionConfig
-from amq_manager.ui.message_list import MessageListScreen
-from amq_manager.ui.connection_screen import ConnectionScreen
-from amq_manager.ui.log_screen import LogScreen
+from amq_manager.metrics import Metrics
+from amq_manager.queue_index import QueueNameIndex
+from amq_manager.search import SearchIndex, search_key
+from amq_manager.snapshot import load_snapshot, save_snapshot
+from amq_manager.stats import QueueSampler, format_duration
 import logging
+import time
+
+# Screens and the advisory listener (which loads stomp) are imported where they
+# are first used, so the queue list paints without waiting for them
+if TYPE_CHECKING:
+    from amq_manager.advisory import AdvisoryListener, QueueEvent, QueueRegistry
 
 logger = logging.getLogger(__name__)
 
 class QueueList(Static):
+    # Seconds to wait after the last keystroke before filtering
+    FILTER_DEBOUNCE = 0.1
+    # Removing a DataTable row costs about one dict pass over all rows, adding one
+    # costs roughly this many; update_table rebuilds the rows when that is cheaper
+    ROW_ADD_COST = 20
+    # A queue stays highlighted this many seconds after its size last grew
+    GROWTH_HIGHLIGHT_SECONDS = 10.0
+    # Minimum seconds between writes of the on-disk snapshot while auto-refreshing
+    SNAPSHOT_INTERVAL = 60.0
+    # Attributes polled while the advisory listener keeps consumer counts current
+    ADVISED_ATTRIBUTES = [a for a in QUEUE_LIST_ATTRIBUTES if a != "ConsumerCount"]
+    # While the first listing downloads, its queues are shown in batches of this many
+    PARTIAL_BATCH = 500
+
+    class QueuesLoaded(Message):
+        """
+        Posted by the refresh worker with the listed queues. With partial, queues is
+        the next batch of a listing that is still downloading.
+        """
+        def __init__(self, queues: List[Dict[str, Any]], error: Optional[str] = None, notify: bool = True,
+                     partial: bool = False) -> None:
+            super().__init__()
+            self.queues = queues
+            self.error = error
+            self.notify = notify
+            self.partial = partial
+
+    class AdvisoryReceived(Message):
+        """Posted from the advisory listener thread for every queue event."""
+        def __init__(self, event: "QueueEvent") -> None:
+            super().__init__()
+            self.event = event
+
     def compose(self) -> ComposeResult:
         yield DataTable()
         yield Input(placeholder="Filter queues...", id="filter")
 
     def on_mount(self) -> None:
         self.queues_data = []
+        self.queue_names: List[str] = []
+        self.search_index = SearchIndex()
+        self.filter_timer = None
+        self.auto_refresh_timer = None
+        # Previous snapshot, used to update only the cells that changed
+        self.row_values: Dict[str, Tuple[Any, ...]] = {}
+        self.last_sizes: Dict[str, int] = {}
+        self.grew_at: Dict[str, float] = {}
+        self.growing: set = set()
+        self.sampler = QueueSampler()
+        # time.time() of the cached snapshot on display, until the first live refresh replaces it
+        self.stale_at: Optional[float] = None
+        self.snapshot_saved_at = 0.0
         table = self.query_one(DataTable)
         table.cursor_type = "row"
-        table.add_columns("Queue Name", "Pending", "Consumers", "Enqueued", "Dequeued")
+        self.columns = table.add_columns(
+            "Queue Name", "Pending", "Consumers", "Enqueued", "Dequeued", "In/s", "Out/s", "Trend", "Drain ETA"
+        )
         self.refresh_queues()
 
-    def refresh_queues(self) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+    def refresh_queues(self, notify: bool = True) -> None:
+        client = getattr(self.app, "client", None)
+        if client is None:
             return
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
-        )
+        # While advisories are live, consumer counts come from their registry instead of the poll
+        listener = getattr(self.app, "advisory_listener", None)
+        registry = listener.registry if listener is not None and listener.is_connected() else None
+        # With nothing on screen yet, rows are shown as they download rather than all at the end
+        progressive = not self.queues_data
+        self.fetch_queues(client, notify, getattr(self.app, "active_config", None), registry, progressive)
+
+    def show_snapshot(self, config: ConnectionConfig) -> None:
+        """
+        Show the queue list saved by the last session on this connection, marked as stale.
+        """
+        snapshot = load_snapshot(config)
+        if snapshot is not None:
+            self.queues_data = snapshot.queues
+            self.stale_at = snapshot.saved_at
+            self.show_queues()
+        self.app.update_sub_title()
+
+    def toggle_auto_refresh(self, interval: float) -> bool:
+        """
+        Start or stop polling the broker every interval seconds. Returns True when enabled.
+        """
+        if self.auto_refresh_timer is not None:
+            self.auto_refresh_timer.stop()
+            self.auto_refresh_timer = None
+            return False
+        self.auto_refresh_timer = self.set_interval(interval, self.auto_refresh)
+        return True
+
+    def auto_refresh(self) -> None:
+        # Don't poll while another screen is in front, or while the last poll is still running
+        if self.app.screen is not self.screen:
+            return
+        if any(w.group == "refresh_queues" and w.is_running for w in self.workers):
+            return
+        self.refresh_queues(notify=False)
+
+    def reset_snapshot(self) -> None:
+        """
+        Forget the previous snapshot, e.g. after switching to another broker.
+        """
+        self.last_sizes = {}
+        self.grew_at = {}
+        self.growing = set()
+        self.sampler.clear()
+        self.stale_at = None
+        self.snapshot_saved_at = 0.0
+
+    @work(thread=True, exclusive=True, group="refresh_queues")
+    def fetch_queues(self, client: ActiveMQClient, notify: bool = True, config: Optional[ConnectionConfig] = None,
+                     registry: Optional["QueueRegistry"] = None, progressive: bool = False) -> None:
+        worker = get_current_worker()
+        queues: List[Dict[str, Any]] = []
+        counts = registry.consumer_counts() if registry is not None else None
         try:
-            self.queues_data = client.list_queues()
-            self.update_table()
-            self.app.notify(f"Refreshed {len(self.queues_data)} queues")
-            logger.info(f"Refreshed {len(self.queues_data)} queues")
+            for q in client.iter_queues(QUEUE_LIST_ATTRIBUTES if counts is None else self.ADVISED_ATTRIBUTES):
+                if worker.is_cancelled:
+                    return
+                if counts is not None:
+                    q["ConsumerCount"] = counts.get(q.get("Name"), 0)
+                queues.append(q)
+                if progressive and len(queues) % self.PARTIAL_BATCH == 0:
+                    self.post_message(self.QueuesLoaded(queues[-self.PARTIAL_BATCH:], notify=False, partial=True))
         except Exception as e:
-            error_msg = f"Error refreshing queues: {str(e)}"
-            logger.error(error_msg)
-            self.app.notify(error_msg, severity="error", timeout=10)
-            self.queues_data = []
-            self.update_table()
+            if not worker.is_cancelled:
+                self.post_message(self.QueuesLoaded([], f"Error refreshing queues: {str(e)}", notify))
+            return
+        if worker.is_cancelled:
+            return
+        self.post_message(self.QueuesLoaded(queues, None, notify))
+        if config is not None and time.monotonic() - self.snapshot_saved_at >= self.SNAPSHOT_INTERVAL:
+            self.snapshot_saved_at = time.monotonic()
+            try:
+                save_snapshot(config, queues)
+            except OSError as e:
+                logger.warning(f"Could not save the queue snapshot of {config.name}: {e}")
+
+    def on_queue_list_queues_loaded(self, event: QueuesLoaded) -> None:
+        if event.partial:
+            self.queues_data.extend(event.queues)
+            self.show_queues(partial=True)
+            return
+        if event.error:
+            logger.error(event.error)
+            self.app.notify(event.error, severity="error", timeout=10)
+            if self.stale_at is not None:
+                # Keep the cached queues rather than an empty table
+                return
+        elif event.notify:
+            self.app.notify(f"Refreshed {len(event.queues)} queues")
+            logger.info(f"Refreshed {len(event.queues)} queues")
+        self.queues_data = event.queues
+        if self.stale_at is not None:
+            self.stale_at = None
+            self.app.update_sub_title()
+        if not event.error:
+            self.sampler.record(event.queues)
+        
+        now = time.monotonic()
+        sizes = {q.get("Name", "Unknown"): q.get("QueueSize", 0) for q in event.queues}
+        for name, size in sizes.items():
+            if size > self.last_sizes.get(name, size):
+                self.grew_at[name] = now
+        self.grew_at = {name: t for name, t in self.grew_at.items() if now - t < self.GROWTH_HIGHLIGHT_SECONDS}
+        self.growing = set(self.grew_at)
+        self.last_sizes = sizes
+        self.show_queues()
+
+    def on_queue_list_advisory_received(self, message: AdvisoryReceived) -> None:
+        event = message.event
+        if event.kind == "disconnected":
+            self.app.notify("Advisory connection lost; press r to reconnect and refresh queues", severity="warning", timeout=10)
+            return
+        if event.kind == "added":
+            if any(q.get("Name") == event.name for q in self.queues_data):
+                return
+            # A new queue starts empty; its counters arrive with the next refresh
+            self.queues_data.append({"Name": event.name, "QueueSize": 0, "ConsumerCount": 0, "EnqueueCount": 0, "DequeueCount": 0})
+        elif event.kind == "removed":
+            self.queues_data = [q for q in self.queues_data if q.get("Name") != event.name]
+        elif event.kind == "consumers":
+            for q in self.queues_data:
+                if q.get("Name") == event.name:
+                    q["ConsumerCount"] = event.count
+        else:
+            return
+        self.show_queues()
+
+    def show_queues(self, partial: bool = False) -> None:
+        names = [q.get("Name", "Unknown") for q in self.queues_data]
+        # The move dialogs suggest targets from the same names; a cached list doesn't count as fresh
+        index = self.app.queue_index
+        if names != self.queue_names:
+            # Only re-index when queues were created or removed
+            self.queue_names = names
+            self.search_index = SearchIndex([search_key((name,)) for name in names])
+            if index is not None:
+                index.update(names, full=self.stale_at is None and not partial)
+        elif index is not None and self.stale_at is None:
+            index.mark_listed()
+        self.update_table(self.query_one("#filter", Input).value)
+
+    def row_cells(self, q: Dict[str, Any]) -> Tuple[Any, ...]:
+        name = q.get("Name", "Unknown")
+        pending: Any = str(q.get("QueueSize", 0))
+        if name in self.growing:
+            pending = Text(f"{pending} ▲", style="bold red")
+        rates = self.sampler.rates(name)
+        return (
+            name,
+            pending,
+            str(q.get("ConsumerCount", 0)),
+            str(q.get("EnqueueCount", 0)),
+            str(q.get("DequeueCount", 0)),
+            f"{rates.enqueue_rate:.1f}" if rates else "-",
+            f"{rates.dequeue_rate:.1f}" if rates else "-",
+            self.sampler.sparkline(name),
+            format_duration(rates.drain_seconds) if rates else "-",
+        )
 
     def update_table(self, filter_text: str = "") -> None:
+        """
+        Bring the table in line with queues_data and the filter, touching only the rows and cells that changed.
+        """
+        start = time.perf_counter()
         table = self.query_one(DataTable)
-        table.clear()
+        rows = {}
+        for i in self.search_index.search(filter_text):
+            q = self.queues_data[i]
+            rows[q.get("Name", "Unknown")] = self.row_cells(q)
+        
+        removed = [name for name in self.row_values if name not in rows]
+        if len(removed) * table.row_count > len(rows) * self.ROW_ADD_COST:
+            table.clear()
+            self.row_values = {}
+            removed = []
+        for name in removed:
+            table.remove_row(name)
+            del self.row_values[name]
+        
+        append_only = table.row_count == 0
+        added = False
+        for name, cells in rows.items():
+            previous = self.row_values.get(name)
+            if previous is None:
+                table.add_row(*cells, key=name)
+                added = True
+            elif previous != cells:
+                for column, old, new in zip(self.columns, previous, cells):
+                    if old != new:
+                        table.update_cell(name, column, new)
+            self.row_values[name] = cells
         
-        filter_text = filter_text.lower()
-        for q in self.queues_data:
-            name = q.get("Name", "Unknown")
-            if filter_text and filter_text not in name.lower():
-                continue
-                
-            table.add_row(
-                name,
-                str(q.get("QueueSize", 0)),
-                str(q.get("ConsumerCount", 0)),
-                str(q.get("EnqueueCount", 0)),
-                str(q.get("DequeueCount", 0)),
-                key=name
-            )
+        if added and not append_only:
+            # New queues are appended, so put them back into broker order
+            order = {name: i for i, name in enumerate(rows)}
+            table.sort(self.columns[0], key=lambda name: order.get(name, 0))
+        self.app.metrics.observe("queue_list.update_table", time.perf_counter() - start)
 
     def on_input_changed(self, event: Input.Changed) -> None:
-        self.update_table(event.value)
+        # Debounce: only filter once typing pauses
+        if self.filter_timer is not None:
+            self.filter_timer.stop()
+        value = event.value
+        self.filter_timer = self.set_timer(self.FILTER_DEBOUNCE, lambda: self.update_table(value))
     
     def on_input_submitted(self, event: Input.Submitted) -> None:
         # Hide input and focus table on enter
@@ -84,6 +311,7 @@ class QueueList(Static):
             self.query_one(DataTable).focus()
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        from amq_manager.ui.message_list import MessageListScreen
         queue_name = event.row_key.value
         self.app.push_screen(MessageListScreen(queue_name))
 
@@ -104,39 +332,173 @@ class ActiveMQManagerApp(App):
         ("c", "manage_connections", "Connections"),
         ("l", "show_logs", "Logs"),
         ("/", "toggle_filter", "Filter"),
+        ("a", "toggle_auto_refresh", "Auto Refresh"),
+        ("m", "show_metrics", "Metrics"),
     ]
+    # Seconds between writes of the Prometheus textfile, when configured
+    METRICS_EXPORT_INTERVAL = 15.0
+
+    active_config: Optional[ConnectionConfig] = None
+    client: Optional[ActiveMQClient] = None
+    browse_cache: Optional[BrowseCache] = None
+    body_cache: Optional[BodyCache] = None
+    queue_index: Optional[QueueNameIndex] = None
+    advisory_listener: Optional["AdvisoryListener"] = None
+
+    def __init__(self):
+        super().__init__()
+        # Shared by every connection's client, so the metrics screen spans connection switches
+        self.metrics = Metrics()
+        self.metrics_export_timer = None
 
     def on_mount(self) -> None:
         config_manager = ConfigManager()
-        self.active_config = config_manager.get_default_connection()
-        if self.active_config:
-            self.title = f"ActiveMQ Manager - {self.active_config.name}"
-            # Trigger initial queue refresh now that we have a config
-            self.query_one(QueueList).refresh_queues()
+        default_config = config_manager.get_default_connection()
+        if default_config:
+            self.set_active_config(default_config)
+            # Paint the last known queues at once; the refresh replaces them when it returns
+            queue_list = self.query_one(QueueList)
+            queue_list.show_snapshot(default_config)
+            queue_list.refresh_queues()
         else:
             self.action_manage_connections()
 
+    def on_unmount(self) -> None:
+        self.stop_advisories()
+        self.export_metrics()
+        if self.client is not None:
+            self.client.close()
+
+    def set_active_config(self, config: ConnectionConfig) -> None:
+        """
+        Switch to a connection, replacing the shared client and caches that all screens use.
+        """
+        self.stop_advisories()
+        if self.client is not None:
+            self.client.close()
+        self.active_config = config
+        self.client = ActiveMQClient.from_config(config, self.metrics)
+        self.browse_cache = BrowseCache(config.browse_cache_mb * 1024 * 1024)
+        self.body_cache = BodyCache()
+        self.queue_index = QueueNameIndex()
+        self.title = f"ActiveMQ Manager - {config.name}"
+        if self.metrics_export_timer is not None:
+            self.metrics_export_timer.stop()
+            self.metrics_export_timer = None
+        if config.metrics_textfile:
+            self.metrics_export_timer = self.set_interval(self.METRICS_EXPORT_INTERVAL, self.export_metrics)
+        if config.advisories:
+            self.start_advisories(config, self.client, self.query_one(QueueList))
+
+    @work(thread=True, exclusive=True, group="advisories")
+    def start_advisories(self, config: ConnectionConfig, client: ActiveMQClient, queue_list: QueueList) -> None:
+        """
+        Subscribe to the queue advisory topics so the queue list follows queue and consumer changes without polling.
+        """
+        from amq_manager.advisory import AdvisoryListener, QueueRegistry
+        worker = get_current_worker()
+        registry = QueueRegistry()
+        listener = AdvisoryListener.from_config(
+            config, registry=registry, on_event=lambda event: queue_list.post_message(QueueList.AdvisoryReceived(event))
+        )
+        try:
+            # Seed first, so the broker replaying existing queues on subscribe changes nothing
+            registry.seed(client.list_queues(["Name", "ConsumerCount"]))
+            listener.start()
+        except Exception as e:
+            logger.error(f"Could not subscribe to advisories on {config.host}:{config.stomp_port}: {e}")
+            if not worker.is_cancelled:
+                self.call_from_thread(self.notify, f"Advisories unavailable: {e}", severity="warning", timeout=10)
+            return
+        if worker.is_cancelled:
+            listener.stop()
+            return
+        self.advisory_listener = listener
+
+    def export_metrics(self) -> None:
+        """
+        Write the Prometheus textfile of the active connection, if it has one.
+        """
+        if self.active_config is None or not self.active_config.metrics_textfile:
+            return
+        try:
+            self.metrics.write_textfile(self.active_config.metrics_textfile)
+        except OSError as e:
+            logger.error(f"Failed to write metrics to {self.active_config.metrics_textfile}: {e}")
+
+    def reconnect_advisories(self) -> None:
+        """
+        Start the advisory listener again if the active connection uses advisories and it isn't connected.
+        """
+        config = self.active_config
+        if config is None or not config.advisories or self.client is None:
+            return
+        if self.advisory_listener is not None and self.advisory_listener.is_connected():
+            return
+        if any(w.group == "advisories" and w.is_running for w in self.workers):
+            return
+        self.stop_advisories()
+        # A fresh registry is seeded from Jolokia, so events missed while disconnected don't matter
+        self.start_advisories(config, self.client, self.query_one(QueueList))
+
+    def stop_advisories(self) -> None:
+        self.workers.cancel_group(self, "advisories")
+        if self.advisory_listener is not None:
+            self.advisory_listener.stop()
+            self.advisory_listener = None
+
     def compose(self) -> ComposeResult:
         yield Header()
         yield QueueList()
         yield Footer()
 
     def action_refresh(self) -> None:
+        self.reconnect_advisories()
         self.query_one(QueueList).refresh_queues()
 
     def action_manage_connections(self) -> None:
+        from amq_manager.ui.connection_screen import ConnectionScreen
+
         def handle_select(config: ConnectionConfig):
             if config:
-                self.active_config = config
-                self.title = f"ActiveMQ Manager - {config.name}"
-                self.query_one(QueueList).refresh_queues()
+                self.set_active_config(config)
+                queue_list = self.query_one(QueueList)
+                queue_list.reset_snapshot()
+                queue_list.show_snapshot(config)
+                queue_list.refresh_queues()
                 self.notify(f"Switched to {config.name}")
         
         self.push_screen(ConnectionScreen(), handle_select)
 
+    def action_toggle_auto_refresh(self) -> None:
+        try:
+            queue_list = self.query_one(QueueList)
+        except Exception:
+            # QueueList not found (e.g., on a different screen), ignore
+            return
+        interval = self.active_config.refresh_interval if self.active_config else 2.0
+        queue_list.toggle_auto_refresh(interval)
+        self.update_sub_title()
+
+    def update_sub_title(self) -> None:
+        queue_list = self.query_one(QueueList)
+        parts = []
+        if queue_list.stale_at is not None:
+            parts.append(f"Cached queue list from {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(queue_list.stale_at))}")
+        if queue_list.auto_refresh_timer is not None:
+            interval = self.active_config.refresh_interval if self.active_config else 2.0
+            parts.append(f"Auto-refresh every {interval:g}s")
+        self.sub_title = " | ".join(parts)
+
     def action_show_logs(self) -> None:
+        from amq_manager.ui.log_screen import LogScreen
         self.push_screen(LogScreen())
 
+    def action_show_metrics(self) -> None:
+        from amq_manager.ui.metrics_screen import MetricsScreen
+        textfile = self.active_config.metrics_textfile if self.active_config else None
+        self.push_screen(MetricsScreen(self.metrics, textfile))
+
     def action_toggle_filter(self) -> None:
         try:
             self.query_one(QueueList).action_toggle_filter()
@@ -1,9 +1,15 @@
+from textual import work
 from textual.app import ComposeResult
+from textual.message import Message
 from textual.screen import ModalScreen
 from textual.widgets import Label, Input, Button, OptionList
 from textual.widgets.option_list import Option
 from textual.containers import Grid, Vertical
-from amq_manager.client import ActiveMQClient
+from textual.worker import get_current_worker
+from amq_manager.batch import BatchExecutor, BatchProgress, format_progress
+from amq_manager.client import ActiveMQClient, OperationPending
+from amq_manager.queue_index import STALE_AFTER, QueueNameIndex, dlq_original
+from typing import Dict, List, Optional
 
 class BatchMoveModal(ModalScreen):
     BINDINGS = [
@@ -41,16 +47,40 @@ class BatchMoveModal(ModalScreen):
     }
     """
 
-    def __init__(self, message_ids: list, source_queue: str):
+    class QueueNamesLoaded(Message):
+        """Posted by the background queue-name lookup once it has updated the index."""
+
+    class MoveProgress(Message):
+        """Posted by the batch executor after every chunk."""
+        def __init__(self, progress: BatchProgress) -> None:
+            super().__init__()
+            self.progress = progress
+
+    class MoveFinished(Message):
+        """Posted by the move worker when it completes or is cancelled."""
+        def __init__(self, result) -> None:
+            super().__init__()
+            self.result = result
+
+    def __init__(self, message_ids: list, source_queue: str, selector: Optional[str] = None):
         super().__init__()
         self.message_ids = message_ids
         self.source_queue = source_queue
-        self.all_queues = []
+        # When set, move everything matching this selector ("" = whole queue) inside the broker
+        self.selector = selector
+        self.index: Optional[QueueNameIndex] = None
 
     def compose(self) -> ComposeResult:
+        if self.selector is None:
+            title = f"Move {len(self.message_ids)} messages"
+        elif self.selector:
+            title = f"Move all messages matching {self.selector}"
+        else:
+            title = "Move all messages"
         yield Vertical(
-            Label(f"Move {len(self.message_ids)} messages"),
+            Label(title),
             Label(f"from {self.source_queue}"),
+            Label("", id="status"),
             Input(placeholder="Target Queue Name", id="target_queue"),
             OptionList(id="queue_suggestions"),
             Grid(
@@ -60,51 +90,50 @@ class BatchMoveModal(ModalScreen):
         )
 
     def on_mount(self) -> None:
-        self.load_queues()
+        # Suggest from the names the app already knows, and re-list them in the background if old
+        self.index = getattr(self.app, "queue_index", None)
+        if self.index is None:
+            self.index = QueueNameIndex()
+        self.update_suggestions("")
+        age = self.index.age()
+        if not len(self.index) or age is None or age > STALE_AFTER:
+            self.load_queues()
 
     def load_queues(self) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+        client = getattr(self.app, "client", None)
+        if client is None:
             return
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
-        )
+        self.fetch_queue_names(client)
+
+    @work(thread=True, exclusive=True, group="load_queues")
+    def fetch_queue_names(self, client: ActiveMQClient) -> None:
         try:
-            queues = client.list_queues()
-            # Exclude the source queue from suggestions
-            self.all_queues = [q.get("Name", "") for q in queues if q.get("Name") and q.get("Name") != self.source_queue]
-            self.update_suggestions("")
+            queues = client.list_queues(["Name"])
         except Exception:
-            pass
+            return
+        self.index.update(q.get("Name") for q in queues)
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.QueueNamesLoaded())
+
+    def on_batch_move_modal_queue_names_loaded(self, event: "QueueNamesLoaded") -> None:
+        self.update_suggestions(self.query_one("#target_queue", Input).value)
 
     def update_suggestions(self, filter_text: str) -> None:
         option_list = self.query_one("#queue_suggestions", OptionList)
         option_list.clear_options()
         
-        filter_text = filter_text.lower()
-        matching_queues = [q for q in self.all_queues if filter_text in q.lower()]
-        
-        # Smart DLQ sorting: if source is a DLQ, prioritize the original queue
-        if self.source_queue.lower().startswith("dlq."):
-            original_queue = self.source_queue[4:]  # Remove "dlq." or "DLQ." prefix
-            matching_queues.sort(key=lambda q: (q != original_queue, q.lower()))
-            
-            # Add queues with visual highlighting for the original queue
-            for queue in matching_queues:
-                if queue == original_queue:
-                    option_list.add_option(Option(f"⭐ {queue}", id=queue))
-                else:
-                    option_list.add_option(Option(queue, id=queue))
-        else:
-            matching_queues.sort(key=lambda q: q.lower())
-            for queue in matching_queues:
-                option_list.add_option(Option(queue, id=queue))
+        # Smart DLQ sorting: if source is a DLQ, the original queue comes first, then recent targets
+        original_queue = dlq_original(self.source_queue)
+        options = []
+        for queue in self.index.suggest(filter_text, exclude=self.source_queue, original=original_queue):
+            if queue == original_queue:
+                options.append(Option(f"⭐ {queue}", id=queue))
+            elif queue in self.index.recent:
+                options.append(Option(f"↺ {queue}", id=queue))
+            else:
+                options.append(Option(queue, id=queue))
+        option_list.add_options(options)
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "target_queue":
@@ -150,6 +179,13 @@ class BatchMoveModal(ModalScreen):
             self.action_move()
 
     def action_cancel(self) -> None:
+        move_workers = [w for w in self.workers if w.group == "move" and w.is_running]
+        if move_workers:
+            # Stop after the chunks in flight; MoveFinished reports what was already moved
+            for worker in move_workers:
+                worker.cancel()
+            self.query_one("#status", Label).update("Cancelling...")
+            return
         self.dismiss(False)
 
     def action_move(self) -> None:
@@ -164,22 +200,60 @@ class BatchMoveModal(ModalScreen):
         self.move_messages(target_queue)
 
     def move_messages(self, target_queue: str) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+        client = getattr(self.app, "client", None)
+        if client is None:
             return
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
-        )
-        
-        success_count = 0
-        for msg_id in self.message_ids:
-            if client.move_message(msg_id, self.source_queue, target_queue):
-                success_count += 1
-        
-        self.dismiss(success_count)
+        if any(w.group == "move" and w.is_running for w in self.workers):
+            return
+        self.query_one("#status", Label).update(f"Moving to {target_queue}...")
+        self.run_move(client, target_queue)
+
+    @work(thread=True, exclusive=True, group="move")
+    def run_move(self, client: ActiveMQClient, target_queue: str) -> None:
+        worker = get_current_worker()
+        cache = getattr(self.app, "browse_cache", None)
+        if cache is not None:
+            # The target gains messages at positions we can't predict
+            cache.invalidate(target_queue)
+        if self.selector is not None:
+            if cache is not None:
+                cache.invalidate(self.source_queue)
+            try:
+                success_count = client.move_matching_messages(self.source_queue, target_queue, self.selector)
+            except Exception as e:
+                self.post_message(self.MoveFinished(e))
+                return
+        else:
+            def remove_moved(results: Dict[str, bool]) -> None:
+                if cache is not None:
+                    cache.remove_messages(self.source_queue, [msg_id for msg_id, ok in results.items() if ok])
+
+            def task(message_ids: List[str]) -> Dict[str, Optional[bool]]:
+                return client.move_chunk(message_ids, self.source_queue, target_queue)
+
+            # The client and the active connection are always set together
+            executor = BatchExecutor.from_config(
+                self.app.active_config, task,
+                on_progress=lambda progress: self.post_message(self.MoveProgress(progress)), on_chunk=remove_moved,
+            )
+            results = executor.run(self.message_ids, lambda: worker.is_cancelled)
+            success_count = sum(results.values())
+        if success_count:
+            self.index.record_target(target_queue)
+        self.post_message(self.MoveFinished(success_count))
+
+    def on_batch_move_modal_move_progress(self, event: MoveProgress) -> None:
+        if not any(w.group == "move" and w.is_cancelled for w in self.workers):
+            self.query_one("#status", Label).update(format_progress(event.progress))
+
+    def on_batch_move_modal_move_finished(self, event: MoveFinished) -> None:
+        if isinstance(event.result, OperationPending):
+            # Not a failure; the message list reports it once the modal is closed
+            self.dismiss(event.result)
+            return
+        if isinstance(event.result, Exception):
+            self.query_one("#status", Label).update("")
+            self.notify(f"Error moving messages: {event.result}", severity="error", timeout=10)
+            return
+        self.dismiss(event.result)
@@ -0,0 +1,101 @@
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from rich.segment import Segment
+from rich.style import Style
+from typing import Optional, Tuple
+
+from amq_manager.body_format import FormattedBody
+
+class BodyView(ScrollView, can_focus=True):
+    """
+    Shows a FormattedBody, rendering only the visible window of lines and columns.
+
+    Lines are pulled from the body as the view scrolls, so a large body costs
+    only what has been looked at. Until the body is complete the view claims
+    one extra screen of height, so there is always room to scroll further.
+    """
+    DEFAULT_CSS = """
+    BodyView {
+        height: 1fr;
+    }
+    """
+    MATCH_STYLE = Style(reverse=True, bold=True)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.body: Optional[FormattedBody] = None
+        self.match: Optional[Tuple[int, int, int]] = None  # line, column, length
+
+    def show(self, body: FormattedBody) -> None:
+        self.body = body
+        self.match = None
+        self.scroll_to(0, 0, animate=False)
+        self.update_size()
+        self.refresh()
+
+    def update_size(self) -> None:
+        """
+        Produce the lines needed for the current window and grow the virtual size to match.
+        """
+        if self.body is None:
+            self.virtual_size = Size(0, 0)
+            return
+        height = self.size.height or 50
+        available = self.body.fetch(int(self.scroll_y) + 2 * height)
+        extra = 0 if self.body.complete else height
+        self.virtual_size = Size(self.body.width, available + extra)
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self.update_size()
+
+    def on_resize(self) -> None:
+        self.update_size()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        index = scroll_y + y
+        if self.body is None or self.body.fetch(index + 1) <= index:
+            return Strip.blank(width, self.rich_style)
+        line = self.body.lines[index]
+        visible = line[scroll_x:scroll_x + width]
+        segments = [Segment(visible, self.rich_style)]
+        if self.match is not None and self.match[0] == index:
+            # Split out the part of the match that is inside the window
+            start = max(self.match[1] - scroll_x, 0)
+            end = min(self.match[1] + self.match[2] - scroll_x, len(visible))
+            if start < end:
+                segments = [
+                    Segment(visible[:start], self.rich_style),
+                    Segment(visible[start:end], self.rich_style + self.MATCH_STYLE),
+                    Segment(visible[end:], self.rich_style),
+                ]
+        return Strip(segments).extend_cell_length(width, self.rich_style).crop(0, width)
+
+    def find(self, query: str, from_current: bool = False) -> bool:
+        """
+        Highlight the next match of `query` and scroll to it. Returns False when there is none.
+        """
+        if self.body is None or not query:
+            return False
+        if self.match is not None:
+            line, column = self.match[0], self.match[1] + (0 if from_current else 1)
+        else:
+            line, column = int(self.scroll_y), 0
+        found = self.body.find(query, line, column)
+        if found is None:
+            self.match = None
+            self.refresh()
+            return False
+        self.match = (found[0], found[1], len(query))
+        self.update_size()
+        height = self.size.height
+        if not self.scroll_y <= found[0] < self.scroll_y + height:
+            self.scroll_to(y=max(found[0] - height // 3, 0), animate=False)
+        width = self.size.width
+        if not self.scroll_x <= found[1] < self.scroll_x + width - len(query):
+            self.scroll_to(x=max(found[1] - width // 3, 0), animate=False)
+        self.refresh()
+        return True
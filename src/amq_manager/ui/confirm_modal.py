@@ -0,0 +1,62 @@
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Label, Button
+from textual.containers import Grid, Vertical
+
+class ConfirmModal(ModalScreen):
+    """
+    Asks before an action that can't be undone. Dismisses with True when confirmed.
+    """
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+    ]
+    CSS = """
+    ConfirmModal {
+        align: center middle;
+    }
+    Vertical {
+        padding: 2;
+        width: 60%;
+        min-width: 80;
+        max-width: 120;
+        height: auto;
+        border: thick $background 80%;
+        background: $surface;
+    }
+    Label {
+        width: 100%;
+        text-align: center;
+        margin-bottom: 1;
+    }
+    Grid {
+        grid-size: 2;
+        grid-gutter: 1 2;
+        grid-rows: auto;
+    }
+    """
+
+    def __init__(self, title: str, detail: str, confirm_label: str = "Confirm"):
+        super().__init__()
+        self.title_text = title
+        self.detail = detail
+        self.confirm_label = confirm_label
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Label(self.title_text),
+            Label(self.detail),
+            Grid(
+                Button("Cancel", variant="primary", id="cancel"),
+                Button(self.confirm_label, variant="error", id="confirm"),
+            ),
+        )
+
+    def on_mount(self) -> None:
+        # Enter on the default focus must not confirm by accident
+        self.query_one("#cancel", Button).focus()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        self.dismiss(event.button.id == "confirm")
+
+    def action_cancel(self) -> None:
+        self.dismiss(False)
@@ -3,6 +3,7 @@ from textual.screen import Screen, ModalScreen
 from textual.widgets import Header, Footer, DataTable, Button, Input, Label, Checkbox
 from textual.containers import Grid, Container, Horizontal
 from textual.binding import Binding
+from dataclasses import replace
 from amq_manager.config import ConfigManager, ConnectionConfig
 
 class ConnectionEditor(ModalScreen):
@@ -99,7 +100,12 @@ class ConnectionEditor(ModalScreen):
         ssl = self.query_one("#ssl", Checkbox).value
         is_default = self.query_one("#default", Checkbox).value
 
-        new_config = ConnectionConfig(name, host, port, user, password, is_default, ssl, path)
+        if self.config:
+            # Keep settings that have no editor field (pool size, retries, ...)
+            new_config = replace(self.config, name=name, host=host, port=port, user=user, password=password,
+                                 is_default=is_default, ssl=ssl, context_path=path)
+        else:
+            new_config = ConnectionConfig(name, host, port, user, password, is_default, ssl, path)
         self.dismiss(new_config)
 
 class ConnectionScreen(Screen):
@@ -1,36 +1,133 @@
 from textual.app import ComposeResult
 from textual.screen import Screen
-from textual.widgets import Header, Footer, RichLog
+from textual.widgets import Header, Footer, RichLog, Input
 from textual.binding import Binding
+from rich.text import Text
+from typing import Iterable
 import os
 
+from amq_manager.log_tail import LEVELS, LogBuffer, LogLine, LogTail, matches
+
+LOG_FILE = "amq_manager.log"
+LEVEL_STYLES = {"WARNING": "yellow", "ERROR": "red", "CRITICAL": "bold red", "DEBUG": "dim"}
+
 class LogScreen(Screen):
+    CSS = """
+    #filter {
+        display: none;
+        dock: bottom;
+        height: 3;
+    }
+    """
     BINDINGS = [
         Binding("escape", "app.pop_screen", "Back"),
         Binding("r", "refresh_log", "Refresh"),
+        Binding("f", "toggle_follow", "Follow"),
+        Binding("v", "cycle_level", "Level"),
+        Binding("/", "toggle_filter", "Filter"),
     ]
+    # Lines kept for display and filtering
+    MAX_LINES = 2000
+    # Seconds between checks for new lines in follow mode
+    FOLLOW_INTERVAL = 0.5
+    # Seconds to wait after the last keystroke before filtering
+    FILTER_DEBOUNCE = 0.1
+
+    def __init__(self):
+        super().__init__()
+        self.tail = LogTail(LOG_FILE)
+        self.buffer = LogBuffer(self.MAX_LINES)
+        self.follow = True
+        self.min_level = "DEBUG"
+        self.filter_text = ""
+        self.filter_timer = None
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield RichLog(highlight=True, markup=True, id="log_view")
+        yield RichLog(highlight=True, max_lines=self.MAX_LINES, id="log_view")
+        yield Input(placeholder="Filter log lines...", id="filter")
         yield Footer()
 
     def on_mount(self) -> None:
         self.action_refresh_log()
+        self.set_interval(self.FOLLOW_INTERVAL, self.poll_log)
 
     def action_refresh_log(self) -> None:
+        """
+        Reload the last lines from the end of the file.
+        """
+        self.buffer.clear()
+        if os.path.exists(LOG_FILE):
+            try:
+                self.buffer.add(self.tail.tail(self.MAX_LINES))
+            except OSError as e:
+                self.query_one(RichLog).clear()
+                self.query_one(RichLog).write(Text(f"Error reading log file: {e}", style="red"))
+                return
+        self.show_lines()
+
+    def poll_log(self) -> None:
+        if not self.follow:
+            return
+        try:
+            added = self.buffer.add(self.tail.read_new())
+        except OSError:
+            return
+        self.write_lines(added)
+
+    def show_lines(self) -> None:
+        """
+        Redraw the view from the buffer with the current filters.
+        """
         log_view = self.query_one(RichLog)
         log_view.clear()
-        
-        log_file = "amq_manager.log"
-        if os.path.exists(log_file):
-            try:
-                with open(log_file, "r") as f:
-                    # Read last 1000 lines to avoid memory issues
-                    lines = f.readlines()[-1000:]
-                    for line in lines:
-                        log_view.write(line.strip())
-            except Exception as e:
-                log_view.write(f"[red]Error reading log file: {e}[/red]")
+        if not self.buffer.lines and self.tail.inode is None:
+            log_view.write(Text("No log file found.", style="yellow"))
+        self.write_lines(self.buffer.lines)
+        self.update_subtitle()
+
+    def write_lines(self, lines: Iterable[LogLine]) -> None:
+        log_view = self.query_one(RichLog)
+        text = self.filter_text.lower()
+        for line in lines:
+            if matches(line, self.min_level, text):
+                # Text, not markup: log messages may contain square brackets
+                log_view.write(Text(line.text, style=LEVEL_STYLES.get(line.level, "")))
+
+    def update_subtitle(self) -> None:
+        parts = ["following" if self.follow else "paused", f"level >= {self.min_level}"]
+        if self.filter_text:
+            parts.append(f"filter: {self.filter_text}")
+        self.sub_title = " | ".join(parts)
+
+    def action_toggle_follow(self) -> None:
+        self.follow = not self.follow
+        self.update_subtitle()
+
+    def action_cycle_level(self) -> None:
+        self.min_level = LEVELS[(LEVELS.index(self.min_level) + 1) % (len(LEVELS) - 1)]
+        self.show_lines()
+
+    def action_toggle_filter(self) -> None:
+        inp = self.query_one("#filter", Input)
+        inp.display = not inp.display
+        if inp.display:
+            inp.focus()
         else:
-            log_view.write("[yellow]No log file found.[/yellow]")
+            inp.value = ""
+            self.query_one(RichLog).focus()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        # Debounce: only filter once typing pauses
+        if self.filter_timer is not None:
+            self.filter_timer.stop()
+        value = event.value
+        self.filter_timer = self.set_timer(self.FILTER_DEBOUNCE, lambda: self.apply_filter(value))
+
+    def apply_filter(self, filter_text: str) -> None:
+        self.filter_text = filter_text
+        self.show_lines()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.input.display = False
+        self.query_one(RichLog).focus()
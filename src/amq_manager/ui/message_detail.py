@@ -1,72 +1,190 @@
+from textual import work
 from textual.app import ComposeResult
+from textual.message import Message
 from textual.screen import Screen
-from textual.widgets import Header, Footer, Static, Label, DataTable
+from textual.widgets import Header, Footer, Label, DataTable, Input
 from textual.binding import Binding
-from textual.containers import Container, VerticalScroll
-from typing import Dict, Any
-from amq_manager.client import ActiveMQClient
-from amq_manager.ui.move_modal import MoveMessageModal
+from textual.worker import get_current_worker
+from typing import Dict, Any, Optional
+from amq_manager.body_format import FormattedBody, message_body
+from amq_manager.client import ActiveMQClient, LISTING_FIELDS
+from amq_manager.paging import fetch_message
+from amq_manager.ui.body_view import BodyView
+
+# Fields holding the body, shown in the body view instead of the properties table
+BODY_FIELDS = {"Text", "Body", "BodyBase64", "BodyPreview"}
 
 class MessageDetailScreen(Screen):
     BINDINGS = [
         ("escape", "app.pop_screen", "Back"),
         ("d", "delete_message", "Delete Message"),
         ("m", "move_message", "Move Message"),
-        Binding("/", "noop", "", show=False),
+        Binding("/", "search", "Search"),
+        Binding("n", "next_match", "Next Match"),
+        Binding("p", "toggle_pretty", "Pretty/Raw"),
+        Binding("h", "toggle_hex", "Hex"),
     ]
     CSS = """
     .header {
         text-style: bold;
         margin-top: 1;
     }
-    .content {
-        margin-bottom: 1;
+    #properties {
+        height: auto;
+        max-height: 40%;
+    }
+    #search {
+        display: none;
+        dock: bottom;
+        height: 3;
     }
     """
+    # Longer property values are cut in the table; the body view has no such limit
+    MAX_VALUE_LENGTH = 200
+
+    class DeleteFinished(Message):
+        """Posted by the delete worker with the broker's answer."""
+        def __init__(self, deleted: bool) -> None:
+            super().__init__()
+            self.deleted = deleted
+
+    class BodyLoaded(Message):
+        """Posted by the body worker with the full message, or None if it is gone."""
+        def __init__(self, message: Optional[Dict[str, Any]], error: Optional[str] = None) -> None:
+            super().__init__()
+            self.message = message
+            self.error = error
 
     def __init__(self, message: Dict[str, Any], queue_name: str):
         super().__init__()
         self.message = message
         self.queue_name = queue_name
+        # Messages from the header-only listing carry no body and only a few headers
+        self.header_only = set(message) <= set(LISTING_FIELDS)
+        self.mode = "pretty"  # "pretty", "raw" or "hex"
+        self.search_text = ""
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield VerticalScroll(
-            Label("Message Details", classes="header"),
-            self.create_properties_table(),
-            
-            Label("Body", classes="header"),
-            Static(str(self.message.get("Text", self.message.get("Body", "No Text Content"))), classes="content"),
-        )
+        yield Label("Message Details", classes="header")
+        yield self.create_properties_table()
+        yield Label("Body", classes="header", id="body_label")
+        yield BodyView(id="body")
+        yield Input(placeholder="Search body...", id="search")
         yield Footer()
 
+    def on_mount(self) -> None:
+        if not self.header_only:
+            self.show_body()
+            return
+        self.query_one("#body_label", Label).update("Body: Loading...")
+        client = getattr(self.app, "client", None)
+        if client is None:
+            return
+
+        self.fetch_body(client, self.message.get("JMSMessageID"))
+
+    def show_body(self) -> None:
+        """
+        Show the body in the current mode, reusing the formatted lines of an earlier visit.
+        """
+        label = self.query_one("#body_label", Label)
+        payload = message_body(self.message)
+        if payload is None:
+            label.update("Body: No Text Content")
+            return
+        cache = getattr(self.app, "body_cache", None)
+        msg_id = self.message.get("JMSMessageID")
+        if cache is not None and msg_id:
+            body = cache.get(msg_id, self.mode, payload)
+        else:
+            body = FormattedBody.from_payload(payload, self.mode)
+        label.update(f"Body: {body.description} ({self.mode})")
+        self.query_one(BodyView).show(body)
+
     def create_properties_table(self) -> DataTable:
-        table = DataTable()
+        table = DataTable(id="properties")
         table.add_columns("Property", "Value")
-        
-        # Exclude body fields from properties list
-        exclude = {"Text", "Body"}
-        
-        for key, value in self.message.items():
-            if key not in exclude:
-                table.add_row(str(key), str(value))
+        self.fill_properties(table)
         return table
 
+    def fill_properties(self, table: DataTable) -> None:
+        for key, value in self.message.items():
+            if key not in BODY_FIELDS:
+                text = str(value)
+                if len(text) > self.MAX_VALUE_LENGTH:
+                    text = text[:self.MAX_VALUE_LENGTH] + f"... ({len(text)} chars)"
+                table.add_row(str(key), text)
+
+    @work(thread=True, exclusive=True, group="fetch_body")
+    def fetch_body(self, client: ActiveMQClient, msg_id: str) -> None:
+        try:
+            message = fetch_message(client, self.queue_name, msg_id)
+        except Exception as e:
+            if not get_current_worker().is_cancelled:
+                self.post_message(self.BodyLoaded(None, str(e)))
+            return
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.BodyLoaded(message))
+
+    def on_message_detail_screen_body_loaded(self, event: BodyLoaded) -> None:
+        if event.message is None:
+            label = self.query_one("#body_label", Label)
+            label.update(f"Body: Could not load the message: {event.error}" if event.error else "Body: Message is no longer in the queue")
+            return
+        self.message = event.message
+        self.header_only = False
+        table = self.query_one("#properties", DataTable)
+        table.clear()
+        self.fill_properties(table)
+        self.show_body()
+
+    def action_toggle_pretty(self) -> None:
+        self.mode = "raw" if self.mode == "pretty" else "pretty"
+        if not self.header_only:
+            self.show_body()
+
+    def action_toggle_hex(self) -> None:
+        self.mode = "pretty" if self.mode == "hex" else "hex"
+        if not self.header_only:
+            self.show_body()
+
+    def action_search(self) -> None:
+        search = self.query_one("#search", Input)
+        search.display = True
+        search.value = self.search_text
+        search.focus()
+
+    def action_next_match(self) -> None:
+        if self.search_text and not self.query_one(BodyView).find(self.search_text):
+            self.notify(f"Not found: {self.search_text}", severity="warning")
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.input.display = False
+        view = self.query_one(BodyView)
+        view.focus()
+        self.search_text = event.value
+        if self.search_text and not view.find(self.search_text, from_current=True):
+            self.notify(f"Not found: {self.search_text}", severity="warning")
+
     def action_delete_message(self) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+        client = getattr(self.app, "client", None)
+        if client is None:
             return
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
-        )
-        msg_id = self.message.get("JMSMessageID")
-        if client.delete_message(msg_id, self.queue_name):
+        self.run_delete(client, self.message.get("JMSMessageID"))
+
+    @work(thread=True, exclusive=True, group="delete")
+    def run_delete(self, client: ActiveMQClient, msg_id: str) -> None:
+        deleted = client.delete_message(msg_id, self.queue_name)
+        cache = getattr(self.app, "browse_cache", None)
+        if deleted and cache is not None:
+            cache.remove_messages(self.queue_name, [msg_id])
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.DeleteFinished(deleted))
+
+    def on_message_detail_screen_delete_finished(self, event: DeleteFinished) -> None:
+        if event.deleted:
             self.app.pop_screen()
             # Refresh the message list
             try:
@@ -80,6 +198,7 @@ class MessageDetailScreen(Screen):
             self.notify("Failed to delete message", severity="error")
 
     def action_move_message(self) -> None:
+        from amq_manager.ui.move_modal import MoveMessageModal
         msg_id = self.message.get("JMSMessageID")
         
         def check_move(moved: bool) -> None:
@@ -95,6 +214,3 @@ class MessageDetailScreen(Screen):
                 self.notify("Message moved")
 
         self.app.push_screen(MoveMessageModal(msg_id, self.queue_name), check_move)
-
-    def action_noop(self) -> None:
-        pass
@@ -1,12 +1,26 @@
+from textual import work
 from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.coordinate import Coordinate
+from textual.message import Message
 from textual.screen import Screen
 from textual.widgets import Header, Footer, DataTable, Static, Input
-from amq_manager.client import ActiveMQClient
-from amq_manager.ui.message_detail import MessageDetailScreen
+from textual.worker import get_current_worker
+from typing import List, Dict, Optional
+import logging
+import time
+from amq_manager.batch import BatchExecutor, BatchProgress, format_progress
+from amq_manager.browse_cache import BrowseCache, VERSION_ATTRIBUTES, queue_version
+from amq_manager.client import ActiveMQClient, OperationPending
+from amq_manager.paging import MessagePager
+from amq_manager.search import SearchIndex, search_key
+from amq_manager.summary import MessageSummary
+
+logger = logging.getLogger(__name__)
 
 class MessageListScreen(Screen):
     CSS = """
-    #filter {
+    #filter, #selector {
         display: none;
         dock: bottom;
         height: 3;
@@ -15,21 +29,74 @@ class MessageListScreen(Screen):
     BINDINGS = [
         ("escape", "app.pop_screen", "Back"),
         ("/", "toggle_filter", "Filter"),
+        ("s", "toggle_selector", "Selector"),
         ("r", "refresh", "Refresh"),
         ("space", "toggle_selection", "Select"),
         ("a", "select_all", "Select All"),
         ("n", "clear_selection", "Clear"),
         ("D", "batch_delete", "Delete Selected"),
         ("M", "batch_move", "Move Selected"),
+        ("x", "cancel_batch", "Cancel Batch"),
+        ("i", "queue_info", "Queue Info"),
+        Binding("shift+down", "extend_selection(1)", "Select Down", show=False),
+        Binding("shift+up", "extend_selection(-1)", "Select Up", show=False),
     ]
+    # Fetch the next page when the cursor gets this close to the last loaded row
+    PREFETCH_ROWS = 20
+    # Removing a DataTable row costs about one dict pass over all rows, adding one
+    # costs roughly this many; filtering rebuilds the rows when that is cheaper
+    ROW_ADD_COST = 20
+    # Seconds to wait after the last keystroke before filtering
+    FILTER_DEBOUNCE = 0.1
+
+    class MessagesLoaded(Message):
+        """Posted by the browse worker when a page of messages arrives."""
+        def __init__(self, messages: List[MessageSummary], pager: MessagePager, first_page: bool,
+                     cached_pager: Optional[MessagePager] = None, error: Optional[str] = None) -> None:
+            super().__init__()
+            self.messages = messages
+            self.pager = pager
+            self.first_page = first_page
+            # Set when the first page came from the browse cache; paging continues with it
+            self.cached_pager = cached_pager
+            self.error = error
+
+    class BatchProgressed(Message):
+        """Posted by the batch executor after every chunk."""
+        def __init__(self, progress: BatchProgress) -> None:
+            super().__init__()
+            self.progress = progress
+
+    class DeleteAllSized(Message):
+        """Posted with the queue's current size before deleting everything matching the selector."""
+        def __init__(self, selector: str, queue_size: Optional[int]) -> None:
+            super().__init__()
+            self.selector = selector
+            self.queue_size = queue_size
+
+    class BatchFinished(Message):
+        """Posted by the batch delete worker when it completes."""
+        def __init__(self, summary: str, severity: str = "information") -> None:
+            super().__init__()
+            self.summary = summary
+            self.severity = severity
 
     def __init__(self, queue_name: str):
         super().__init__()
         self.queue_name = queue_name
-        self.messages_map = {}
-        self.messages_data = []
+        # Compact summaries of the listed headers; the full message is fetched when opened
+        self.messages_map: Dict[str, MessageSummary] = {}  # Message ID -> summary, for visible rows
+        self.messages_data: List[MessageSummary] = []
+        self.row_order: Dict[str, int] = {}  # Message ID -> position in messages_data
+        self.search_index = SearchIndex()
+        self.filter_timer = None
+        self.pager: Optional[MessagePager] = None
         self.selected_messages = set()  # Track selected message IDs
         self.current_filter = ""  # Track active filter
+        self.current_selector = ""  # JMS selector applied by the broker when browsing
+        # True when the selection means "everything matching the current selector",
+        # so batch actions can run as a single broker-side operation
+        self.all_matching_selected = False
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -37,68 +104,195 @@ class MessageListScreen(Screen):
         yield Static("", id="selection_status")
         yield DataTable(cursor_type="row")
         yield Input(placeholder="Filter by ID, Date, or Type...", id="filter")
+        yield Input(placeholder="JMS selector, e.g. JMSType = 'order' (empty for all)", id="selector")
         yield Footer()
 
     def on_mount(self) -> None:
         table = self.query_one(DataTable)
-        table.add_columns("ID", "Timestamp", "Priority", "Redelivered", "Type")
+        self.id_column = table.add_columns("ID", "Timestamp", "Priority", "Redelivered", "Type")[0]
         self.load_messages()
 
-    def load_messages(self) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+    def load_messages(self, use_cache: bool = True) -> None:
+        """
+        Load the first page, from the browse cache if the queue is unchanged since it was cached.
+        """
+        client = getattr(self.app, "client", None)
+        if client is None:
+            return
+
+        page_size = self.app.active_config.browse_page_size if self.app.active_config else 200
+        # The list only shows headers; the detail screen fetches the body of the message it opens
+        self.pager = MessagePager(client, self.queue_name, self.current_selector, page_size, headers_only=True)
+        self.query_one("#title", Static).update(f"Messages in Queue: {self.queue_name} - loading...")
+        self.fetch_messages(self.pager, True, getattr(self.app, "browse_cache", None), use_cache)
+
+    def load_next_page(self) -> None:
+        if self.pager is None or not self.pager.has_more:
+            return
+        if any(w.group == "load_messages" and w.is_running for w in self.workers):
+            return
+        self.fetch_messages(self.pager, False, getattr(self.app, "browse_cache", None))
+
+    @work(thread=True, exclusive=True, group="load_messages")
+    def fetch_messages(self, pager: MessagePager, first_page: bool, cache: Optional[BrowseCache] = None,
+                       use_cache: bool = True) -> None:
+        version = None
+        if first_page:
+            # One attribute read gives the queue depth and validates the cache
+            try:
+                version = queue_version(pager.client.get_queue_attributes(pager.queue_name, VERSION_ATTRIBUTES))
+                pager.total = version[2]
+            except Exception:
+                pager.fetch_total()
+            cached = cache.get(pager.queue_name, pager.selector, version) if cache and use_cache and version else None
+            if cached is not None:
+                if not get_current_worker().is_cancelled:
+                    self.post_message(self.MessagesLoaded(list(cached.messages), pager, True, cached.pager))
+                return
+        try:
+            messages = [MessageSummary.from_message(m) for m in pager.next_page()]
+        except Exception as e:
+            # The pager is left as it was, so scrolling to the end tries the page again
+            if not get_current_worker().is_cancelled:
+                self.post_message(self.MessagesLoaded([], pager, first_page, error=f"Error browsing messages: {e}"))
+            return
+        if cache is not None:
+            if first_page and version is not None:
+                cache.put(pager.queue_name, pager.selector, version, messages, pager)
+            elif not first_page:
+                cache.extend(pager.queue_name, pager.selector, pager, messages)
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.MessagesLoaded(messages, pager, first_page))
+
+    def on_message_list_screen_messages_loaded(self, event: MessagesLoaded) -> None:
+        if event.pager is not self.pager:
+            # A newer load replaced this pager
             return
+        if event.error:
+            self.notify(event.error, severity="error", timeout=10)
+            if event.first_page:
+                self.query_one("#title", Static).update(f"Messages in Queue: {self.queue_name} - browse failed")
+            return
+        if event.cached_pager is not None:
+            self.pager = event.cached_pager
+        if event.first_page:
+            self.messages_data = event.messages
+            self.row_order = {}
+            self.search_index = SearchIndex()
+            self.index_rows(event.messages)
+            self.update_table(self.current_filter)
+        else:
+            started = time.perf_counter()
+            start = len(self.messages_data)
+            self.messages_data.extend(event.messages)
+            self.index_rows(event.messages)
+            filter_text = self.current_filter.lower()
+            keys = self.search_index.keys
+            self.add_rows([self.messages_data[i] for i in range(start, len(self.messages_data)) if filter_text in keys[i]])
+            self.update_title(self.current_filter)
+            self.app.metrics.observe("message_list.append_page", time.perf_counter() - started)
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        if event.cursor_row >= event.data_table.row_count - self.PREFETCH_ROWS:
+            self.load_next_page()
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
+    def index_rows(self, messages: List[MessageSummary]) -> None:
+        start = len(self.row_order)
+        for offset, msg in enumerate(messages):
+            self.row_order[msg.message_id] = start + offset
+        # Filter across multiple fields: ID, Timestamp, Type
+        self.search_index.add(
+            search_key((msg.message_id, "" if msg.timestamp is None else msg.timestamp, "" if msg.jms_type is None else msg.jms_type))
+            for msg in messages
         )
-        self.messages_data = client.browse_messages(self.queue_name)
-        self.update_table()
+
+    def filtered_messages(self, filter_text: str) -> List[MessageSummary]:
+        return [self.messages_data[i] for i in self.search_index.search(filter_text)]
 
     def update_table(self, filter_text: str = "") -> None:
+        start = time.perf_counter()
         table = self.query_one(DataTable)
         table.clear()
         self.messages_map = {}
         
-        filter_text = filter_text.lower()
+        self.add_rows(self.filtered_messages(filter_text))
         
-        for msg in self.messages_data:
-            # Jolokia returns message details
-            msg_id = msg.get("JMSMessageID", "Unknown")
-            timestamp = msg.get("JMSTimestamp", "")
-            priority = str(msg.get("JMSPriority", ""))
-            redelivered = str(msg.get("JMSRedelivered", ""))
-            jms_type = str(msg.get("JMSType", ""))
-            
-            # Filter across multiple fields: ID, Timestamp, Type
-            if filter_text:
-                id_match = filter_text in msg_id.lower()
-                timestamp_match = filter_text in str(timestamp).lower()
-                type_match = filter_text in jms_type.lower()
-                
-                if not (id_match or timestamp_match or type_match):
-                    continue
-            
-            # Add selection marker
-            checkbox = "[✓] " if msg_id in self.selected_messages else "[ ] "
-            display_id = checkbox + msg_id
-            
-            table.add_row(display_id, str(timestamp), priority, redelivered, jms_type, key=msg_id)
-            self.messages_map[msg_id] = msg
+        self.update_selection_status()
+        self.update_title(filter_text)
+        self.app.metrics.observe("message_list.update_table", time.perf_counter() - start)
+
+    def apply_filter(self, filter_text: str) -> None:
+        """
+        Show or hide rows for a new filter, leaving rows that stay visible untouched.
+        """
+        table = self.query_one(DataTable)
+        self.current_filter = filter_text
+        visible = self.filtered_messages(filter_text)
+        visible_ids = {msg.message_id for msg in visible}
+        hidden_ids = [msg_id for msg_id in self.messages_map if msg_id not in visible_ids]
+        
+        if len(hidden_ids) * table.row_count > len(visible) * self.ROW_ADD_COST:
+            self.update_table(filter_text)
+            return
+        start = time.perf_counter()
+        
+        for msg_id in hidden_ids:
+            table.remove_row(msg_id)
+            del self.messages_map[msg_id]
+        shown = [msg for msg in visible if msg.message_id not in self.messages_map]
+        if shown:
+            self.add_rows(shown)
+            # New rows are appended, so put them back into browse order
+            table.sort(self.id_column, key=lambda label: self.row_order.get(label[4:], 0))
         
         self.update_selection_status()
         self.update_title(filter_text)
+        self.app.metrics.observe("message_list.apply_filter", time.perf_counter() - start)
+
+    def add_rows(self, messages: List[MessageSummary]) -> None:
+        table = self.query_one(DataTable)
+        for msg in messages:
+            msg_id = msg.message_id
+            # Headers missing from the listing show as empty cells
+            timestamp = "" if msg.timestamp is None else str(msg.timestamp)
+            priority = "" if msg.priority is None else str(msg.priority)
+            redelivered = "" if msg.redelivered is None else str(msg.redelivered)
+            jms_type = "" if msg.jms_type is None else str(msg.jms_type)
+            
+            table.add_row(self.id_label(msg_id), timestamp, priority, redelivered, jms_type, key=msg_id)
+            self.messages_map[msg_id] = msg
+
+    def id_label(self, msg_id: str) -> str:
+        # Add selection marker
+        checkbox = "[✓] " if msg_id in self.selected_messages else "[ ] "
+        return checkbox + msg_id
+
+    def refresh_selection_marks(self, msg_ids) -> None:
+        """
+        Redraw the selection marker of the given rows only.
+        """
+        table = self.query_one(DataTable)
+        for msg_id in msg_ids:
+            if msg_id in self.messages_map:
+                table.update_cell(msg_id, self.id_column, self.id_label(msg_id))
+        self.update_selection_status()
 
     def on_input_changed(self, event: Input.Changed) -> None:
-        self.update_table(event.value)
+        if event.input.id == "filter":
+            self.all_matching_selected = False
+            # Debounce: only filter once typing pauses
+            if self.filter_timer is not None:
+                self.filter_timer.stop()
+            value = event.value
+            self.filter_timer = self.set_timer(self.FILTER_DEBOUNCE, lambda: self.apply_filter(value))
     
     def on_input_submitted(self, event: Input.Submitted) -> None:
-        self.query_one("#filter").display = False
+        if event.input.id == "selector":
+            self.current_selector = event.value.strip()
+            self.selected_messages.clear()
+            self.all_matching_selected = False
+            self.load_messages()
+        event.input.display = False
         self.query_one(DataTable).focus()
 
     def action_toggle_filter(self) -> None:
@@ -110,88 +304,213 @@ class MessageListScreen(Screen):
             inp.value = ""
             self.query_one(DataTable).focus()
 
+    def action_toggle_selector(self) -> None:
+        inp = self.query_one("#selector")
+        inp.display = not inp.display
+        if inp.display:
+            inp.value = self.current_selector
+            inp.focus()
+        else:
+            self.query_one(DataTable).focus()
+
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        from amq_manager.ui.message_detail import MessageDetailScreen
         msg_id = event.row_key.value
         if msg_id in self.messages_map:
-            self.app.push_screen(MessageDetailScreen(self.messages_map[msg_id], self.queue_name))
+            # The detail screen fetches the rest of the message by ID
+            self.app.push_screen(MessageDetailScreen(self.messages_map[msg_id].as_message(), self.queue_name))
 
     def update_selection_status(self) -> None:
         status = self.query_one("#selection_status", Static)
         count = len(self.selected_messages)
-        if count > 0:
+        if self.all_matching_selected:
+            scope = f"matching {self.current_selector}" if self.current_selector else "in queue"
+            status.update(f"✓ All messages {scope} selected ({count} loaded)")
+        elif count > 0:
             status.update(f"✓ {count} message{'s' if count != 1 else ''} selected")
         else:
             status.update("")
 
     def update_title(self, filter_text: str = "") -> None:
         title = self.query_one("#title", Static)
-        total = len(self.messages_data)
+        loaded = len(self.messages_data)
         visible = len(self.messages_map)
+        selector = f" [{self.current_selector}]" if self.current_selector else ""
+        total = self.pager.total if self.pager else None
+        # QueueSize counts the whole queue, so only compare against it without a selector
+        if self.pager is not None and self.pager.capped:
+            # The broker stopped browsing at its maxBrowsePageSize; say so rather than imply more will load
+            count = f"first {loaded} of {total}"
+        elif total is not None and not self.current_selector and loaded < total:
+            count = f"{loaded} of {total}"
+        else:
+            count = str(loaded)
+            total = loaded
         
         if filter_text:
-            title.update(f"Messages in Queue: {self.queue_name} - {visible}/{total} (filtering)")
+            title.update(f"Messages in Queue: {self.queue_name}{selector} - {visible}/{count} (filtering)")
         else:
             msg_word = "message" if total == 1 else "messages"
-            title.update(f"Messages in Queue: {self.queue_name} - {total} {msg_word}")
+            capped = ", broker browse cap" if self.pager is not None and self.pager.capped else ""
+            title.update(f"Messages in Queue: {self.queue_name}{selector} - {count} {msg_word}{capped}")
+
+    def message_id_at(self, row: int) -> str:
+        table = self.query_one(DataTable)
+        return table.coordinate_to_cell_key(Coordinate(row, 0)).row_key.value
 
     def action_toggle_selection(self) -> None:
         table = self.query_one(DataTable)
-        cursor_coord = table.cursor_coordinate
-        if cursor_coord.row is None:
+        if table.row_count == 0:
             return
         
-        # Get the row key from the cursor coordinate
-        cell_key = table.coordinate_to_cell_key(cursor_coord)
-        msg_id = cell_key.row_key.value
+        msg_id = self.message_id_at(table.cursor_row)
         
+        self.all_matching_selected = False
         if msg_id in self.selected_messages:
             self.selected_messages.remove(msg_id)
         else:
             self.selected_messages.add(msg_id)
+        self.refresh_selection_marks([msg_id])
+
+    def action_extend_selection(self, step: int) -> None:
+        """
+        Select the current row and the row the cursor moves to (shift+arrows).
+        """
+        table = self.query_one(DataTable)
+        if table.row_count == 0:
+            return
         
-        # Save cursor position
-        current_row = cursor_coord.row
-        
-        self.update_table()
+        changed = [self.message_id_at(table.cursor_row)]
+        table.move_cursor(row=table.cursor_row + step)
+        changed.append(self.message_id_at(table.cursor_row))
         
-        # Restore cursor position
-        table.move_cursor(row=current_row, column=0)
+        self.all_matching_selected = False
+        self.selected_messages.update(changed)
+        self.refresh_selection_marks(changed)
 
     def action_select_all(self) -> None:
-        self.selected_messages = set(self.messages_map.keys())
-        self.update_table()
+        newly_selected = [msg_id for msg_id in self.messages_map if msg_id not in self.selected_messages]
+        # Rows hidden by the filter are dropped from the selection; they have no cells to redraw
+        self.selected_messages.intersection_update(self.messages_map)
+        self.selected_messages.update(newly_selected)
+        # Without a text filter, "all" is exactly what the selector matches on the broker
+        self.all_matching_selected = not self.current_filter
+        self.refresh_selection_marks(newly_selected)
 
     def action_clear_selection(self) -> None:
+        previously_selected = list(self.selected_messages)
         self.selected_messages.clear()
-        self.update_table()
+        self.all_matching_selected = False
+        self.refresh_selection_marks(previously_selected)
 
     def action_batch_delete(self) -> None:
         if not self.selected_messages:
             self.notify("No messages selected", severity="warning")
             return
         
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+        client = getattr(self.app, "client", None)
+        if client is None:
+            return
+
+        if any(w.group == "batch" and w.is_running for w in self.workers):
+            self.notify("A batch operation is already running", severity="warning")
+            return
+
+        if self.all_matching_selected:
+            # This reaches messages past the loaded rows, so the user confirms it against the queue's size first
+            self.read_size_for_delete_all(client, self.current_selector)
             return
+        self.delete_selected(client, list(self.selected_messages))
+        self.action_clear_selection()
+
+    @work(thread=True, exclusive=True, group="confirm")
+    def read_size_for_delete_all(self, client: ActiveMQClient, selector: str) -> None:
+        try:
+            queue_size = int(client.get_queue_attributes(self.queue_name, ["QueueSize"]).get("QueueSize", 0))
+        except Exception as e:
+            logger.error(f"Failed to read size of queue {self.queue_name}: {e}")
+            queue_size = None
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.DeleteAllSized(selector, queue_size))
+
+    def on_message_list_screen_delete_all_sized(self, event: DeleteAllSized) -> None:
+        from amq_manager.ui.confirm_modal import ConfirmModal
+
+        size = f"{event.queue_size} messages" if event.queue_size is not None else "an unknown number of messages"
+        if event.selector:
+            title = f"Delete every message matching {event.selector} in {self.queue_name}?"
+            detail = f"The broker checks all {size} in the queue, including those not loaded in this list."
+        else:
+            title = f"Purge {self.queue_name}?"
+            detail = f"This deletes all {size} in the queue on the broker, including those not loaded in this list."
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
+        def handle_confirm(confirmed: bool) -> None:
+            client = getattr(self.app, "client", None)
+            if not confirmed or client is None:
+                return
+            if any(w.group == "batch" and w.is_running for w in self.workers):
+                self.notify("A batch operation is already running", severity="warning")
+                return
+            self.delete_all_matching(client, event.selector)
+            self.action_clear_selection()
+
+        self.app.push_screen(ConfirmModal(title, detail, "Delete"), handle_confirm)
+
+    @work(thread=True, group="batch")
+    def delete_selected(self, client: ActiveMQClient, message_ids: List[str]) -> None:
+        worker = get_current_worker()
+        cache = getattr(self.app, "browse_cache", None)
+
+        def remove_deleted(results: Dict[str, bool]) -> None:
+            if cache is not None:
+                cache.remove_messages(self.queue_name, [msg_id for msg_id, ok in results.items() if ok])
+
+        executor = BatchExecutor.from_config(
+            self.app.active_config, lambda ids: client.delete_chunk(ids, self.queue_name),
+            on_progress=lambda progress: self.post_message(self.BatchProgressed(progress)), on_chunk=remove_deleted,
         )
-        
-        success_count = 0
-        total = len(self.selected_messages)
-        for msg_id in list(self.selected_messages):
-            if client.delete_message(msg_id, self.queue_name):
-                success_count += 1
-        
-        self.selected_messages.clear()
+        # Stops starting chunks once cancelled with x or by closing the screen
+        results = executor.run(message_ids, lambda: worker.is_cancelled)
+        summary = f"Deleted {sum(results.values())}/{len(message_ids)} messages"
+        if executor.progress.cancelled:
+            summary += " (cancelled)"
+        self.post_message(self.BatchFinished(summary))
+
+    def on_message_list_screen_batch_progressed(self, event: BatchProgressed) -> None:
+        self.query_one("#selection_status", Static).update(f"Deleting: {format_progress(event.progress)}")
+
+    def action_cancel_batch(self) -> None:
+        running = [w for w in self.workers if w.group == "batch" and w.is_running]
+        for worker in running:
+            worker.cancel()
+        if running:
+            self.query_one("#selection_status", Static).update("Cancelling...")
+
+    @work(thread=True, group="batch")
+    def delete_all_matching(self, client: ActiveMQClient, selector: str) -> None:
+        cache = getattr(self.app, "browse_cache", None)
+        if cache is not None:
+            cache.invalidate(self.queue_name)
+        try:
+            if selector:
+                removed = client.remove_matching_messages(self.queue_name, selector)
+                summary = f"Deleted {removed} messages matching selector"
+            else:
+                client.purge(self.queue_name)
+                summary = f"Purged {self.queue_name}"
+        except OperationPending as e:
+            # Not a failure: the broker is still deleting, and the reload shows how far it got
+            self.post_message(self.BatchFinished(str(e), "warning"))
+            return
+        except Exception as e:
+            self.post_message(self.BatchFinished(f"Error deleting messages: {e}", "error"))
+            return
+        self.post_message(self.BatchFinished(summary))
+
+    def on_message_list_screen_batch_finished(self, event: BatchFinished) -> None:
+        self.update_selection_status()
         self.load_messages()
-        self.notify(f"Deleted {success_count}/{total} messages")
+        self.notify(event.summary, severity=event.severity)
 
     def action_batch_move(self) -> None:
         if not self.selected_messages:
@@ -201,16 +520,32 @@ class MessageListScreen(Screen):
         from amq_manager.ui.batch_move_modal import BatchMoveModal
         
         def handle_move(success_count):
-            if success_count:
+            if isinstance(success_count, OperationPending):
+                # The broker is still moving; show what has left the queue so far
+                self.selected_messages.clear()
+                self.all_matching_selected = False
+                self.load_messages()
+                self.notify(str(success_count), severity="warning", timeout=10)
+            elif success_count:
                 total = len(self.selected_messages)
+                all_matching = self.all_matching_selected
                 self.selected_messages.clear()
+                self.all_matching_selected = False
                 self.load_messages()
-                self.notify(f"Moved {success_count}/{total} messages")
+                if all_matching:
+                    self.notify(f"Moved {success_count} messages")
+                else:
+                    self.notify(f"Moved {success_count}/{total} messages")
         
-        self.app.push_screen(BatchMoveModal(list(self.selected_messages), self.queue_name), handle_move)
+        selector = self.current_selector if self.all_matching_selected else None
+        self.app.push_screen(BatchMoveModal(list(self.selected_messages), self.queue_name, selector), handle_move)
+
+    def action_queue_info(self) -> None:
+        from amq_manager.ui.queue_info import QueueInfoScreen
+        self.app.push_screen(QueueInfoScreen(self.queue_name))
 
     def action_refresh(self) -> None:
-        self.load_messages()
+        self.load_messages(use_cache=False)
         self.notify("Messages refreshed")
 
     def on_screen_resume(self) -> None:
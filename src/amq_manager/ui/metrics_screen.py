@@ -0,0 +1,120 @@
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import Screen
+from textual.widgets import Header, Footer, DataTable, Static
+from typing import Optional
+import logging
+import time
+
+from amq_manager.metrics import Histogram, Metrics
+
+logger = logging.getLogger(__name__)
+
+# Written by `e` when the connection has no metrics_textfile
+DEFAULT_TEXTFILE = "amq_manager.prom"
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.1f}ms"
+    return f"{seconds:.2f}s"
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+class MetricsScreen(Screen):
+    """
+    Live request latency, response size, decode time and error counts per Jolokia
+    operation, and client-side render times, updated every second.
+    """
+    CSS = """
+    #summary {
+        height: auto;
+        padding: 0 1;
+    }
+    DataTable {
+        height: 1fr;
+    }
+    """
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+        Binding("x", "reset", "Reset"),
+        Binding("e", "export", "Export"),
+    ]
+    REFRESH_INTERVAL = 1.0
+
+    def __init__(self, metrics: Metrics, textfile: Optional[str] = None):
+        super().__init__()
+        self.metrics = metrics
+        self.textfile = textfile or DEFAULT_TEXTFILE
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Static("", id="summary")
+        yield DataTable(id="requests", cursor_type="row")
+        yield DataTable(id="timings", cursor_type="row")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one("#requests", DataTable).add_columns(
+            "Operation", "Requests", "Errors", "p50", "p95", "p99", "Max", "Avg size", "Decode p95"
+        )
+        self.query_one("#timings", DataTable).add_columns("Client-side", "Count", "p50", "p95", "p99", "Max")
+        self.update_metrics()
+        self.set_interval(self.REFRESH_INTERVAL, self.update_metrics)
+
+    def update_metrics(self) -> None:
+        requests, timings = self.metrics.snapshot()
+        total = sum(s.requests for s in requests.values())
+        errors = sum(s.error_count for s in requests.values())
+        received = sum(s.response_bytes for s in requests.values())
+        broker_time = sum(s.latency.sum for s in requests.values())
+        decode_time = sum(s.decode.sum for s in requests.values())
+        client_time = sum(h.sum for h in timings.values())
+        uptime = time.time() - self.metrics.started
+        self.query_one("#summary", Static).update(
+            f"{total} requests, {errors} errors, {format_bytes(received)} received in {uptime:.0f}s | "
+            f"time in requests {format_seconds(broker_time)}, decoding {format_seconds(decode_time)}, "
+            f"client-side {format_seconds(client_time)}"
+        )
+
+        table = self.query_one("#requests", DataTable)
+        table.clear()
+        for name, s in sorted(requests.items(), key=lambda item: -item[1].latency.sum):
+            errors_text = ", ".join(f"{kind} {n}" for kind, n in sorted(s.errors.items())) or "0"
+            table.add_row(
+                name, str(s.requests), errors_text, *self.quantiles(s.latency),
+                format_bytes(s.response_bytes / s.requests) if s.requests else "-",
+                format_seconds(s.decode.quantile(0.95)) if s.decode.count else "-",
+                key=name,
+            )
+
+        table = self.query_one("#timings", DataTable)
+        table.clear()
+        for name, h in sorted(timings.items(), key=lambda item: -item[1].sum):
+            table.add_row(name, str(h.count), *self.quantiles(h), key=name)
+
+    def quantiles(self, histogram: Histogram):
+        return (
+            format_seconds(histogram.quantile(0.5)),
+            format_seconds(histogram.quantile(0.95)),
+            format_seconds(histogram.quantile(0.99)),
+            format_seconds(histogram.max),
+        )
+
+    def action_reset(self) -> None:
+        self.metrics.reset()
+        self.update_metrics()
+        self.notify("Metrics reset")
+
+    def action_export(self) -> None:
+        try:
+            self.metrics.write_textfile(self.textfile)
+        except OSError as e:
+            logger.error(f"Failed to write metrics to {self.textfile}: {e}")
+            self.notify(f"Failed to write {self.textfile}: {e}", severity="error")
+            return
+        self.notify(f"Metrics written to {self.textfile}")
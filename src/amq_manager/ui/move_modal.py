@@ -1,9 +1,14 @@
+from textual import work
 from textual.app import ComposeResult
+from textual.message import Message
 from textual.screen import ModalScreen
 from textual.widgets import Label, Input, Button, OptionList
 from textual.widgets.option_list import Option
 from textual.containers import Grid, Vertical
+from textual.worker import get_current_worker
+from typing import Optional
 from amq_manager.client import ActiveMQClient
+from amq_manager.queue_index import STALE_AFTER, QueueNameIndex, dlq_original
 
 class MoveMessageModal(ModalScreen):
     BINDINGS = [
@@ -41,11 +46,20 @@ class MoveMessageModal(ModalScreen):
     }
     """
 
+    class QueueNamesLoaded(Message):
+        """Posted by the background queue-name lookup once it has updated the index."""
+
+    class MoveFinished(Message):
+        """Posted by the move worker when it completes or is cancelled."""
+        def __init__(self, result) -> None:
+            super().__init__()
+            self.result = result
+
     def __init__(self, message_id: str, source_queue: str):
         super().__init__()
         self.message_id = message_id
         self.source_queue = source_queue
-        self.all_queues = []
+        self.index: Optional[QueueNameIndex] = None
 
     def compose(self) -> ComposeResult:
         yield Vertical(
@@ -59,51 +73,50 @@ class MoveMessageModal(ModalScreen):
         )
 
     def on_mount(self) -> None:
-        self.load_queues()
+        # Suggest from the names the app already knows, and re-list them in the background if old
+        self.index = getattr(self.app, "queue_index", None)
+        if self.index is None:
+            self.index = QueueNameIndex()
+        self.update_suggestions("")
+        age = self.index.age()
+        if not len(self.index) or age is None or age > STALE_AFTER:
+            self.load_queues()
 
     def load_queues(self) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+        client = getattr(self.app, "client", None)
+        if client is None:
             return
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
-        )
+        self.fetch_queue_names(client)
+
+    @work(thread=True, exclusive=True, group="load_queues")
+    def fetch_queue_names(self, client: ActiveMQClient) -> None:
         try:
-            queues = client.list_queues()
-            # Exclude the source queue from suggestions
-            self.all_queues = [q.get("Name", "") for q in queues if q.get("Name") and q.get("Name") != self.source_queue]
-            self.update_suggestions("")
+            queues = client.list_queues(["Name"])
         except Exception:
-            pass
+            return
+        self.index.update(q.get("Name") for q in queues)
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.QueueNamesLoaded())
+
+    def on_move_message_modal_queue_names_loaded(self, event: "QueueNamesLoaded") -> None:
+        self.update_suggestions(self.query_one("#target_queue", Input).value)
 
     def update_suggestions(self, filter_text: str) -> None:
         option_list = self.query_one("#queue_suggestions", OptionList)
         option_list.clear_options()
         
-        filter_text = filter_text.lower()
-        matching_queues = [q for q in self.all_queues if filter_text in q.lower()]
-        
-        # Smart DLQ sorting: if source is a DLQ, prioritize the original queue
-        if self.source_queue.lower().startswith("dlq."):
-            original_queue = self.source_queue[4:]  # Remove "dlq." or "DLQ." prefix
-            matching_queues.sort(key=lambda q: (q != original_queue, q.lower()))
-            
-            # Add queues with visual highlighting for the original queue
-            for queue in matching_queues:
-                if queue == original_queue:
-                    option_list.add_option(Option(f"⭐ {queue}", id=queue))
-                else:
-                    option_list.add_option(Option(queue, id=queue))
-        else:
-            matching_queues.sort(key=lambda q: q.lower())
-            for queue in matching_queues:
-                option_list.add_option(Option(queue, id=queue))
+        # Smart DLQ sorting: if source is a DLQ, the original queue comes first, then recent targets
+        original_queue = dlq_original(self.source_queue)
+        options = []
+        for queue in self.index.suggest(filter_text, exclude=self.source_queue, original=original_queue):
+            if queue == original_queue:
+                options.append(Option(f"⭐ {queue}", id=queue))
+            elif queue in self.index.recent:
+                options.append(Option(f"↺ {queue}", id=queue))
+            else:
+                options.append(Option(queue, id=queue))
+        option_list.add_options(options)
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "target_queue":
@@ -163,19 +176,26 @@ class MoveMessageModal(ModalScreen):
         self.move_message(target_queue)
 
     def move_message(self, target_queue: str) -> None:
-        app = self.app
-        if not hasattr(app, "active_config") or not app.active_config:
+        client = getattr(self.app, "client", None)
+        if client is None:
             return
 
-        client = ActiveMQClient(
-            app.active_config.host,
-            app.active_config.port,
-            app.active_config.user,
-            app.active_config.password,
-            app.active_config.ssl,
-            app.active_config.context_path
-        )
-        if client.move_message(self.message_id, self.source_queue, target_queue):
+        self.run_move(client, target_queue)
+
+    @work(thread=True, exclusive=True, group="move")
+    def run_move(self, client: ActiveMQClient, target_queue: str) -> None:
+        moved = client.move_message(self.message_id, self.source_queue, target_queue)
+        cache = getattr(self.app, "browse_cache", None)
+        if moved:
+            self.index.record_target(target_queue)
+        if moved and cache is not None:
+            cache.remove_messages(self.source_queue, [self.message_id])
+            cache.invalidate(target_queue)
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.MoveFinished(moved))
+
+    def on_move_message_modal_move_finished(self, event: MoveFinished) -> None:
+        if event.result:
             self.dismiss(True)
         else:
             self.notify("Failed to move message", severity="error")
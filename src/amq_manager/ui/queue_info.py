@@ -0,0 +1,80 @@
+from textual import work
+from textual.app import ComposeResult
+from textual.message import Message
+from textual.screen import Screen
+from textual.widgets import Header, Footer, Label, DataTable
+from textual.binding import Binding
+from textual.containers import VerticalScroll
+from textual.worker import get_current_worker
+from typing import Dict, Any, Optional
+from amq_manager.client import ActiveMQClient
+
+class QueueInfoScreen(Screen):
+    """
+    Every attribute of a single queue. The queue list only reads a few attributes
+    per queue; the full set is fetched here, for one queue, on demand.
+    """
+    BINDINGS = [
+        ("escape", "app.pop_screen", "Back"),
+        ("r", "refresh", "Refresh"),
+        Binding("/", "noop", "", show=False),
+    ]
+    CSS = """
+    .header {
+        text-style: bold;
+        margin-top: 1;
+    }
+    """
+
+    class AttributesLoaded(Message):
+        """Posted by the worker with the queue's attributes."""
+        def __init__(self, attributes: Dict[str, Any], error: Optional[str] = None) -> None:
+            super().__init__()
+            self.attributes = attributes
+            self.error = error
+
+    def __init__(self, queue_name: str):
+        super().__init__()
+        self.queue_name = queue_name
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield VerticalScroll(
+            Label(f"Queue {self.queue_name}", classes="header"),
+            DataTable(),
+        )
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one(DataTable).add_columns("Attribute", "Value")
+        self.action_refresh()
+
+    def action_refresh(self) -> None:
+        client = getattr(self.app, "client", None)
+        if client is None:
+            return
+
+        self.fetch_attributes(client)
+
+    @work(thread=True, exclusive=True, group="load_attributes")
+    def fetch_attributes(self, client: ActiveMQClient) -> None:
+        try:
+            attributes = client.get_queue_attributes(self.queue_name)
+        except Exception as e:
+            if not get_current_worker().is_cancelled:
+                self.post_message(self.AttributesLoaded({}, f"Error reading queue {self.queue_name}: {e}"))
+            return
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.AttributesLoaded(attributes))
+
+    def on_queue_info_screen_attributes_loaded(self, event: AttributesLoaded) -> None:
+        if event.error:
+            self.notify(event.error, severity="error", timeout=10)
+            return
+        table = self.query_one(DataTable)
+        table.clear()
+        for key in sorted(event.attributes):
+            table.add_row(str(key), str(event.attributes[key]))
+
+    def action_noop(self) -> None:
+        pass